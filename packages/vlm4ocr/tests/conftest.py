@@ -0,0 +1,72 @@
+import time
+import pytest
+from vlm4ocr.vlm_engines import VLMEngine
+
+
+def make_pdf(page_texts, page_sizes=None) -> bytes:
+    """ 
+    Returns a PDF with one page per text (lines in Helvetica, an empty text makes a page without a text layer). 
+    page_sizes are (width, height) in pts, letter by default.
+    """
+    page_sizes = page_sizes if page_sizes is not None else [(612, 792)] * len(page_texts)
+    page_ids = [4 + 2 * i for i in range(len(page_texts))]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode(),
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for page_id, text, (width, height) in zip(page_ids, page_texts, page_sizes):
+        lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.split("\n") if line]
+        stream = f"BT /F1 12 Tf 72 {height - 72} Td 14 TL " + " ".join(f"({line}) Tj T*" for line in lines) + " ET" if lines else ""
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return pdf
+
+
+class FakeVLMEngine(VLMEngine):
+    """ A VLM engine that returns a fixed response (or the next of a list of responses) and records the messages. """
+    def __init__(self, responses=None):
+        self.responses = list(responses) if responses is not None else None
+        self.messages = []
+
+    def _next_response(self) -> str:
+        if self.responses is None:
+            return "page text"
+        return self.responses.pop(0)
+
+    def chat(self, messages, verbose=False, stream=False):
+        self.messages.append(messages)
+        return self._next_response()
+
+    async def chat_async(self, messages):
+        self.messages.append(messages)
+        return self._next_response()
+
+    def get_ocr_messages(self, system_prompt, user_prompt, image, **kwrs):
+        images = image if isinstance(image, list) else [image]
+        return [{"role": "user", "content": user_prompt, "num_images": len(images)}]
+
+
+class BlockingVLMEngine(FakeVLMEngine):
+    """ A VLM engine that blocks the event loop, like synchronous work on the event loop thread. """
+    def __init__(self, block_seconds:float):
+        super().__init__()
+        self.block_seconds = block_seconds
+
+    async def chat_async(self, messages):
+        time.sleep(self.block_seconds)
+        return await super().chat_async(messages)
+
+
+@pytest.fixture
+def fake_vlm_engine():
+    return FakeVLMEngine()
@@ -0,0 +1,67 @@
+import asyncio
+import io
+import tarfile
+import zipfile
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _collect_concurrent(ocr, file_paths):
+    async def _run():
+        return [result async for result in ocr.concurrent_ocr(file_paths, concurrent_batch_size=2)]
+    return asyncio.run(_run())
+
+
+@pytest.fixture
+def archive_inputs(tmp_path):
+    good_zip = tmp_path / "good.zip"
+    with zipfile.ZipFile(good_zip, "w") as zf:
+        zf.writestr("x/001.png", _png_bytes())
+        zf.writestr("y/001.png", _png_bytes())
+    corrupt_zip = tmp_path / "corrupt.zip"
+    corrupt_zip.write_bytes(b"this is not a zip archive")
+    missing_tar = tmp_path / "missing.tar.gz"
+    return str(good_zip), str(corrupt_zip), str(missing_tar)
+
+
+@pytest.mark.parametrize("mode", ["sequential", "concurrent"])
+def test_unreadable_archives_yield_error_results(fake_vlm_engine, archive_inputs, mode):
+    good_zip, corrupt_zip, missing_tar = archive_inputs
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    file_paths = [corrupt_zip, good_zip, missing_tar]
+    if mode == "sequential":
+        results = ocr.sequential_ocr(file_paths)
+    else:
+        results = _collect_concurrent(ocr, file_paths)
+
+    by_input = {result.input_dir: result for result in results}
+    assert len(by_input) == 4
+    assert by_input[corrupt_zip].status == "error"
+    assert by_input[missing_tar].status == "error"
+    assert "corrupt.zip" in by_input[corrupt_zip].get_page(0)["text"]
+    for member_name in ["x/001.png", "y/001.png"]:
+        assert by_input[f"{good_zip}/{member_name}"].status == "success"
+
+
+def test_archive_truncated_after_members(fake_vlm_engine, tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tf:
+        for name in ["a.png", "b.png"]:
+            data = _png_bytes()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    truncated_tar = tmp_path / "truncated.tar.gz"
+    truncated_tar.write_bytes(buffer.getvalue()[:len(buffer.getvalue()) // 2])
+
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    results = ocr.sequential_ocr(str(truncated_tar))
+    assert results[-1].input_dir == str(truncated_tar)
+    assert results[-1].status == "error"
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+from vlm4ocr.utils import ImageProcessor
+
+LETTER_300_DPI = (2550, 3300)
+
+
+@pytest.fixture
+def image_processor():
+    return ImageProcessor()
+
+
+def _page_with_text(text:str, font_size:int) -> Image.Image:
+    page = Image.new("L", LETTER_300_DPI, 255)
+    ImageDraw.Draw(page).text((1200, 3100), text, fill=0, font=ImageFont.load_default(size=font_size))
+    return page
+
+
+def test_white_page_is_blank(image_processor):
+    blank, ink_fraction, std = image_processor.detect_blank_page(Image.new("L", LETTER_300_DPI, 255))
+    assert blank and ink_fraction == 0 and std == 0
+
+
+def test_page_with_dust_is_blank(image_processor):
+    rng = np.random.default_rng(0)
+    page = np.full(LETTER_300_DPI[::-1], 250, dtype=np.uint8)
+    for _ in range(40):
+        y, x = rng.integers(200, 3100), rng.integers(200, 2350)
+        page[y:y + 3, x:x + 3] = 60
+    assert image_processor.detect_blank_page(Image.fromarray(page))[0]
+
+
+@pytest.mark.parametrize("text, font_size", [("Page 2", 50), ("2", 30), ("- 3 -", 40)])
+def test_sparse_page_is_not_blank(image_processor, text, font_size):
+    blank, ink_fraction, std = image_processor.detect_blank_page(_page_with_text(text, font_size))
+    # Ink density and variance are as low as on a blank page, but the characters are content
+    assert ink_fraction < 0.001 and std < 8
+    assert not blank
+
+
+def test_text_page_is_not_blank(image_processor):
+    page = Image.new("L", LETTER_300_DPI, 255)
+    draw = ImageDraw.Draw(page)
+    for y in range(300, 3000, 80):
+        draw.text((200, y), "The quick brown fox jumps over the lazy dog " * 3, fill=0, font=ImageFont.load_default(size=40))
+    assert not image_processor.detect_blank_page(page)[0]
+
+
+@pytest.mark.parametrize("gray_level", [20, 90, 150])
+def test_dark_uniform_page_is_not_blank(image_processor, gray_level):
+    # No ink relative to its own background, but the page is not white
+    blank, ink_fraction, std = image_processor.detect_blank_page(Image.new("RGB", (800, 1000), (gray_level,) * 3))
+    assert ink_fraction == 0 and std == 0
+    assert not blank
+
+
+def test_off_white_paper_is_blank(image_processor):
+    # Recycled or yellowed paper
+    assert image_processor.detect_blank_page(Image.new("RGB", (800, 1000), (225, 215, 190)))[0]
+    assert image_processor.detect_blank_page(Image.new("L", (800, 1000), 40), min_background_level=0)[0]
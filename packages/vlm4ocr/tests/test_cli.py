@@ -0,0 +1,105 @@
+import logging
+import os
+import re
+import sys
+import pytest
+from PIL import Image
+
+pytest.importorskip("tqdm")
+from vlm4ocr.cli import get_output_basename, get_output_path_for_ocr_result, split_archive_member_path
+from .conftest import BlockingVLMEngine, FakeVLMEngine
+
+
+@pytest.mark.parametrize("input_file_path, expected", [
+    ("/data/abc.pdf", "abc.pdf"),
+    (os.path.join("/data/scans.zip", "x/001.jpg"), "scans_x_001.jpg"),
+    (os.path.join("/data/scans.zip", "y/001.jpg"), "scans_y_001.jpg"),
+    (os.path.join("/data/scans.tar.gz", "001.jpg"), "scans_001.jpg"),
+    (os.path.join("/data/scans.tgz", "./a/../b/001.jpg"), "scans_a_b_001.jpg"),
+])
+def test_get_output_basename(input_file_path, expected):
+    assert get_output_basename(input_file_path) == expected
+
+
+def test_split_archive_member_path():
+    assert split_archive_member_path("/data/scans.zip/x/001.jpg") == ("/data/scans.zip", "x/001.jpg")
+    assert split_archive_member_path("/data/abc.pdf") == (None, None)
+
+
+def test_archive_members_with_same_name_do_not_collide(tmp_path):
+    output_paths = {get_output_path_for_ocr_result(f"/data/scans.zip/{folder}/001.jpg", None, "markdown", 2, str(tmp_path)) 
+                    for folder in ["x", "y"]}
+    assert output_paths == {str(tmp_path / "scans_x_001.jpg_ocr.md"), str(tmp_path / "scans_y_001.jpg_ocr.md")}
+
+
+@pytest.fixture
+def run_cli(monkeypatch, tmp_path):
+    """ Runs the CLI on a folder of images, with the VLM engine replaced by a given engine. """
+    from vlm4ocr import cli
+
+    def _run(vlm_engine, *cli_args, num_images:int=3):
+        input_dir = tmp_path / "input"
+        input_dir.mkdir(exist_ok=True)
+        for i in range(num_images):
+            Image.new("RGB", (200, 100), "white").save(input_dir / f"page_{i}.png")
+        monkeypatch.setattr(cli, "OllamaVLMEngine", lambda **kwrs: vlm_engine)
+        monkeypatch.setattr(sys, "argv", ["vlm4ocr", "--input_path", str(input_dir), "--output_path", str(tmp_path / "output"),
+                                          "--vlm_engine", "ollama", "--model", "model", "--output_mode", "text", *cli_args])
+        cli.main()
+        return sorted(os.listdir(tmp_path / "output"))
+    return _run
+
+
+def test_lag_summary(run_cli, caplog):
+    caplog.set_level(logging.INFO, logger="vlm4ocr_cli")
+    outputs = run_cli(BlockingVLMEngine(0.1), "--loop_lag_threshold", "0.05")
+
+    assert outputs == ["page_0.png_ocr.txt", "page_1.png_ocr.txt", "page_2.png_ocr.txt"]
+    assert any(record.message.startswith("Event loop blocked for") for record in caplog.records)
+    summary = [record.message for record in caplog.records if record.message.startswith("Processed 3 files")]
+    assert len(summary) == 1
+    assert re.search(r"Event loop blocked [1-9]\d* times over 0.05 s \(max lag 0\.\d+ s\)\.", summary[0])
+
+
+def test_no_lag_summary_by_default(run_cli, caplog):
+    caplog.set_level(logging.INFO, logger="vlm4ocr_cli")
+    run_cli(FakeVLMEngine())
+    summary = [record.message for record in caplog.records if record.message.startswith("Processed 3 files")]
+    assert len(summary) == 1 and "Event loop" not in summary[0]
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    """ Records the concurrency limiters the CLI creates. """
+    from vlm4ocr import cli
+    created = []
+
+    class RecordingLimiter(cli.AdaptiveConcurrencyLimiter):
+        def __init__(self, **kwrs):
+            super().__init__(**kwrs)
+            self.initial_limit = self.limit
+            created.append(self)
+
+    monkeypatch.setattr(cli, "AdaptiveConcurrencyLimiter", RecordingLimiter)
+    return created
+
+
+@pytest.mark.parametrize("cli_args, expected", [
+    (["--concurrent_batch_size", "8"], (1, 8, 8)),                                          # Starts at the batch size
+    (["--concurrent_batch_size", "8", "--max_concurrency", "32"], (1, 32, 8)),
+    (["--concurrent_batch_size", "8", "--min_concurrency", "4", "--max_concurrency", "6"], (4, 6, 6)),
+    (["--concurrent_batch_size", "2", "--min_concurrency", "4", "--max_concurrency", "6"], (4, 6, 4)),
+])
+def test_adaptive_concurrency_starts_at_batch_size(run_cli, limiters, cli_args, expected):
+    run_cli(FakeVLMEngine(), "--adaptive_concurrency", *cli_args)
+    assert len(limiters) == 1
+    assert (limiters[0].min_limit, limiters[0].max_limit, limiters[0].initial_limit) == expected
+
+
+@pytest.mark.parametrize("cli_args", [
+    ["--max_concurrency", "8"],
+    ["--adaptive_concurrency", "--min_concurrency", "9", "--max_concurrency", "8"],
+])
+def test_invalid_concurrency_settings(run_cli, cli_args):
+    with pytest.raises(SystemExit):
+        run_cli(FakeVLMEngine(), *cli_args)
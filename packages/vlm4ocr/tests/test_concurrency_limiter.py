@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from vlm4ocr.utils import AdaptiveConcurrencyLimiter
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+async def _run_calls(limiter, num_calls, concurrency, error=None):
+    """ Runs num_calls calls through the limiter with at most concurrency of them started at once. """
+    async def call():
+        async with limiter:
+            await asyncio.sleep(0.001)
+            if error is not None:
+                raise error
+
+    async def worker(num_worker_calls):
+        for _ in range(num_worker_calls):
+            try:
+                await call()
+            except Exception:
+                pass
+
+    per_worker = [num_calls // concurrency + (1 if i < num_calls % concurrency else 0) for i in range(concurrency)]
+    await asyncio.gather(*(worker(n) for n in per_worker))
+
+
+def test_limit_grows_when_saturated():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=8, initial_limit=2)
+    asyncio.run(_run_calls(limiter, num_calls=40, concurrency=8))
+    assert limiter.limit > 2
+    assert limiter.num_increases == limiter.limit - 2
+
+
+def test_limit_does_not_grow_when_lightly_loaded():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=8, initial_limit=4)
+    # One call at a time never fills the 4 slots
+    asyncio.run(_run_calls(limiter, num_calls=40, concurrency=1))
+    assert limiter.limit == 4
+    assert limiter.num_increases == 0
+
+
+def test_limit_decreases_on_rate_limit():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=16, initial_limit=8)
+    asyncio.run(_run_calls(limiter, num_calls=1, concurrency=1, error=RateLimitError()))
+    assert limiter.limit == 4
+    assert limiter.num_decreases == 1
+    assert limiter.num_overload_signals == 1
+
+
+def test_limit_decreases_on_timeout():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=16, initial_limit=8)
+    asyncio.run(_run_calls(limiter, num_calls=1, concurrency=1, error=asyncio.TimeoutError()))
+    assert limiter.limit == 4
+
+
+def test_other_errors_do_not_change_limit():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=16, initial_limit=8)
+    asyncio.run(_run_calls(limiter, num_calls=4, concurrency=4, error=ValueError("bad response")))
+    assert limiter.limit == 8
+    assert limiter.num_overload_signals == 0
+
+
+def test_concurrent_failures_back_off_once():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=16, initial_limit=8)
+    # All 8 calls start before the first decrease
+    asyncio.run(_run_calls(limiter, num_calls=8, concurrency=8, error=RateLimitError()))
+    assert limiter.limit == 4
+    assert limiter.num_decreases == 1
+    assert limiter.num_overload_signals == 8
+
+
+def test_limit_stays_above_floor():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=16, initial_limit=4)
+    asyncio.run(_run_calls(limiter, num_calls=10, concurrency=1, error=RateLimitError()))
+    assert limiter.limit == 2
+    assert limiter.num_decreases == 1
+
+
+def test_limit_stays_below_ceiling():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=3, initial_limit=1)
+    asyncio.run(_run_calls(limiter, num_calls=100, concurrency=8))
+    assert limiter.limit == 3
+    assert limiter.num_increases == 2
+
+
+def test_in_flight_calls_stay_within_limit():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=4, initial_limit=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            assert limiter.in_flight <= limiter.limit
+            await asyncio.sleep(0.001)
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(50)))
+
+    asyncio.run(run())
+    assert peak <= 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"min_limit": 0},
+    {"min_limit": 4, "max_limit": 2},
+    {"min_limit": 2, "max_limit": 4, "initial_limit": 8},
+    {"backoff_ratio": 1},
+    {"latency_threshold_seconds": 0},
+])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(**kwargs)
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+from vlm4ocr.ocr_engines import _PipelineStages
+from .conftest import FakeVLMEngine
+
+
+class SlowVLMEngine(FakeVLMEngine):
+    """ A VLM engine whose calls take a while. Records the most calls that ran at the same time. """
+    def __init__(self, delay:float=0.01):
+        super().__init__()
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def chat_async(self, messages):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().chat_async(messages)
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(12):
+        image_path = tmp_path / f"page_{i}.png"
+        Image.new("RGB", (200, 100), "white").save(image_path)
+        paths.append(str(image_path))
+    return paths
+
+
+def _collect(ocr, file_paths, **kwrs):
+    async def _run():
+        return [result async for result in ocr.concurrent_ocr(file_paths, **kwrs)]
+    return asyncio.run(_run())
+
+
+@pytest.mark.parametrize("max_file_load", [1, 2, 5])
+def test_inputs_are_pulled_within_the_window(image_paths, max_file_load):
+    pulled = []
+    def _inputs():
+        for image_path in image_paths:
+            pulled.append(image_path)
+            yield image_path
+
+    ocr = OCREngine(vlm_engine=SlowVLMEngine(), output_mode="text")
+    async def _run():
+        results = []
+        async for result in ocr.concurrent_ocr(_inputs(), concurrent_batch_size=2, max_file_load=max_file_load):
+            # Inputs are pulled when a file finishes, not all up front
+            assert len(pulled) <= len(results) + max_file_load
+            results.append(result)
+        return results
+    results = asyncio.run(_run())
+
+    assert sorted(result.input_dir for result in results) == sorted(image_paths)
+    assert all(result.status == "success" for result in results)
+
+
+def test_vlm_calls_are_limited(image_paths):
+    vlm_engine = SlowVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text")
+    results = _collect(ocr, image_paths, concurrent_batch_size=3, max_file_load=12)
+    assert len(results) == 12
+    assert vlm_engine.max_running == 3
+
+
+def test_closing_the_generator_stops_the_files(image_paths):
+    vlm_engine = SlowVLMEngine(delay=0.05)
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text")
+    async def _run():
+        generator = ocr.concurrent_ocr(iter(image_paths), concurrent_batch_size=2, max_file_load=2)
+        first = await generator.__anext__()
+        await generator.aclose()
+        await asyncio.sleep(0.1)
+        return first
+    assert asyncio.run(_run()).status == "success"
+    assert vlm_engine.running == 0
+    assert len(vlm_engine.messages) < len(image_paths)
+
+
+@pytest.mark.parametrize("kwargs", [{"max_file_load": 0}, {"load_workers": 0}, {"preprocess_workers": 0}, {"prefetch_pages": -1}])
+def test_invalid_settings(fake_vlm_engine, kwargs):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    with pytest.raises(ValueError):
+        ocr.concurrent_ocr(["page.png"], **kwargs)
+
+
+class CountingOCREngine(OCREngine):
+    """ Records the most pages that were held between the start of loading and the end of their VLM call. """
+    def __init__(self, vlm_engine, **kwrs):
+        super().__init__(vlm_engine=vlm_engine, **kwrs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _load_page(self, *args, **kwrs):
+        # Runs in the load threads
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return super()._load_page(*args, **kwrs)
+
+    async def _ocr_image_async(self, encoded_image):
+        try:
+            return await super()._ocr_image_async(encoded_image)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def tiff_path(tmp_path):
+    file_path = tmp_path / "pages.tif"
+    pages = [Image.new("RGB", (200, 100), "white") for _ in range(12)]
+    pages[0].save(file_path, format="TIFF", save_all=True, append_images=pages[1:])
+    return str(file_path)
+
+
+@pytest.mark.parametrize("concurrent_batch_size, prefetch_pages", [(1, 0), (2, 1), (3, 4)])
+def test_pages_in_flight_are_bounded_by_the_page_buffer(tiff_path, concurrent_batch_size, prefetch_pages):
+    ocr = CountingOCREngine(SlowVLMEngine(), output_mode="text")
+    result = _collect(ocr, [tiff_path], concurrent_batch_size=concurrent_batch_size, prefetch_pages=prefetch_pages)[0]
+    assert result.status == "success" and len(result) == 12
+    assert ocr.max_in_flight <= concurrent_batch_size + prefetch_pages
+
+
+def test_page_buffer_is_shared_by_files(tiff_path):
+    ocr = CountingOCREngine(SlowVLMEngine(), output_mode="text")
+    results = _collect(ocr, [tiff_path] * 3, concurrent_batch_size=2, prefetch_pages=2, max_file_load=3)
+    assert [len(result) for result in results] == [12] * 3
+    assert ocr.max_in_flight <= 4
+
+
+def _stages(page_buffer_size:int):
+    return _PipelineStages(vlm_call_semaphore=asyncio.Semaphore(1), page_buffer=asyncio.Semaphore(page_buffer_size),
+                           page_buffer_size=page_buffer_size, page_buffer_lock=asyncio.Lock(),
+                           load_executor=None, preprocess_executor=None, preprocess_page=None)
+
+
+def test_page_batches_fit_in_the_page_buffer(fake_vlm_engine):
+    class _BatchLoader:
+        file_bytes = None
+        def get_render_batch_size(self):
+            return 8
+
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    async def _run():
+        return ocr._get_page_group_size(_stages(3), _BatchLoader()), ocr._get_page_group_size(_stages(16), _BatchLoader())
+    assert asyncio.run(_run()) == (3, 8)
+
+
+def test_page_batches_take_their_slots_together():
+    async def _run():
+        stages = _stages(4)
+        await OCREngine._reserve_page_buffer(stages, 3)
+        # A second batch of 3 waits for the whole batch, and holds the lock while it waits
+        second = asyncio.ensure_future(OCREngine._reserve_page_buffer(stages, 3))
+        await asyncio.sleep(0.01)
+        assert not second.done() and stages.page_buffer_lock.locked()
+        single = asyncio.ensure_future(OCREngine._reserve_page_buffer(stages, 1))
+        await asyncio.sleep(0.01)
+        assert not single.done()
+
+        for _ in range(3):
+            stages.page_buffer.release()
+        await asyncio.wait_for(second, 1)
+        for _ in range(3):
+            stages.page_buffer.release()
+        await asyncio.wait_for(single, 1)
+    asyncio.run(_run())
+
+
+def test_cancelled_reservation_releases_its_slots():
+    async def _run():
+        stages = _stages(4)
+        await OCREngine._reserve_page_buffer(stages, 2)
+        waiting = asyncio.ensure_future(OCREngine._reserve_page_buffer(stages, 4))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # The 2 free slots taken by the cancelled reservation are back
+        await asyncio.wait_for(OCREngine._reserve_page_buffer(stages, 2), 1)
+        assert stages.page_buffer.locked()
+    asyncio.run(_run())
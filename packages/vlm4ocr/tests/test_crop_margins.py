@@ -0,0 +1,76 @@
+import pytest
+from PIL import Image, ImageDraw
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import ImageProcessor
+
+CONTENT_BOX = (300, 400, 900, 1200)
+
+
+def _page(size=(1200, 1600), border:int=0, background=245) -> Image.Image:
+    """ A page with text lines inside CONTENT_BOX and an optional black border (e.g., the scanner bed). """
+    image = Image.new("RGB", size, (0, 0, 0) if border else (background,) * 3)
+    draw = ImageDraw.Draw(image)
+    if border:
+        draw.rectangle([border, border, size[0] - border - 1, size[1] - border - 1], fill=(background,) * 3)
+    left, top, right, bottom = CONTENT_BOX
+    for y in range(top, bottom, 40):
+        draw.rectangle([left, y, right - 1, y + 19], fill=(20, 20, 20))
+    return image
+
+
+def _assert_box_close(box, expected, tolerance):
+    assert all(abs(a - b) <= tolerance for a, b in zip(box, expected))
+
+
+def test_margins_are_cropped_with_padding():
+    image = _page()
+    cropped_image, cropped, box = ImageProcessor().crop_margins(image, padding_pixels=16)
+    assert cropped
+    left, top, right, bottom = CONTENT_BOX
+    # The analysis runs on a reduced copy, the box is accurate to a couple of pixels
+    _assert_box_close(box, (left - 16, top - 16, right + 16, bottom - 20 + 16), tolerance=4)
+    assert cropped_image.size == (box[2] - box[0], box[3] - box[1])
+
+
+def test_dark_border_is_dropped():
+    _, cropped, box = ImageProcessor().crop_margins(_page(border=60), padding_pixels=0)
+    assert cropped
+    _assert_box_close(box, (300, 400, 900, 1180), tolerance=4)
+
+
+def test_dark_background_band_is_kept():
+    # A dark band wider than 10% of the page is content (e.g., a header bar), not a border
+    image = _page()
+    ImageDraw.Draw(image).rectangle([0, 0, 1199, 299], fill=(0, 0, 0))
+    _, _, box = ImageProcessor().crop_margins(image, padding_pixels=0)
+    assert box[1] == 0
+
+
+def test_specks_do_not_extend_the_box():
+    image = _page()
+    draw = ImageDraw.Draw(image)
+    for x, y in [(30, 30), (1150, 1550), (60, 1500)]:
+        draw.point((x, y), fill=(0, 0, 0))
+    _, _, box = ImageProcessor().crop_margins(image, padding_pixels=0)
+    _assert_box_close(box, (300, 400, 900, 1180), tolerance=4)
+
+
+def test_blank_and_full_pages_are_not_cropped():
+    blank = Image.new("RGB", (800, 1000), "white")
+    assert ImageProcessor().crop_margins(blank) == (blank, False, (0, 0, 800, 1000))
+
+    full = _page()
+    ImageDraw.Draw(full).rectangle([10, 10, 1189, 1589], outline=(20, 20, 20), width=3)
+    cropped_image, cropped, box = ImageProcessor().crop_margins(full, padding_pixels=16)
+    assert cropped_image is full and not cropped and box == (0, 0, 1200, 1600)
+
+
+def test_ocr_engine_records_crop_box(tmp_path, fake_vlm_engine):
+    image_path = tmp_path / "page.png"
+    _page().save(image_path)
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    result = ocr.sequential_ocr(str(image_path), crop_margins=True)[0]
+
+    status = result.get_page(0)["image_processing_status"]["crop_margins"]
+    assert status["status"] == "success" and status["cropped"]
+    _assert_box_close(status["box"], (284, 384, 916, 1196), tolerance=4)
@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from PIL import Image
+from vlm4ocr.utils import ImageDataLoader, ImageProcessor, TIFFDataLoader, decode_reduced
+
+
+@pytest.mark.parametrize("max_dimension_pixels", [None, 500, 300])
+def test_image_loader_does_not_change_a_caller_image(tmp_path, max_dimension_pixels):
+    image_path = tmp_path / "page.jpg"
+    Image.new("RGB", (2400, 1600), "white").save(image_path, format="JPEG")
+    caller_image = Image.open(image_path)
+
+    page = ImageDataLoader("page.jpg", max_dimension_pixels=max_dimension_pixels, image=caller_image).get_page(0)
+
+    assert page is not caller_image
+    assert caller_image.size == (2400, 1600)
+    assert caller_image.mode == "RGB"
+    if max_dimension_pixels is not None:
+        assert max_dimension_pixels <= max(page.size) < 2400
+
+
+def _save(tmp_path, image, name):
+    image_path = tmp_path / name
+    image.save(image_path)
+    return image_path
+
+
+@pytest.mark.parametrize("name", ["page.jpg", "page.png"])
+@pytest.mark.parametrize("max_dimension_pixels", [1000, 600, 250])
+def test_decode_reduced_keeps_longest_side_above_limit(tmp_path, name, max_dimension_pixels):
+    image_path = _save(tmp_path, Image.new("RGB", (2400, 1600), "white"), name)
+    image = decode_reduced(Image.open(image_path), max_dimension_pixels)
+    assert max_dimension_pixels <= max(image.size) < 2 * max_dimension_pixels
+    assert image.size[0] / image.size[1] == pytest.approx(1.5, rel=0.02)
+
+
+def test_decode_reduced_leaves_small_images(tmp_path):
+    image_path = _save(tmp_path, Image.new("RGB", (800, 600), "white"), "page.png")
+    assert decode_reduced(Image.open(image_path), 1000).size == (800, 600)
+    assert decode_reduced(Image.open(image_path), None).size == (800, 600)
+
+
+def test_decode_reduced_skips_bilevel_images(tmp_path):
+    # Reducing a 1-bit scan would blur thin strokes into gray. ImageProcessor.resize handles it.
+    image_path = _save(tmp_path, Image.new("1", (2400, 1600), 1), "page.png")
+    image = decode_reduced(Image.open(image_path), 600)
+    assert image.size == (2400, 1600) and image.mode == "1"
+
+
+@pytest.mark.parametrize("name", ["page.jpg", "page.png"])
+def test_reduced_decode_resizes_to_the_final_size(tmp_path, name):
+    image_path = _save(tmp_path, Image.effect_noise((1500, 1000), 30).convert("RGB"), name)
+    with Image.open(image_path) as full_image:
+        expected, _ = ImageProcessor().resize(full_image.copy(), max_dimension_pixels=400)
+
+    page = ImageDataLoader(str(image_path), max_dimension_pixels=400).get_page(0)
+    assert max(page.size) < 1500
+    resized, _ = ImageProcessor().resize(page, max_dimension_pixels=400)
+    # The reduced image rounds the shorter side up
+    assert resized.size[0] == expected.size[0]
+    assert abs(resized.size[1] - expected.size[1]) <= 1
+
+
+TIFF_COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (128, 128, 128)]
+
+
+@pytest.fixture
+def tiff_path(tmp_path):
+    file_path = tmp_path / "pages.tif"
+    pages = [Image.new("RGB", (1200, 1600), color) for color in TIFF_COLORS]
+    pages[0].save(file_path, format="TIFF", save_all=True, append_images=pages[1:])
+    return str(file_path)
+
+
+def test_tiff_pages_are_read_from_one_handle(tiff_path):
+    data_loader = TIFFDataLoader(tiff_path)
+    assert data_loader.get_page_count() == 4
+    handle = data_loader._image
+    # Out of order, the handle seeks back and forth
+    for page_index in [2, 0, 3, 1]:
+        page = data_loader.get_page(page_index)
+        assert page.getpixel((0, 0)) == TIFF_COLORS[page_index]
+    assert data_loader._image is handle
+
+    data_loader.close()
+    assert data_loader._image is None
+    # Reopened on the next use
+    assert data_loader.get_page(1).getpixel((0, 0)) == TIFF_COLORS[1]
+    data_loader.close()
+
+
+def test_tiff_pages_are_independent_of_the_handle(tiff_path):
+    data_loader = TIFFDataLoader(tiff_path)
+    first_page = data_loader.get_page(0)
+    data_loader.get_page(1)
+    assert first_page.getpixel((0, 0)) == TIFF_COLORS[0]
+    data_loader.close()
+
+
+def test_tiff_pages_are_reduced(tiff_path):
+    with open(tiff_path, "rb") as f:
+        data_loader = TIFFDataLoader("pages.tif", max_dimension_pixels=500, file_bytes=f.read())
+    page = data_loader.get_page(3)
+    assert page.size == (400, 534)
+    assert page.getpixel((0, 0)) == TIFF_COLORS[3]
+    data_loader.close()
+
+
+def test_concurrent_tiff_pages(tiff_path):
+    data_loader = TIFFDataLoader(tiff_path, max_dimension_pixels=800)
+
+    async def _get_pages():
+        return await asyncio.gather(*[data_loader.get_page_async(page_index) for page_index in [0, 1, 2, 3] * 3])
+    pages = asyncio.run(_get_pages())
+
+    assert [page.getpixel((0, 0)) for page in pages] == TIFF_COLORS * 3
+    data_loader.close()
+
+
+def test_tiff_page_out_of_range(tiff_path):
+    data_loader = TIFFDataLoader(tiff_path)
+    with pytest.raises(ValueError):
+        data_loader.get_page(4)
+    data_loader.close()
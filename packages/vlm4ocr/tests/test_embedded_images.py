@@ -0,0 +1,80 @@
+import importlib.util
+import io
+import shutil
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import PDFDataLoader
+from .conftest import FakeVLMEngine, make_pdf
+
+requires_pdfium = pytest.mark.skipif(importlib.util.find_spec("pypdfium2") is None, reason="pypdfium2 is not installed")
+
+RASTERIZERS = [
+    pytest.param("pdf2image", marks=pytest.mark.skipif(shutil.which("pdfimages") is None or shutil.which("pdftoppm") is None,
+                                                       reason="poppler is not installed")),
+    pytest.param("pdfium", marks=requires_pdfium),
+]
+
+
+def _scan_pdf(rotation:int=0) -> bytes:
+    """ Returns a letter-size PDF whose only page is a 100 dpi scan (a JPEG image covering the page). """
+    buffer = io.BytesIO()
+    Image.effect_noise((850, 1100), 60).convert("RGB").save(buffer, format="PDF", resolution=100)
+    if rotation == 0:
+        return buffer.getvalue()
+
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(buffer.getvalue())
+    pdf[0].set_rotation(rotation)
+    rotated = io.BytesIO()
+    pdf.save(rotated)
+    pdf.close()
+    return rotated.getvalue()
+
+
+@pytest.fixture
+def scan_path(tmp_path):
+    file_path = tmp_path / "scan.pdf"
+    file_path.write_bytes(_scan_pdf())
+    return str(file_path)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_scanned_page_is_extracted_at_native_resolution(scan_path, rasterizer):
+    with PDFDataLoader(scan_path, rasterizer=rasterizer, extract_embedded_images=True) as data_loader:
+        assert data_loader.rasterizer.has_page_image(0)
+        # A rendered page would be 1700x2200 at 200 dpi
+        assert data_loader.get_page(0).size == (850, 1100)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_scanned_page_is_rendered_by_default(scan_path, rasterizer):
+    with PDFDataLoader(scan_path, rasterizer=rasterizer) as data_loader:
+        assert data_loader.get_page(0).size == (1700, 2200)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_text_pages_are_rendered(tmp_path, rasterizer):
+    file_path = tmp_path / "text.pdf"
+    file_path.write_bytes(make_pdf(["Page 0", ""]))
+    with PDFDataLoader(str(file_path), rasterizer=rasterizer, extract_embedded_images=True) as data_loader:
+        assert not data_loader.rasterizer.has_page_image(0)
+        assert not data_loader.rasterizer.has_page_image(1)
+        assert data_loader.get_page(0).size == (1700, 2200)
+
+
+@requires_pdfium
+def test_rotated_scan_is_upright(tmp_path):
+    file_path = tmp_path / "scan.pdf"
+    file_path.write_bytes(_scan_pdf(rotation=90))
+    with PDFDataLoader(str(file_path), rasterizer="pdfium", extract_embedded_images=True) as data_loader:
+        assert data_loader.get_page(0).size == (1100, 850)
+
+
+@requires_pdfium
+def test_ocr_engine_extracts_embedded_images(scan_path):
+    vlm_engine = FakeVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", pdf_rasterizer="pdfium", extract_embedded_images=True)
+    result = ocr.sequential_ocr(scan_path)[0]
+    assert result.status == "success"
+    assert len(vlm_engine.messages) == 1
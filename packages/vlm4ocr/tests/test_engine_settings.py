@@ -0,0 +1,60 @@
+import pytest
+from vlm4ocr import OCREngine, SpoolConfig, BlankPageConfig, TilingConfig, PackingConfig
+
+
+@pytest.mark.parametrize("config_class, kwargs", [
+    (BlankPageConfig, {"max_ink_fraction": 1.5}),
+    (BlankPageConfig, {"max_std": -1}),
+    (BlankPageConfig, {"max_component_pixels": 2.5}),
+    (TilingConfig, {"tile_size_pixels": 32}),
+    (TilingConfig, {"tile_size_pixels": 1000, "overlap": 0.5}),
+    (PackingConfig, {"max_pages": 1, "max_pixels": 10**6}),
+    (PackingConfig, {"max_pages": 2}),
+    (PackingConfig, {"max_pages": 2, "max_pixels": 0}),
+    (PackingConfig, {"max_pages": 2, "max_image_tokens": 0}),
+])
+def test_invalid_config(config_class, kwargs):
+    with pytest.raises(ValueError):
+        config_class(**kwargs)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"spool": True},
+    {"blank_page": {"max_std": 4.0}},
+    {"tiling": 1000},
+    {"packing": 4},
+])
+def test_settings_must_be_config_objects(fake_vlm_engine, kwargs):
+    with pytest.raises(TypeError):
+        OCREngine(vlm_engine=fake_vlm_engine, **kwargs)
+
+
+def test_packing_image_tokens_require_profile(fake_vlm_engine):
+    packing = PackingConfig(max_pages=4, max_image_tokens=4000)
+    with pytest.raises(ValueError):
+        OCREngine(vlm_engine=fake_vlm_engine, packing=packing)
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, vision_token_profile="qwen_vl", packing=packing)
+    assert ocr.packing is packing
+
+
+def test_defaults(fake_vlm_engine):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine)
+    assert ocr.spool is None and ocr.tiling is None and ocr.packing is None
+    assert ocr.blank_page == BlankPageConfig()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"image_format": "gif"},
+    {"preprocess_processes": 0},
+    {"packing": PackingConfig(max_pages=2, max_image_tokens=100)},
+])
+def test_settings_are_checked_before_they_are_assigned(fake_vlm_engine, kwargs):
+    assigned = []
+    class _Engine(OCREngine):
+        def __setattr__(self, name, value):
+            assigned.append(name)
+            super().__setattr__(name, value)
+
+    with pytest.raises(ValueError):
+        _Engine(vlm_engine=fake_vlm_engine, **kwargs)
+    assert assigned == []
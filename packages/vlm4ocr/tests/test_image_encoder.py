@@ -0,0 +1,95 @@
+import io
+import pytest
+from PIL import Image, ImageDraw
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import ImageEncoder, image_to_base64
+
+
+def _text_page() -> Image.Image:
+    image = Image.new("RGB", (600, 800), "white")
+    draw = ImageDraw.Draw(image)
+    for y in range(40, 760, 24):
+        draw.text((40, y), "The quick brown fox jumps over the lazy dog. 0123456789", fill=(20, 20, 20))
+    return image
+
+
+def _decode(encoded) -> Image.Image:
+    return Image.open(io.BytesIO(encoded.data))
+
+
+def test_default_encoding_matches_image_to_base64():
+    image = _text_page()
+    encoded = ImageEncoder().encode(image)
+    assert encoded.mime_type == "image/png"
+    assert encoded.to_base64() == image_to_base64(image)
+    assert encoded.base64_size == len(encoded.to_base64())
+    assert encoded.to_data_url().startswith("data:image/png;base64,")
+
+
+@pytest.mark.parametrize("format, mime_type, pil_format", [
+    ("png", "image/png", "PNG"),
+    ("jpeg", "image/jpeg", "JPEG"),
+    ("jpg", "image/jpeg", "JPEG"),
+    ("WebP", "image/webp", "WEBP"),
+])
+def test_formats(format, mime_type, pil_format):
+    encoded = ImageEncoder(format=format).encode(_text_page().convert("RGBA"))
+    assert encoded.mime_type == mime_type
+    decoded = _decode(encoded)
+    assert decoded.format == pil_format
+    assert decoded.size == (600, 800)
+
+
+@pytest.mark.parametrize("format", ["jpeg", "webp"])
+def test_lower_quality_is_smaller(format):
+    image = _text_page()
+    sizes = [len(ImageEncoder(format=format, quality=quality).encode(image).data) for quality in [95, 75, 40]]
+    assert sizes[0] > sizes[1] > sizes[2]
+
+
+def test_png_compress_level():
+    image = Image.effect_noise((300, 300), 20).convert("RGB")
+    assert len(ImageEncoder(compress_level=0).encode(image).data) > len(ImageEncoder(compress_level=9).encode(image).data)
+
+
+@pytest.mark.parametrize("color_mode, format, mode", [
+    ("grayscale", "png", "L"),
+    ("grayscale", "jpeg", "L"),
+    ("bilevel", "png", "1"),
+    ("palette", "png", "P"),
+])
+def test_color_modes(color_mode, format, mode):
+    image = _text_page()
+    encoded = ImageEncoder(format=format, color_mode=color_mode).encode(image)
+    assert _decode(encoded).mode == mode
+    assert len(encoded.data) < len(ImageEncoder(format=format).encode(image).data)
+
+
+def test_bilevel_keeps_text_black_on_white():
+    decoded = _decode(ImageEncoder(color_mode="bilevel").encode(_text_page())).convert("L")
+    assert decoded.getpixel((0, 0)) == 255
+    assert decoded.getextrema() == (0, 255)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"format": "gif"},
+    {"quality": 0},
+    {"quality": 101},
+    {"compress_level": 10},
+    {"color_mode": "sepia"},
+    {"format": "jpeg", "color_mode": "bilevel"},
+    {"format": "webp", "color_mode": "palette"},
+    {"color_mode": "palette", "palette_colors": 1},
+])
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        ImageEncoder(**kwargs)
+
+
+def test_ocr_engine_encodes_pages_with_its_settings(fake_vlm_engine):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", image_format="jpeg", image_quality=60, image_color_mode="grayscale")
+    assert ocr.image_encoder.mime_type == "image/jpeg"
+    assert ocr.image_encoder.quality == 60
+    assert ocr.image_encoder.color_mode == "grayscale"
+    with pytest.raises(ValueError):
+        OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", image_format="jpeg", image_color_mode="bilevel")
@@ -0,0 +1,76 @@
+import asyncio
+import time
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import EventLoopLagMonitor
+from .conftest import BlockingVLMEngine
+
+
+def test_blocking_stretches_are_reported():
+    lags = []
+    monitor = EventLoopLagMonitor(threshold_seconds=0.05, interval_seconds=0.01, on_lag=lags.append)
+
+    async def _run():
+        async with monitor:
+            assert monitor.running
+            await asyncio.sleep(0.05)
+            time.sleep(0.15)
+            await asyncio.sleep(0.05)
+        assert not monitor.running
+    asyncio.run(_run())
+
+    stats = monitor.get_stats()
+    assert stats["samples"] > 2
+    assert stats["stalls"] == 1 and len(lags) == 1
+    assert 0.1 <= lags[0] <= stats["max_lag_seconds"] + 0.001
+    assert stats["total_stall_seconds"] == pytest.approx(lags[0], abs=0.001)
+
+
+def test_idle_loop_has_no_stalls():
+    monitor = EventLoopLagMonitor(threshold_seconds=0.05, interval_seconds=0.01)
+
+    async def _run():
+        async with monitor:
+            await asyncio.sleep(0.1)
+    asyncio.run(_run())
+    assert monitor.get_stats()["stalls"] == 0
+
+
+def test_start_twice_and_stats_after_stop():
+    async def _run():
+        monitor = EventLoopLagMonitor(threshold_seconds=0.05, interval_seconds=0.01)
+        monitor.start()
+        task = monitor._task
+        monitor.start()
+        assert monitor._task is task
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        await monitor.stop()
+        return monitor
+    monitor = asyncio.run(_run())
+    assert not monitor.running
+    assert monitor.get_stats()["samples"] > 0
+
+
+@pytest.mark.parametrize("kwargs", [{"threshold_seconds": 0}, {"interval_seconds": -1}, {"threshold_seconds": "1"}])
+def test_invalid_settings(kwargs):
+    with pytest.raises(ValueError):
+        EventLoopLagMonitor(**kwargs)
+
+
+def test_concurrent_ocr_runs_the_monitor(tmp_path):
+    image_paths = []
+    for i in range(3):
+        image_path = tmp_path / f"page_{i}.png"
+        Image.new("RGB", (200, 100), "white").save(image_path)
+        image_paths.append(str(image_path))
+    ocr = OCREngine(vlm_engine=BlockingVLMEngine(0.1), output_mode="text")
+    monitor = EventLoopLagMonitor(threshold_seconds=0.05, interval_seconds=0.01)
+
+    async def _run():
+        results = [result async for result in ocr.concurrent_ocr(image_paths, concurrent_batch_size=3, lag_monitor=monitor)]
+        assert not monitor.running
+        return results
+    assert len(asyncio.run(_run())) == 3
+    assert monitor.get_stats()["stalls"] >= 1
@@ -0,0 +1,66 @@
+import pytest
+from PIL import Image, ImageDraw
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import ImageProcessor
+
+
+def _lines_page(line_height:int, size=(1200, 1600), columns=1, offset:int=0) -> Image.Image:
+    """ A page with text lines drawn as dark bars (a line every 2 * line_height pixels). Columns are shifted by offset. """
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    column_width = size[0] // columns
+    for column in range(columns):
+        left = column * column_width + 40
+        for top in range(60 + column * offset, size[1] - 60 - line_height, 2 * line_height):
+            draw.rectangle([left, top, left + column_width - 80, top + line_height - 1], fill=30)
+    return image
+
+
+@pytest.mark.parametrize("line_height", [12, 30, 60])
+def test_text_height(line_height):
+    assert ImageProcessor().estimate_text_height(_lines_page(line_height)) == pytest.approx(line_height, rel=0.1)
+
+
+def test_text_height_with_unaligned_columns():
+    image = _lines_page(24, columns=2, offset=17)
+    assert ImageProcessor().estimate_text_height(image) == pytest.approx(24, rel=0.1)
+
+
+def test_text_height_of_large_page():
+    # Measured on a reduced copy, reported in pixels of the input image
+    image = _lines_page(40, size=(3000, 4000))
+    assert ImageProcessor().estimate_text_height(image) == pytest.approx(40, rel=0.1)
+
+
+def test_no_text():
+    assert ImageProcessor().estimate_text_height(Image.new("L", (800, 1000), 255)) is None
+    image = Image.new("RGB", (800, 1000), "white")
+    resized_image, resized, text_height = ImageProcessor().resize_for_legibility(image, min_text_height_pixels=20)
+    assert resized_image is image and not resized and text_height is None
+
+
+def test_large_type_is_downscaled():
+    image = _lines_page(60)
+    resized_image, resized, text_height = ImageProcessor().resize_for_legibility(image, min_text_height_pixels=20)
+    assert resized
+    assert resized_image.size == (round(1200 * 20 / text_height), round(1600 * 20 / text_height))
+    assert ImageProcessor().estimate_text_height(resized_image) == pytest.approx(20, rel=0.15)
+
+
+def test_fine_print_is_not_upscaled():
+    image = _lines_page(12)
+    resized_image, resized, _ = ImageProcessor().resize_for_legibility(image, min_text_height_pixels=20)
+    assert resized_image is image and not resized
+
+
+def test_ocr_engine_records_legibility_resize(tmp_path, fake_vlm_engine):
+    image_path = tmp_path / "page.png"
+    _lines_page(60).save(image_path)
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    result = ocr.sequential_ocr(str(image_path), min_text_height_pixels=24)[0]
+
+    status = result.get_page(0)["image_processing_status"]["legibility_resize"]
+    assert status["status"] == "success"
+    assert status["resized"]
+    assert status["text_height"] == pytest.approx(60, rel=0.1)
+    assert status["size"] == [round(1200 * 24 / status["text_height"]), round(1600 * 24 / status["text_height"])]
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine, PackingConfig
+from vlm4ocr.utils import split_packed_response
+from .conftest import FakeVLMEngine
+
+
+def test_split_packed_response():
+    text = "<<<PAGE 1>>>\nfirst page\n\n<<<PAGE 2>>>\nsecond page\n<<<PAGE 3>>>\nthird page"
+    assert split_packed_response(text, 3) == ["first page", "second page", "third page"]
+
+
+def test_split_packed_response_with_formatted_markers():
+    text = "```markdown\n**<<<PAGE 1>>>**\n# Title\n\n## <<< page 2 >>>\n| a | b |"
+    assert split_packed_response(text, 2) == ["# Title", "| a | b |"]
+
+
+def test_split_packed_response_keeps_empty_pages():
+    assert split_packed_response("<<<PAGE 1>>>\n<<<PAGE 2>>>\ntext", 2) == ["", "text"]
+
+
+def test_split_packed_response_ignores_inline_markers():
+    # A marker that is not on its own line is page content
+    text = "<<<PAGE 1>>>\nsee <<<PAGE 2>>> below\n<<<PAGE 2>>>\nsecond"
+    assert split_packed_response(text, 2) == ["see <<<PAGE 2>>> below", "second"]
+
+
+@pytest.mark.parametrize("text", [
+    # Dropped marker
+    "<<<PAGE 1>>>\nfirst\n<<<PAGE 3>>>\nthird",
+    "first\nsecond\nthird",
+    # Reordered markers
+    "<<<PAGE 2>>>\nsecond\n<<<PAGE 1>>>\nfirst\n<<<PAGE 3>>>\nthird",
+    # Repeated marker
+    "<<<PAGE 1>>>\nfirst\n<<<PAGE 1>>>\nsecond\n<<<PAGE 2>>>\n<<<PAGE 3>>>\nthird",
+    # Extra page
+    "<<<PAGE 1>>>\na\n<<<PAGE 2>>>\nb\n<<<PAGE 3>>>\nc\n<<<PAGE 4>>>\nd",
+    # Text before the first marker
+    "Here are the pages:\n<<<PAGE 1>>>\nfirst\n<<<PAGE 2>>>\nsecond\n<<<PAGE 3>>>\nthird",
+])
+def test_split_packed_response_rejects_unsplittable_responses(text):
+    with pytest.raises(ValueError):
+        split_packed_response(text, 3)
+
+
+@pytest.fixture
+def two_page_tiff(tmp_path):
+    file_path = tmp_path / "pages.tif"
+    pages = [Image.new("RGB", (200, 300), "white") for _ in range(2)]
+    pages[0].save(file_path, format="TIFF", save_all=True, append_images=pages[1:])
+    return str(file_path)
+
+
+def _run(ocr, file_path, mode):
+    if mode == "sequential":
+        return ocr.sequential_ocr(file_path)[0]
+
+    async def _collect():
+        return [result async for result in ocr.concurrent_ocr(file_path, concurrent_batch_size=2)]
+    return asyncio.run(_collect())[0]
+
+
+@pytest.mark.parametrize("mode", ["sequential", "concurrent"])
+def test_packed_pages_are_split(two_page_tiff, mode):
+    vlm_engine = FakeVLMEngine(responses=["<<<PAGE 1>>>\nfirst\n<<<PAGE 2>>>\nsecond"])
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", packing=PackingConfig(max_pages=2, max_pixels=10**6))
+    result = _run(ocr, two_page_tiff, mode)
+
+    assert result.status == "success"
+    assert [page["text"] for page in result] == ["first", "second"]
+    assert [message[0]["num_images"] for message in vlm_engine.messages] == [2]
+    for position, page in enumerate(result, start=1):
+        assert page["image_processing_status"]["page_packing"] == {"status": "success", "pages": 2, "position": position}
+
+
+@pytest.mark.parametrize("mode", ["sequential", "concurrent"])
+def test_unsplittable_pack_falls_back_to_single_pages(two_page_tiff, mode):
+    # The pack response misses the second marker, so each page is OCR'd on its own
+    vlm_engine = FakeVLMEngine(responses=["<<<PAGE 1>>>\nfirst and second", "page text", "page text"])
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", packing=PackingConfig(max_pages=2, max_pixels=10**6))
+    result = _run(ocr, two_page_tiff, mode)
+
+    assert result.status == "success"
+    assert [page["text"] for page in result] == ["page text", "page text"]
+    assert [message[0]["num_images"] for message in vlm_engine.messages] == [2, 1, 1]
+    assert "<<<PAGE" not in vlm_engine.messages[1][0]["content"]
+    for page in result:
+        assert page["image_processing_status"]["page_packing"]["status"] == "error"
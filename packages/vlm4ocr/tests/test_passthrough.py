@@ -0,0 +1,90 @@
+import asyncio
+import io
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine, TilingConfig
+from vlm4ocr.utils import EncodedImage, ImageDataLoader
+from .conftest import FakeVLMEngine
+
+
+class RecordingVLMEngine(FakeVLMEngine):
+    """ Records the images given to get_ocr_messages. """
+    def __init__(self, responses=None):
+        super().__init__(responses)
+        self.images = []
+
+    def get_ocr_messages(self, system_prompt, user_prompt, image, **kwrs):
+        self.images.extend(image if isinstance(image, list) else [image])
+        return super().get_ocr_messages(system_prompt, user_prompt, image, **kwrs)
+
+
+def _save(tmp_path, name, size=(800, 600), mode="RGB"):
+    image_path = tmp_path / name
+    Image.effect_noise(size, 40).convert(mode).save(image_path)
+    return image_path
+
+
+@pytest.mark.parametrize("name, mime_type", [("page.png", "image/png"), ("page.jpg", "image/jpeg")])
+def test_original_bytes_are_returned(tmp_path, name, mime_type):
+    image_path = _save(tmp_path, name)
+    encoded = ImageDataLoader(str(image_path)).get_page_bytes(0)
+    assert encoded == EncodedImage(data=image_path.read_bytes(), mime_type=mime_type)
+
+
+def test_no_original_bytes(tmp_path):
+    # Formats the VLM does not accept, images over max_dimension_pixels, and images held by the caller
+    assert ImageDataLoader(str(_save(tmp_path, "page.bmp"))).get_page_bytes(0) is None
+    assert ImageDataLoader(str(_save(tmp_path, "page.jpg")), max_dimension_pixels=500).get_page_bytes(0) is None
+    assert ImageDataLoader(str(_save(tmp_path, "cmyk.jpg", mode="CMYK"))).get_page_bytes(0) is None
+    assert ImageDataLoader("page.png", image=Image.new("RGB", (10, 10))).get_page_bytes(0) is None
+
+
+@pytest.mark.parametrize("image_format, passthrough", [
+    ({}, True),
+    ({"image_format": "png", "png_compress_level": 9}, True),
+    ({"image_format": "jpeg"}, True),
+    ({"image_format": "jpeg", "image_quality": 60}, False),
+    ({"image_format": "webp"}, False),
+    ({"image_color_mode": "grayscale"}, False),
+])
+def test_encoder_settings_decide_passthrough_of_jpeg(tmp_path, image_format, passthrough):
+    image_path = _save(tmp_path, "page.jpg")
+    vlm_engine = RecordingVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", **image_format)
+    result = ocr.sequential_ocr(str(image_path))[0]
+
+    status = result.get_page(0)["image_processing_status"]
+    assert ("passthrough" in status) == passthrough
+    assert (vlm_engine.images[0].data == image_path.read_bytes()) == passthrough
+
+
+def test_preprocessing_disables_passthrough(tmp_path):
+    image_path = _save(tmp_path, "page.png")
+    vlm_engine = RecordingVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text")
+    result = ocr.sequential_ocr(str(image_path), crop_margins=True)[0]
+    assert "passthrough" not in result.get_page(0)["image_processing_status"]
+
+
+def test_passthrough_in_concurrent_ocr(tmp_path):
+    image_path = _save(tmp_path, "page.png")
+    vlm_engine = RecordingVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text")
+
+    async def _collect():
+        return [result async for result in ocr.concurrent_ocr(str(image_path), concurrent_batch_size=1)]
+    result = asyncio.run(_collect())[0]
+
+    assert result.get_page(0)["image_processing_status"]["passthrough"] == {"status": "success", "mime_type": "image/png"}
+    assert vlm_engine.images[0].data == image_path.read_bytes()
+
+
+def test_large_file_is_decoded_for_tiling(tmp_path):
+    image_path = _save(tmp_path, "page.png", size=(800, 2400))
+    vlm_engine = RecordingVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", tiling=TilingConfig(tile_size_pixels=1000))
+    result = ocr.sequential_ocr(str(image_path))[0]
+
+    assert "passthrough" not in result.get_page(0)["image_processing_status"]
+    assert len(vlm_engine.images) > 1
+    assert all(max(Image.open(io.BytesIO(image.data)).size) <= 1000 for image in vlm_engine.images)
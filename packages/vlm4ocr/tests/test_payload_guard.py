@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine, PackingConfig
+from vlm4ocr.utils import ImageEncoder
+from .conftest import FakeVLMEngine
+
+
+def _noise_image(size:int=600) -> Image.Image:
+    return Image.effect_noise((size, size), 100).convert("RGB")
+
+
+@pytest.fixture
+def limited_vlm_engine():
+    def _make(max_image_payload_bytes):
+        vlm_engine = FakeVLMEngine()
+        vlm_engine.max_image_payload_bytes = max_image_payload_bytes
+        return vlm_engine
+    return _make
+
+
+def test_images_within_limit_are_sent_as_they_are(limited_vlm_engine):
+    encoded = ImageEncoder(format="jpeg").encode(_noise_image())
+    vlm_engine = limited_vlm_engine(encoded.base64_size * 2)
+    encoded_images, infos = vlm_engine.fit_images_to_payload([encoded])
+    assert encoded_images[0] is encoded
+    assert infos[0]["steps"] == []
+
+
+def test_encoded_image_over_limit_is_recompressed_in_its_format(limited_vlm_engine):
+    encoded = ImageEncoder(format="jpeg", quality=95).encode(_noise_image())
+    vlm_engine = limited_vlm_engine(encoded.base64_size // 2)
+    recompressed = vlm_engine.encode_image(encoded)
+    assert recompressed.mime_type == "image/jpeg"
+    assert recompressed.base64_size <= encoded.base64_size // 2
+
+
+def test_total_size_of_a_message_is_limited(limited_vlm_engine):
+    # Each image fits on its own, but not together
+    encoder = ImageEncoder(format="jpeg", quality=95)
+    images = [encoder.encode(_noise_image()), encoder.encode(_noise_image()), _noise_image()]
+    max_size = max(image.base64_size for image in images[:2]) + 1000
+    vlm_engine = limited_vlm_engine(max_size)
+
+    encoded_images, infos = vlm_engine.fit_images_to_payload(images, encoder=ImageEncoder(format="jpeg"))
+    assert sum(encoded.base64_size for encoded in encoded_images) <= max_size
+    for encoded, info in zip(encoded_images, infos):
+        assert info["steps"]
+        assert info["final_size"] == encoded.base64_size < info["original_size"]
+
+
+def test_image_that_cannot_fit_raises(limited_vlm_engine):
+    with pytest.raises(ValueError):
+        limited_vlm_engine(100).encode_image(_noise_image())
+
+
+def test_recompression_of_a_pack_is_recorded(limited_vlm_engine):
+    encoder = ImageEncoder(format="jpeg", quality=95)
+    pack = [(i, encoder.encode(_noise_image()), {}, None) for i in range(2)]
+    vlm_engine = limited_vlm_engine(pack[0][1].base64_size)
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", packing=PackingConfig(max_pages=2, max_pixels=10**7))
+
+    ocr._get_pack_messages(pack)
+    for _, _, image_processing_status, _ in pack:
+        assert image_processing_status["payload_size_guard"]["status"] == "success"
+        assert image_processing_status["payload_size_guard"]["steps"]
+
+
+def test_packs_stay_within_payload_limit(limited_vlm_engine, tmp_path):
+    # Two pages that fit in the limit one at a time, but not together, are not packed
+    file_path = tmp_path / "pages.tif"
+    pages = [_noise_image(300) for _ in range(2)]
+    pages[0].save(file_path, format="TIFF", save_all=True, append_images=pages[1:])
+    page_size = ImageEncoder().encode(pages[0]).base64_size
+    vlm_engine = limited_vlm_engine(int(page_size * 1.5))
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", packing=PackingConfig(max_pages=2, max_pixels=10**7))
+
+    async def _collect():
+        return [result async for result in ocr.concurrent_ocr(str(file_path), concurrent_batch_size=2)]
+    result = asyncio.run(_collect())[0]
+
+    assert result.status == "success"
+    assert [message[0]["num_images"] for message in vlm_engine.messages] == [1, 1]
+    for page in result:
+        assert "payload_size_guard" not in page["image_processing_status"]
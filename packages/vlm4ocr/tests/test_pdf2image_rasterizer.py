@@ -0,0 +1,67 @@
+import os
+import shutil
+import pytest
+from vlm4ocr.utils import Pdf2ImageRasterizer, PDFDataLoader
+from .conftest import make_pdf
+
+pytestmark = pytest.mark.skipif(shutil.which("pdftoppm") is None or shutil.which("pdfinfo") is None,
+                                reason="poppler is not installed")
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(make_pdf([f"Page {i}" for i in range(7)]))
+    return str(file_path)
+
+
+def test_render_page_range(pdf_path):
+    rasterizer = Pdf2ImageRasterizer(pdf_path, dpi=72)
+    assert rasterizer.get_page_count() == 7
+    images = rasterizer.render_pages(2, 4)
+    assert len(images) == 3
+    assert all(image.size == (612, 792) for image in images)
+
+
+def test_render_page_range_to_files(pdf_path, tmp_path):
+    output_folder = tmp_path / "spool"
+    output_folder.mkdir()
+    paths = Pdf2ImageRasterizer(pdf_path, dpi=72).render_pages_to_files(0, 2, output_folder=str(output_folder), fmt="png")
+    assert len(paths) == 3
+    assert all(os.path.isfile(path) and os.path.dirname(path) == str(output_folder) for path in paths)
+
+
+def test_pdf_bytes_are_read_from_a_temporary_file(pdf_path):
+    with open(pdf_path, "rb") as f:
+        rasterizer = Pdf2ImageRasterizer("doc.pdf", dpi=72, file_bytes=f.read())
+    temp_path = rasterizer.pdf_path
+    assert os.path.isfile(temp_path)
+    assert rasterizer.get_page_count() == 7
+    rasterizer.close()
+    assert not os.path.exists(temp_path)
+
+
+@pytest.mark.parametrize("page_batch_size", [1, 3, 8])
+def test_loader_pages_match_single_page_rendering(pdf_path, page_batch_size):
+    with PDFDataLoader(pdf_path, page_batch_size=page_batch_size) as data_loader:
+        # Out of order, so that pages are taken from the cache of a rendered batch
+        pages = {page_index: data_loader.get_page(page_index) for page_index in [4, 0, 6, 5, 1, 3, 2]}
+    with PDFDataLoader(pdf_path, page_batch_size=1) as data_loader:
+        for page_index, page in pages.items():
+            assert page.tobytes() == data_loader.get_page(page_index).tobytes()
+
+
+def test_loader_get_all_pages(pdf_path):
+    with PDFDataLoader(pdf_path, page_batch_size=3) as data_loader:
+        assert len(data_loader.get_all_pages()) == 7
+
+
+def test_spooled_pages_are_removed(pdf_path, tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    with PDFDataLoader(pdf_path, page_batch_size=4, spool=True, spool_dir=str(spool_dir)) as data_loader:
+        data_loader.get_page(0)
+        # The other pages of the batch wait on disk
+        assert sum(len(files) for _, _, files in os.walk(spool_dir)) == 3
+        assert all(data_loader.get_page(page_index).size == data_loader.get_page(0).size for page_index in [1, 2, 3])
+    assert os.listdir(spool_dir) == []
@@ -0,0 +1,75 @@
+import concurrent.futures
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import PDFDataLoader, PDFRasterizer
+from .conftest import make_pdf
+
+pypdfium2 = pytest.importorskip("pypdfium2")
+from vlm4ocr.utils import PdfiumRasterizer
+
+
+@pytest.fixture
+def pdf_bytes():
+    return make_pdf([f"Page {i}" for i in range(5)], page_sizes=[(612, 792)] * 4 + [(792, 612)])
+
+
+@pytest.fixture
+def pdf_path(tmp_path, pdf_bytes):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(pdf_bytes)
+    return str(file_path)
+
+
+def test_render_page_range(pdf_path):
+    rasterizer = PdfiumRasterizer(pdf_path)
+    assert rasterizer.get_page_count() == 5
+    images = rasterizer.render_pages(2, 4)
+    # 200 dpi, like pdf2image
+    assert [image.size for image in images] == [(1700, 2200), (1700, 2200), (2200, 1700)]
+    assert all(image.mode == "RGB" for image in images)
+    rasterizer.close()
+
+
+def test_render_grayscale_from_bytes(pdf_bytes):
+    rasterizer = PdfiumRasterizer("doc.pdf", dpi=72, grayscale=True, file_bytes=pdf_bytes)
+    image = rasterizer.render_pages(0, 0)[0]
+    assert image.mode == "L" and image.size == (612, 792)
+    rasterizer.close()
+
+
+def test_loader_pages_from_threads(pdf_path):
+    # pdfium is not thread-safe, the rasterizer serializes the calls
+    with PDFDataLoader(pdf_path, rasterizer="pdfium") as data_loader:
+        assert data_loader.get_page_count() == 5
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            pages = list(executor.map(data_loader.get_page, [0, 1, 2, 3, 4] * 2))
+        assert [page.size for page in pages[:5]] == [(1700, 2200)] * 4 + [(2200, 1700)]
+        assert len(data_loader.get_all_pages()) == 5
+
+
+def test_custom_rasterizer_class(pdf_path):
+    class BlankRasterizer(PDFRasterizer):
+        def get_page_count(self):
+            return 2
+
+        def render_pages(self, first_page_index, last_page_index):
+            return [Image.new("RGB", (10, 10), "white") for _ in range(first_page_index, last_page_index + 1)]
+
+    with PDFDataLoader(pdf_path, rasterizer=BlankRasterizer) as data_loader:
+        assert data_loader.get_page_count() == 2
+        assert data_loader.get_page(1).size == (10, 10)
+
+
+def test_unknown_rasterizer_is_rejected(pdf_path, fake_vlm_engine):
+    with pytest.raises(ValueError):
+        PDFDataLoader(pdf_path, rasterizer="ghostscript")
+    with pytest.raises(ValueError):
+        OCREngine(vlm_engine=fake_vlm_engine, pdf_rasterizer="ghostscript")
+
+
+def test_ocr_engine_with_pdfium(pdf_path, fake_vlm_engine):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", pdf_rasterizer="pdfium")
+    result = ocr.sequential_ocr(pdf_path)[0]
+    assert result.status == "success"
+    assert len(result) == 5
@@ -0,0 +1,43 @@
+import asyncio
+import copy
+import pickle
+from PIL import Image
+from vlm4ocr import OCREngine, TilingConfig
+from vlm4ocr.ocr_engines import _PreprocessWorkerOCREngine
+from .conftest import FakeVLMEngine
+
+
+def test_copied_engine_keeps_its_vlm_engine(fake_vlm_engine):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", preprocess_processes=2)
+    assert copy.copy(ocr).vlm_engine is fake_vlm_engine
+    assert isinstance(copy.deepcopy(ocr).vlm_engine, FakeVLMEngine)
+    assert isinstance(pickle.loads(pickle.dumps(ocr)).vlm_engine, FakeVLMEngine)
+
+
+def test_worker_config_has_settings_and_payload_limit(fake_vlm_engine):
+    fake_vlm_engine.max_image_payload_bytes = 50_000
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", image_format="jpeg", tiling=TilingConfig(tile_size_pixels=1000))
+    config = pickle.loads(pickle.dumps(ocr._get_preprocess_worker_config()))
+
+    assert "vlm_engine" not in config.settings
+    worker_engine = _PreprocessWorkerOCREngine(config)
+    assert worker_engine.vlm_engine is None
+    assert worker_engine._get_max_image_payload_bytes() == 50_000
+    assert worker_engine.tiling == TilingConfig(tile_size_pixels=1000)
+    assert worker_engine.image_encoder.format == ocr.image_encoder.format
+
+
+def test_worker_processes_apply_payload_limit(tmp_path):
+    # A noisy page whose PNG is far over the payload limit is recompressed in the worker process
+    image_path = tmp_path / "noise.png"
+    Image.effect_noise((1200, 1200), 100).convert("RGB").save(image_path)
+    vlm_engine = FakeVLMEngine()
+    vlm_engine.max_image_payload_bytes = 200_000
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", preprocess_processes=1)
+
+    async def _collect():
+        return [result async for result in ocr.concurrent_ocr(str(image_path), concurrent_batch_size=1)]
+    result = asyncio.run(_collect())[0]
+
+    assert result.status == "success"
+    assert result.get_page(0)["image_processing_status"]["payload_size_guard"]["status"] == "success"
@@ -0,0 +1,68 @@
+import importlib.util
+import shutil
+import pytest
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import PDFDataLoader, PDFRasterizer
+from .conftest import make_pdf
+
+RASTERIZERS = [
+    pytest.param("pdf2image", marks=pytest.mark.skipif(shutil.which("pdfinfo") is None or shutil.which("pdftoppm") is None,
+                                                       reason="poppler is not installed")),
+    pytest.param("pdfium", marks=pytest.mark.skipif(importlib.util.find_spec("pypdfium2") is None,
+                                                    reason="pypdfium2 is not installed")),
+]
+
+# Letter, A4, a long receipt and a landscape page
+PAGE_SIZES = [(612, 792), (595, 842), (226, 2000), (792, 612)]
+
+
+class _Rasterizer(PDFRasterizer):
+    def get_page_count(self):
+        return 0
+
+    def render_pages(self, first_page_index, last_page_index):
+        return []
+
+
+@pytest.mark.parametrize("max_dimension_pixels, page_size, expected_dpi", [
+    (None, (612, 792), 200),
+    (4000, (612, 792), 200),           # fits at the configured resolution
+    (1000, (612, 792), 999.5 * 72 / 792),
+    (1000, (792, 612), 999.5 * 72 / 792),
+    (1000, (0, 0), 200),
+])
+def test_render_dpi(max_dimension_pixels, page_size, expected_dpi):
+    rasterizer = _Rasterizer("doc.pdf", dpi=200, max_dimension_pixels=max_dimension_pixels)
+    assert rasterizer.get_render_dpi(*page_size) == pytest.approx(expected_dpi)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(make_pdf([f"Page {i}" for i in range(len(PAGE_SIZES))], page_sizes=PAGE_SIZES))
+    return str(file_path)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+@pytest.mark.parametrize("max_dimension_pixels", [500, 1000, 1999])
+def test_pages_are_rendered_within_limit(pdf_path, rasterizer, max_dimension_pixels):
+    with PDFDataLoader(pdf_path, rasterizer=rasterizer, page_batch_size=4, max_dimension_pixels=max_dimension_pixels) as data_loader:
+        for page_index, (width, height) in enumerate(PAGE_SIZES):
+            image = data_loader.get_page(page_index)
+            # The longest side is rendered at the limit (give or take the rounding in the backend)
+            assert max_dimension_pixels - 2 <= max(image.size) <= max_dimension_pixels
+            assert image.size[0] / image.size[1] == pytest.approx(width / height, rel=0.01)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_large_limit_keeps_the_resolution(pdf_path, rasterizer):
+    with PDFDataLoader(pdf_path, rasterizer=rasterizer, max_dimension_pixels=10000) as data_loader:
+        assert data_loader.get_page(0).size == (1700, 2200)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_rendered_pages_need_no_resizing(pdf_path, rasterizer, fake_vlm_engine):
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text", pdf_rasterizer=rasterizer)
+    result = ocr.sequential_ocr(pdf_path, max_dimension_pixels=1000)[0]
+    assert result.status == "success"
+    assert [page["image_processing_status"]["resize"]["resized"] for page in result] == [False] * len(PAGE_SIZES)
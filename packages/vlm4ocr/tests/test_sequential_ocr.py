@@ -0,0 +1,44 @@
+import pytest
+from PIL import Image
+from vlm4ocr import OCREngine
+from .conftest import FakeVLMEngine
+
+
+class FailingVLMEngine(FakeVLMEngine):
+    """ A VLM engine that raises on the given calls (1-based). """
+    def __init__(self, failing_calls):
+        super().__init__()
+        self.failing_calls = set(failing_calls)
+
+    def chat(self, messages, verbose=False, stream=False):
+        response = super().chat(messages, verbose=verbose, stream=stream)
+        if len(self.messages) in self.failing_calls:
+            raise RuntimeError("server error")
+        return response
+
+
+@pytest.fixture
+def two_page_tiff(tmp_path):
+    file_path = tmp_path / "pages.tif"
+    pages = [Image.new("RGB", (200, 300), "white") for _ in range(2)]
+    pages[0].save(file_path, format="TIFF", save_all=True, append_images=pages[1:])
+    return str(file_path)
+
+
+def test_page_failing_partway_marks_the_file_as_failed(two_page_tiff):
+    ocr = OCREngine(vlm_engine=FailingVLMEngine(failing_calls=[2]), output_mode="text")
+    result = ocr.sequential_ocr(two_page_tiff)[0]
+
+    assert result.status == "error"
+    assert len(result) == 2
+    assert result.get_page(0)["text"] == "page text"
+    assert "server error" in result.get_page(1)["text"]
+
+
+def test_page_failure_does_not_affect_the_next_file(two_page_tiff, tmp_path):
+    image_path = tmp_path / "page.png"
+    Image.new("RGB", (200, 300), "white").save(image_path)
+    ocr = OCREngine(vlm_engine=FailingVLMEngine(failing_calls=[1]), output_mode="text")
+    results = ocr.sequential_ocr([two_page_tiff, str(image_path)])
+
+    assert [result.status for result in results] == ["error", "success"]
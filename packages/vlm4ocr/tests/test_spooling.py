@@ -0,0 +1,28 @@
+import warnings
+import pytest
+from vlm4ocr import OCREngine, SpoolConfig
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"pdf_rasterizer": "pdfium"},
+    {"pdf_page_batch_size": 1},
+    {"preprocess_processes": 2},
+])
+def test_spool_without_batch_rendering_warns(fake_vlm_engine, kwargs):
+    if kwargs.get("pdf_rasterizer") == "pdfium":
+        pytest.importorskip("pypdfium2")
+    with pytest.warns(UserWarning, match="spool"):
+        OCREngine(fake_vlm_engine, spool=SpoolConfig(), **kwargs)
+
+
+def test_spool_with_batch_rendering_does_not_warn(fake_vlm_engine):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        OCREngine(fake_vlm_engine, pdf_page_batch_size=8, spool=SpoolConfig())
+        OCREngine(fake_vlm_engine, pdf_page_batch_size=1)
+
+
+def test_spool_dir_must_exist(tmp_path):
+    assert SpoolConfig(spool_dir=str(tmp_path)).spool_dir == str(tmp_path)
+    with pytest.raises(ValueError):
+        SpoolConfig(spool_dir=str(tmp_path / "missing"))
@@ -0,0 +1,48 @@
+import time
+from PIL import Image
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import DataLoader
+
+
+class SlowDataLoader(DataLoader):
+    """ A data loader of blank pages that takes a while to load each page and records page loads after close(). """
+    def __init__(self, file_path:str, page_count:int=5):
+        self.file_path = file_path
+        self.file_bytes = None
+        self.page_count = page_count
+        self.closed = False
+        self.loads_after_close = 0
+
+    def get_all_pages(self):
+        return [self.get_page(i) for i in range(self.page_count)]
+
+    def get_page(self, page_index:int) -> Image.Image:
+        time.sleep(0.05)
+        if self.closed:
+            self.loads_after_close += 1
+        return Image.new("RGB", (64, 64), "white")
+
+    async def get_page_async(self, page_index:int) -> Image.Image:
+        return self.get_page(page_index)
+
+    def get_page_count(self) -> int:
+        return self.page_count
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_ocr_stops_read_ahead_before_closing_the_loader(fake_vlm_engine, monkeypatch, tmp_path):
+    image_path = tmp_path / "doc.png"
+    Image.new("RGB", (64, 64), "white").save(image_path)
+    data_loader = SlowDataLoader(str(image_path))
+    ocr = OCREngine(vlm_engine=fake_vlm_engine, output_mode="text")
+    monkeypatch.setattr(ocr, "_get_data_loader", lambda *args, **kwrs: data_loader)
+
+    stream = ocr.stream_ocr(str(image_path), read_ahead=True)
+    assert next(stream)["type"] == "ocr_chunk"
+    # The consumer stops after the first chunk, while the next page is being read ahead
+    stream.close()
+    time.sleep(0.2)
+    assert data_loader.closed
+    assert data_loader.loads_after_close == 0
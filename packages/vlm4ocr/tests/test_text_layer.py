@@ -0,0 +1,60 @@
+import importlib.util
+import shutil
+import pytest
+from vlm4ocr import OCREngine
+from vlm4ocr.utils import PDFDataLoader
+from .conftest import FakeVLMEngine, make_pdf
+
+RASTERIZERS = [
+    pytest.param("pdf2image", marks=pytest.mark.skipif(shutil.which("pdftotext") is None or shutil.which("pdftoppm") is None,
+                                                       reason="poppler is not installed")),
+    pytest.param("pdfium", marks=pytest.mark.skipif(importlib.util.find_spec("pypdfium2") is None,
+                                                    reason="pypdfium2 is not installed")),
+]
+
+BORN_DIGITAL_TEXT = "\n".join(f"Line {i} of a born-digital report with a usable text layer." for i in range(5))
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(make_pdf([BORN_DIGITAL_TEXT,   # usable text layer
+                                    "",                  # no text layer (e.g., a scanned page)
+                                    "Page 3",            # too short
+                                    "#$%& *+=@ " * 20])) # garbled
+    return str(file_path)
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_usable_text_layers_are_returned(pdf_path, rasterizer):
+    with PDFDataLoader(pdf_path, rasterizer=rasterizer, use_text_layer=True) as data_loader:
+        text = data_loader.get_page_text(0)
+        assert text is not None
+        assert "Line 0 of a born-digital report" in text and "Line 4" in text
+        assert [data_loader.get_page_text(page_index) for page_index in [1, 2, 3]] == [None, None, None]
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_text_layer_thresholds(pdf_path, rasterizer):
+    with PDFDataLoader(pdf_path, rasterizer=rasterizer, use_text_layer=True,
+                       text_layer_min_chars=4, text_layer_min_alnum_ratio=0.0) as data_loader:
+        assert data_loader.get_page_text(2) is not None
+        assert data_loader.get_page_text(3) is not None
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_text_layer_is_off_by_default(pdf_path, rasterizer):
+    with PDFDataLoader(pdf_path, rasterizer=rasterizer) as data_loader:
+        assert data_loader.get_page_text(0) is None
+
+
+@pytest.mark.parametrize("rasterizer", RASTERIZERS)
+def test_text_layer_pages_skip_the_vlm(pdf_path, rasterizer):
+    vlm_engine = FakeVLMEngine()
+    ocr = OCREngine(vlm_engine=vlm_engine, output_mode="text", pdf_rasterizer=rasterizer, pdf_text_layer=True)
+    result = ocr.sequential_ocr(pdf_path)[0]
+
+    assert result.status == "success"
+    assert [page["source"] for page in result] == ["text_layer", "vlm", "vlm", "vlm"]
+    assert result.num_text_layer_pages == 1
+    assert len(vlm_engine.messages) == 3
@@ -0,0 +1,102 @@
+import pytest
+from PIL import Image
+from vlm4ocr.utils import ImageProcessor, stitch_tile_texts
+
+
+@pytest.fixture
+def image_processor():
+    return ImageProcessor()
+
+
+@pytest.mark.parametrize("size, tile_size_pixels, expected_grid", [
+    ((800, 3000), 1000, (4, 1)),    # long receipt: one column
+    ((1000, 3000), 1000, (4, 1)),
+    ((8000, 3000), 1000, (4, 9)),   # engineering drawing: rows and columns
+    ((40000, 600), 1000, (1, 45)),  # very wide page: one row
+])
+def test_split_into_tiles_keeps_tiles_within_tile_size(image_processor, size, tile_size_pixels, expected_grid):
+    image = Image.new("L", size, 255)
+    tiles, boxes, grid = image_processor.split_into_tiles(image, tile_size_pixels=tile_size_pixels, overlap=0.1)
+    assert grid == expected_grid
+    assert len(tiles) == grid[0] * grid[1]
+    assert all(tile.size == (min(size[0], tile_size_pixels), min(size[1], tile_size_pixels)) for tile in tiles)
+    # The tiles cover the page, and adjacent tiles overlap by at least 10% of the tile size in both directions
+    rows, cols = grid
+    assert boxes[0][:2] == (0, 0) and boxes[-1][2:] == size
+    min_overlap = round(tile_size_pixels * 0.1)
+    for r in range(rows):
+        for c in range(cols):
+            left, upper, right, lower = boxes[r * cols + c]
+            if c + 1 < cols:
+                assert right - boxes[r * cols + c + 1][0] >= min_overlap
+            if r + 1 < rows:
+                assert lower - boxes[(r + 1) * cols + c][1] >= min_overlap
+
+
+def test_split_into_tiles_small_page_is_one_tile(image_processor):
+    image = Image.new("L", (600, 900), 255)
+    tiles, boxes, grid = image_processor.split_into_tiles(image, tile_size_pixels=1000)
+    assert grid == (1, 1) and boxes == [(0, 0, 600, 900)]
+
+
+def _ocr_tiles(boxes, words, cell_width, line_height):
+    """ The "OCR" of a tile is the words that lie in it completely, line by line. """
+    texts = []
+    for left, upper, right, lower in boxes:
+        tile_lines = []
+        for i, line_words in enumerate(words):
+            if upper <= i * line_height and (i + 1) * line_height <= lower:
+                tile_lines.append(" ".join(word for j, word in enumerate(line_words) 
+                                           if left <= j * cell_width and (j + 1) * cell_width <= right))
+        texts.append("\n".join(tile_lines))
+    return texts
+
+
+def test_split_and_stitch_recovers_each_line_once(image_processor):
+    # A long receipt of 40 text lines, 60 px apart
+    line_height, num_lines = 60, 40
+    words = [f"Line {i:02d} of the long receipt".split() for i in range(num_lines)]
+    image = Image.new("L", (480, line_height * num_lines), 255)
+    tiles, boxes, (rows, cols) = image_processor.split_into_tiles(image, tile_size_pixels=500, overlap=0.2)
+    assert rows > 1 and cols == 1
+
+    texts = _ocr_tiles(boxes, words, cell_width=80, line_height=line_height)
+    assert stitch_tile_texts(texts, rows=rows, cols=cols) == "\n".join(" ".join(line_words) for line_words in words)
+
+
+def test_split_and_stitch_wide_page_recovers_each_word_once(image_processor):
+    # A wide spreadsheet of 12 rows of 16 cells (100 x 60 px each), split into rows and columns of tiles
+    cell_width, line_height = 100, 60
+    words = [[f"r{i:02d}c{j:02d}" for j in range(16)] for i in range(12)]
+    image = Image.new("L", (cell_width * 16, line_height * 12), 255)
+    tiles, boxes, (rows, cols) = image_processor.split_into_tiles(image, tile_size_pixels=500, overlap=0.2)
+    assert rows > 1 and cols > 1
+    assert all(max(tile.size) <= 500 for tile in tiles)
+
+    texts = _ocr_tiles(boxes, words, cell_width=cell_width, line_height=line_height)
+    assert stitch_tile_texts(texts, rows=rows, cols=cols) == "\n".join(" ".join(line_words) for line_words in words)
+
+
+def test_stitch_tile_texts_2x2_grid_joins_rows_left_to_right():
+    # Row-major tiles of a wide table. Lines continue from the left to the right tile with one word repeated 
+    # in the horizontal overlap, and one line is repeated in the vertical overlap of each column.
+    texts = [
+        "Invoice number 1234\nItem widget",            # row 0, col 0
+        "1234 issued today\nwidget 3 units",          # row 0, col 1
+        "Item widget\nTotal amount",                  # row 1, col 0
+        "widget 3 units\namount 42 dollars",          # row 1, col 1
+    ]
+    assert stitch_tile_texts(texts, rows=2, cols=2) == (
+        "Invoice number 1234 issued today\nItem widget 3 units\nTotal amount 42 dollars"
+    )
+
+
+def test_stitch_tile_texts_joins_unmatched_tiles_as_blocks():
+    # Tiles whose lines cannot be matched up are kept whole, in reading order
+    texts = ["First paragraph\nof the left tile", "A caption"]
+    assert stitch_tile_texts(texts, rows=1, cols=2) == "First paragraph\nof the left tile\n\nA caption"
+
+
+def test_stitch_tile_texts_checks_the_number_of_tiles():
+    with pytest.raises(ValueError):
+        stitch_tile_texts(["a", "b", "c"], rows=2, cols=2)
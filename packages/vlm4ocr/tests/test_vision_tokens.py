@@ -0,0 +1,80 @@
+import pytest
+from PIL import Image
+from vlm4ocr.utils import ImageProcessor, VISION_TOKEN_PROFILES
+
+# (profile, page size, max_image_tokens, fitted size, image tokens of the fitted size)
+FIT_CASES = [
+    # OpenAI high detail: fit in 2048 x 2048, then shortest side 768. 85 tokens plus 170 per 512-px tile.
+    ("openai_high", (2550, 3300), None, (768, 994), 765),      # Letter at 300 dpi, 2 x 2 tiles
+    ("openai_high", (1240, 1754), None, (768, 1086), 1105),    # A4 at 150 dpi, 2 x 3 tiles
+    ("openai_high", (1240, 1754), 765, (724, 1024), 765),      # Shrunk to 2 x 2 tiles
+    ("openai_high", (4960, 7016), 500, (512, 724), 425),       # Shrunk to 1 x 2 tiles
+    ("openai_high", (800, 600), 500, (682, 512), 425),         # Landscape
+    ("openai_high", (300, 200), 500, (300, 200), 255),         # Small images are not upscaled
+    # Qwen-VL: one token per 28-px cell. smart_resize rounds the sides to the nearest multiple of 28, 
+    # within 3136 to 12845056 pixels.
+    ("qwen_vl", (2550, 3300), None, (2548, 3304), 10738),      # 91 x 118 cells, the height is rounded up
+    ("qwen_vl", (4960, 7016), None, (2996, 4256), 16264),      # Downscaled to max_pixels, floored to the grid
+    ("qwen_vl", (2550, 3300), 1000, (756, 1008), 972),
+    ("qwen_vl", (1240, 1754), 765, (644, 924), 759),
+    ("qwen_vl", (800, 600), 500, (728, 532), 494),
+    ("qwen_vl", (300, 200), 500, (308, 196), 77),              # Within budget, rounded like the server
+    ("qwen_vl", (40, 30), None, (84, 56), 6),                  # Upscaled to min_pixels like the server
+]
+
+
+@pytest.mark.parametrize("profile_name, size, max_image_tokens, expected_size, expected_tokens", FIT_CASES)
+def test_fit(profile_name, size, max_image_tokens, expected_size, expected_tokens):
+    profile = VISION_TOKEN_PROFILES[profile_name]
+    fitted_size = profile.fit(*size, max_image_tokens=max_image_tokens)
+
+    assert fitted_size == expected_size
+    assert profile.count_tokens(*fitted_size) == expected_tokens
+    if max_image_tokens is not None:
+        assert expected_tokens <= max_image_tokens
+    if profile.snap_to_grid:
+        # The server keeps the fitted size as it is
+        assert profile._smart_resize(*fitted_size) == fitted_size
+    else:
+        # Never upscaled, and the aspect ratio is kept up to the grid
+        assert fitted_size[0] <= size[0] and fitted_size[1] <= size[1]
+        assert fitted_size[0] / fitted_size[1] == pytest.approx(size[0] / size[1], rel=0.05)
+
+
+@pytest.mark.parametrize("profile_name, size, expected_tokens", [
+    ("openai_high", (512, 512), 255),
+    ("openai_high", (513, 512), 425),
+    ("openai_high", (2550, 3300), 765),
+    ("qwen_vl", (56, 56), 4),
+    ("qwen_vl", (28, 28), 4),          # Upscaled to min_pixels
+    ("qwen_vl", (10, 10), 4),
+    ("qwen_vl", (55, 97), 6),          # Rounded to 56 x 84, not floored to 28 x 84
+    ("qwen_vl", (2550, 3300), 10738),
+])
+def test_count_tokens(profile_name, size, expected_tokens):
+    assert VISION_TOKEN_PROFILES[profile_name].count_tokens(*size) == expected_tokens
+
+
+@pytest.mark.parametrize("profile_name, min_tokens", [("openai_high", 255), ("qwen_vl", 4)])
+def test_fit_rejects_budget_below_smallest_image(profile_name, min_tokens):
+    profile = VISION_TOKEN_PROFILES[profile_name]
+    with pytest.raises(ValueError):
+        profile.fit(2550, 3300, max_image_tokens=min_tokens - 1)
+    assert profile.count_tokens(*profile.fit(2550, 3300, max_image_tokens=min_tokens)) == min_tokens
+
+
+@pytest.mark.parametrize("profile_name, size, max_image_tokens, expected_size, expected_tokens", FIT_CASES)
+def test_resize_to_token_grid(profile_name, size, max_image_tokens, expected_size, expected_tokens):
+    image = Image.new("RGB", size, "white")
+    resized, was_resized, image_tokens = ImageProcessor().resize_to_token_grid(image, profile_name, max_image_tokens=max_image_tokens)
+
+    assert resized.size == expected_size
+    assert was_resized == (expected_size != size)
+    assert image_tokens == expected_tokens
+    if not was_resized:
+        assert resized is image
+
+
+def test_resize_to_token_grid_rejects_unknown_profile():
+    with pytest.raises(ValueError):
+        ImageProcessor().resize_to_token_grid(Image.new("RGB", (100, 100)), "unknown")
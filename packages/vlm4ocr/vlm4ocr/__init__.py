@@ -1,11 +1,19 @@
 from .ocr_engines import OCREngine
+from .data_types import SpoolConfig, BlankPageConfig, TilingConfig, PackingConfig
 from .vlm_engines import BasicVLMConfig, OpenAIReasoningVLMConfig, OllamaVLMEngine, OpenAIVLMEngine, AzureOpenAIVLMEngine
+from .utils import EventLoopLagMonitor, AdaptiveConcurrencyLimiter
 
 __all__ = [
     "BasicVLMConfig",
     "OpenAIReasoningVLMConfig",
     "OCREngine",
+    "SpoolConfig",
+    "BlankPageConfig",
+    "TilingConfig",
+    "PackingConfig",
     "OllamaVLMEngine",
     "OpenAIVLMEngine",
-    "AzureOpenAIVLMEngine"
+    "AzureOpenAIVLMEngine",
+    "EventLoopLagMonitor",
+    "AdaptiveConcurrencyLimiter"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 import argparse
 import os
+import re
 import sys
 import logging
 import asyncio
@@ -9,12 +10,14 @@ import time
 try:
     from .ocr_engines import OCREngine
     from .vlm_engines import OpenAIVLMEngine, AzureOpenAIVLMEngine, OllamaVLMEngine, BasicVLMConfig
-    from .data_types import OCRResult
+    from .data_types import OCRResult, SpoolConfig, BlankPageConfig, TilingConfig, PackingConfig
+    from .utils import is_archive, SUPPORTED_ARCHIVE_EXTS, EventLoopLagMonitor, AdaptiveConcurrencyLimiter
 except ImportError:
     # Fallback for when the package is installed
     from vlm4ocr.ocr_engines import OCREngine
     from vlm4ocr.vlm_engines import OpenAIVLMEngine, AzureOpenAIVLMEngine, OllamaVLMEngine, BasicVLMConfig
-    from vlm4ocr.data_types import OCRResult
+    from vlm4ocr.data_types import OCRResult, SpoolConfig, BlankPageConfig, TilingConfig, PackingConfig
+    from vlm4ocr.utils import is_archive, SUPPORTED_ARCHIVE_EXTS, EventLoopLagMonitor, AdaptiveConcurrencyLimiter
 
 import tqdm.asyncio
 
@@ -29,13 +32,50 @@ logger = logging.getLogger("vlm4ocr_cli")
 SUPPORTED_IMAGE_EXTS_CLI = ['.pdf', '.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp']
 OUTPUT_EXTENSIONS = {'markdown': '.md', 'HTML':'.html', 'text':'.txt'}
 
+def is_supported_input(file_path):
+    """Returns True if the file is a supported image/PDF/TIFF file or a zip/tar archive of them."""
+    return os.path.splitext(file_path)[1].lower() in SUPPORTED_IMAGE_EXTS_CLI or is_archive(file_path)
+
+def split_archive_member_path(input_file_path):
+    """
+    Splits the input path of an archive member (archive path joined with member name) into the archive path and the member name.
+    Returns (None, None) if the path does not point into a supported archive.
+    """
+    for separator in re.finditer(r"[\\/]", input_file_path):
+        archive_path = input_file_path[:separator.start()]
+        if is_archive(archive_path) and not os.path.isdir(archive_path):
+            return archive_path, input_file_path[separator.end():]
+    return None, None
+
+def get_output_basename(input_file_path):
+    """
+    Returns the name an output file is based on. For a regular file, this is its basename.
+    For an archive member, this is the archive name (without the archive extension) and the member's relative path, 
+    joined with underscores, so that members with the same name in different folders do not overwrite each other.
+    Example: "scans.zip/x/001.jpg" -> "scans_x_001.jpg"
+    """
+    archive_path, member_name = split_archive_member_path(input_file_path)
+    if archive_path is None:
+        return os.path.basename(input_file_path)
+
+    archive_name = os.path.basename(archive_path)
+    for archive_ext in sorted(SUPPORTED_ARCHIVE_EXTS, key=len, reverse=True):
+        if archive_name.lower().endswith(archive_ext):
+            archive_name = archive_name[:-len(archive_ext)]
+            break
+    # Drop empty, "." and ".." parts so that the name stays inside the output directory
+    member_parts = [part for part in re.split(r"[\\/]+", member_name) if part not in ("", ".", "..")]
+    return "_".join([archive_name] + member_parts)
+
 def get_output_path_for_ocr_result(input_file_path, specified_output_path_arg, output_mode, num_total_inputs, base_output_dir_if_no_specific_path):
     """
     Determines the full output path for a given OCR result file.
     Output filename format: <original_basename>_ocr.<new_extension>
     Example: input "abc.pdf", output_mode "markdown" -> "abc.pdf_ocr.md"
+    Archive members are named after the archive and their path inside it (see get_output_basename).
+    Example: input "scans.zip/x/001.jpg", output_mode "markdown" -> "scans_x_001.jpg_ocr.md"
     """
-    original_basename = os.path.basename(input_file_path) 
+    original_basename = get_output_basename(input_file_path) 
     output_filename_core = f"{original_basename}_ocr"
     
     output_filename_ext = OUTPUT_EXTENSIONS.get(output_mode, '.txt')
@@ -82,7 +122,7 @@ def main():
     )
 
     io_group = parser.add_argument_group("Input/Output Options")
-    io_group.add_argument("--input_path", required=True, help="Path to a single input file or a directory of files.")
+    io_group.add_argument("--input_path", required=True, help="Path to a single input file, a directory of files, or a zip/tar archive. Archives are read without extraction.")
     io_group.add_argument("--output_mode", choices=["markdown", "HTML", "text"], default="markdown", help="Output format.")
     io_group.add_argument("--output_path", help="Optional: Path to save OCR results. If input_path is a directory of multiple files, this should be an output directory. If input is a single file, this can be a full file path or a directory. If not provided, results are saved to the current working directory (or a sub-directory for logs if --log is used).")
     io_group.add_argument("--skip_existing", action="store_true", help="Skip processing files that already have OCR results in the output directory.")
@@ -98,6 +138,147 @@ def main():
         default=4000,
         help="Maximum dimension (width or height) in pixels for input images. Images larger than this will be resized to fit within this limit while maintaining aspect ratio."
     )
+    image_processing_group.add_argument(
+        "--crop_margins",
+        action="store_true",
+        help="Crop blank margins, scanner bed edges and black borders (with padding) before resizing."
+    )
+    image_processing_group.add_argument(
+        "--skip_blank_pages",
+        action="store_true",
+        help="Detect blank pages (low ink density and variance on a thumbnail) and skip the VLM call for them. Blank pages are written as empty pages."
+    )
+    image_processing_group.add_argument(
+        "--blank_page_max_ink_fraction",
+        type=float,
+        default=0.001,
+        help="Maximum fraction of ink pixels of a blank page for --skip_blank_pages."
+    )
+    image_processing_group.add_argument(
+        "--blank_page_max_std",
+        type=float,
+        default=8.0,
+        help="Maximum gray level standard deviation of a blank page for --skip_blank_pages."
+    )
+    image_processing_group.add_argument(
+        "--blank_page_max_component_pixels",
+        type=int,
+        default=4,
+        help="Maximum size (in pixels of a 512-px thumbnail) of a connected group of ink pixels on a blank page for --skip_blank_pages. Larger groups (e.g., a page number) are content."
+    )
+    image_processing_group.add_argument(
+        "--min_text_height_pixels",
+        type=int,
+        help="Optional: Estimate the text line height of each page and downscale it to the smallest size that keeps text lines at least this many pixels tall."
+    )
+    image_processing_group.add_argument(
+        "--tile_size_pixels",
+        type=int,
+        help="Optional: Split pages whose width or height exceeds this (after --max_dimension_pixels) into overlapping tiles of at most this size on each side. Tiles are OCR'd separately and stitched back into one page. Use with a large --max_dimension_pixels for large-format pages."
+    )
+    image_processing_group.add_argument(
+        "--tile_overlap",
+        type=float,
+        default=0.1,
+        help="Overlap between adjacent tiles for --tile_size_pixels, as a fraction of the tile size."
+    )
+    image_processing_group.add_argument(
+        "--vision_token_profile",
+        choices=["openai_high", "qwen_vl"],
+        help="Optional: Resize images to line up with the vision model's token grid. 'openai_high' uses 512-px tiles (OpenAI high detail), 'qwen_vl' uses 28-px patches (Qwen-VL models)."
+    )
+    image_processing_group.add_argument(
+        "--max_image_tokens",
+        type=int,
+        help="Optional: Image token budget per page for --vision_token_profile. Images are resized to the largest size that fits."
+    )
+
+    image_encoding_group = parser.add_argument_group("Image Encoding Options")
+    image_encoding_group.add_argument(
+        "--image_format",
+        choices=["png", "jpeg", "webp"],
+        default="png",
+        help="Format images are encoded in before they are sent to the VLM. JPEG and WebP are faster to encode and smaller to upload than PNG."
+    )
+    image_encoding_group.add_argument(
+        "--image_quality",
+        type=int,
+        help="Optional: JPEG/WebP quality (1-100). If not provided, Pillow's default is used."
+    )
+    image_encoding_group.add_argument(
+        "--png_compress_level",
+        type=int,
+        help="Optional: PNG compression level (0-9). Lower levels encode faster but produce larger payloads. If not provided, Pillow's default (6) is used."
+    )
+    image_encoding_group.add_argument(
+        "--image_color_mode",
+        choices=["grayscale", "bilevel", "palette"],
+        help="Optional: Convert images before encoding. 'grayscale' is 8-bit gray. 'bilevel' (1-bit) and 'palette' (16 colors) require --image_format png."
+    )
+    image_encoding_group.add_argument(
+        "--max_image_payload_bytes",
+        type=int,
+        help="Optional: Maximum total size of the images in a request (base64 bytes). Larger images are recompressed (lower quality, then smaller dimensions) until they fit."
+    )
+
+    pdf_rendering_group = parser.add_argument_group("PDF Rendering Options")
+    pdf_rendering_group.add_argument(
+        "--pdf_rasterizer",
+        choices=["pdf2image", "pdfium"],
+        default="pdf2image",
+        help="PDF rasterizer backend. 'pdf2image' uses poppler subprocesses. 'pdfium' renders in-process and requires pypdfium2."
+    )
+    pdf_rendering_group.add_argument(
+        "--pdf_page_batch_size",
+        type=int,
+        default=8,
+        help="Number of contiguous PDF pages to rasterize in one poppler call. Larger batches reduce process startup and repeated PDF parsing for long documents."
+    )
+    pdf_rendering_group.add_argument(
+        "--pdf_thread_count",
+        type=int,
+        default=1,
+        help="Number of threads (poppler processes) used to rasterize a batch of PDF pages."
+    )
+
+    pdf_rendering_group.add_argument(
+        "--extract_embedded_images",
+        action="store_true",
+        help="For PDF pages that consist of a single full-page image (e.g., scanner output), extract the embedded image at its native resolution instead of rendering the page."
+    )
+
+    pdf_rendering_group.add_argument(
+        "--pdf_grayscale",
+        action="store_true",
+        help="Render PDF pages in grayscale."
+    )
+
+    pdf_rendering_group.add_argument(
+        "--spool_pages",
+        action="store_true",
+        help="Write rendered PDF pages to a temporary directory as compressed files and decode them only when processed. Keeps memory flat for documents with thousands of pages. Only applies to --pdf_rasterizer pdf2image with --pdf_page_batch_size above 1 and without --preprocess_processes. Otherwise pages are rendered one at a time and are not spooled."
+    )
+    pdf_rendering_group.add_argument(
+        "--spool_dir",
+        help="Optional: Parent directory for spooled pages. If not provided, the system temporary directory is used."
+    )
+    pdf_rendering_group.add_argument(
+        "--pdf_text_layer",
+        action="store_true",
+        help="Use the text layer of born-digital or already OCR'd PDF pages in place of OCR when it passes the quality thresholds. Only other pages are sent to the VLM."
+    )
+    pdf_rendering_group.add_argument(
+        "--text_layer_min_chars",
+        type=int,
+        default=100,
+        help="Minimum number of non-whitespace characters of a usable text layer for --pdf_text_layer."
+    )
+    pdf_rendering_group.add_argument(
+        "--text_layer_min_alnum_ratio",
+        type=float,
+        default=0.5,
+        help="Minimum fraction of letters and digits among the non-whitespace characters of a usable text layer for --pdf_text_layer."
+    )
 
     vlm_engine_group = parser.add_argument_group("VLM Engine Options")
     vlm_engine_group.add_argument("--vlm_engine", choices=["openai", "azure_openai", "ollama", "openai_compatible"], required=True, help="VLM engine.")
@@ -135,6 +316,68 @@ def main():
         default=-1,
         help="Number of input files to pre-load. Set to -1 for automatic config: 2 * concurrent_batch_size."
     )
+    processing_group.add_argument(
+        "--load_workers",
+        type=int,
+        default=4,
+        help="Number of threads that open files and load (rasterize) pages."
+    )
+    processing_group.add_argument(
+        "--preprocess_workers",
+        type=int,
+        help="Optional: Number of threads that preprocess and encode pages. Defaults to the number of CPUs."
+    )
+    processing_group.add_argument(
+        "--preprocess_processes",
+        type=int,
+        help="Optional: Load, preprocess and encode pages in this many worker processes instead of threads (--preprocess_workers). Use on machines with many cores."
+    )
+    processing_group.add_argument(
+        "--prefetch_pages",
+        type=int,
+        help="Optional: Number of pages loaded and preprocessed ahead of the VLM calls. Defaults to --concurrent_batch_size."
+    )
+    processing_group.add_argument(
+        "--pack_pages",
+        type=int,
+        help="Optional: Pack up to this many consecutive small pages of a file into one VLM request. The response is split back per page. Requires --pack_max_pixels or --pack_max_image_tokens."
+    )
+    processing_group.add_argument(
+        "--pack_max_pixels",
+        type=int,
+        help="Optional: Maximum total number of pixels of the pages in one request for --pack_pages."
+    )
+    processing_group.add_argument(
+        "--pack_max_image_tokens",
+        type=int,
+        help="Optional: Maximum total number of image tokens (counted with --vision_token_profile) of the pages in one request for --pack_pages."
+    )
+    processing_group.add_argument(
+        "--loop_lag_threshold",
+        type=float,
+        help="Optional: Monitor the event loop and log a warning whenever it is blocked for longer than this many seconds. A summary is logged at the end."
+    )
+    processing_group.add_argument(
+        "--adaptive_concurrency",
+        action="store_true",
+        help="Adjust the number of concurrent VLM calls at runtime between --min_concurrency and --max_concurrency, starting at --concurrent_batch_size. Backs off on 429/5xx responses, timeouts and calls slower than --max_call_latency."
+    )
+    processing_group.add_argument(
+        "--min_concurrency",
+        type=int,
+        default=1,
+        help="Lowest number of concurrent VLM calls for --adaptive_concurrency (default: 1)."
+    )
+    processing_group.add_argument(
+        "--max_concurrency",
+        type=int,
+        help="Optional: Highest number of concurrent VLM calls for --adaptive_concurrency. If not specified, --concurrent_batch_size is used."
+    )
+    processing_group.add_argument(
+        "--max_call_latency",
+        type=float,
+        help="Optional: With --adaptive_concurrency, VLM calls that take longer than this many seconds count as overload."
+    )
     # --verbose flag was removed by user in previous version provided
     processing_group.add_argument("--log", action="store_true", help="Enable writing logs to a timestamped file in the output directory.")
     processing_group.add_argument("--debug", action="store_true", help="Enable debug level logging for console (and file if --log is active).")
@@ -156,6 +399,68 @@ def main():
 
     if args.concurrent_batch_size < 1:
         parser.error("--concurrent_batch_size must be 1 or greater.")
+    if args.load_workers < 1:
+        parser.error("--load_workers must be 1 or greater.")
+    if args.preprocess_workers is not None and args.preprocess_workers < 1:
+        parser.error("--preprocess_workers must be 1 or greater.")
+    if args.preprocess_processes is not None and args.preprocess_processes < 1:
+        parser.error("--preprocess_processes must be 1 or greater.")
+    if args.prefetch_pages is not None and args.prefetch_pages < 0:
+        parser.error("--prefetch_pages must be 0 or greater.")
+    if args.pdf_page_batch_size < 1:
+        parser.error("--pdf_page_batch_size must be 1 or greater.")
+    if args.pdf_thread_count < 1:
+        parser.error("--pdf_thread_count must be 1 or greater.")
+    if args.text_layer_min_chars < 0:
+        parser.error("--text_layer_min_chars must be 0 or greater.")
+    if not 0 <= args.text_layer_min_alnum_ratio <= 1:
+        parser.error("--text_layer_min_alnum_ratio must be between 0 and 1.")
+    if not 0 <= args.blank_page_max_ink_fraction <= 1:
+        parser.error("--blank_page_max_ink_fraction must be between 0 and 1.")
+    if args.blank_page_max_std < 0:
+        parser.error("--blank_page_max_std must be 0 or greater.")
+    if args.blank_page_max_component_pixels < 0:
+        parser.error("--blank_page_max_component_pixels must be 0 or greater.")
+    if args.min_text_height_pixels is not None and args.min_text_height_pixels < 1:
+        parser.error("--min_text_height_pixels must be 1 or greater.")
+    if args.tile_size_pixels is not None and args.tile_size_pixels < 64:
+        parser.error("--tile_size_pixels must be 64 or greater.")
+    if not 0 <= args.tile_overlap < 0.5:
+        parser.error("--tile_overlap must be 0 or greater and less than 0.5.")
+    if args.loop_lag_threshold is not None and args.loop_lag_threshold <= 0:
+        parser.error("--loop_lag_threshold must be greater than 0.")
+    if args.max_concurrency is not None and not args.adaptive_concurrency:
+        parser.error("--max_concurrency requires --adaptive_concurrency.")
+    if args.max_concurrency is None:
+        args.max_concurrency = args.concurrent_batch_size
+    if args.adaptive_concurrency and not 1 <= args.min_concurrency <= args.max_concurrency:
+        parser.error("--min_concurrency must be 1 or greater and not greater than --max_concurrency (or --concurrent_batch_size).")
+    if args.max_call_latency is not None and not args.adaptive_concurrency:
+        parser.error("--max_call_latency requires --adaptive_concurrency.")
+    if args.max_call_latency is not None and args.max_call_latency <= 0:
+        parser.error("--max_call_latency must be greater than 0.")
+    if args.pack_pages is not None and args.pack_pages < 2:
+        parser.error("--pack_pages must be 2 or greater.")
+    if args.pack_pages is not None and args.pack_max_pixels is None and args.pack_max_image_tokens is None:
+        parser.error("--pack_pages requires --pack_max_pixels or --pack_max_image_tokens.")
+    if args.pack_max_pixels is not None and args.pack_max_pixels < 1:
+        parser.error("--pack_max_pixels must be 1 or greater.")
+    if args.pack_max_image_tokens is not None and args.vision_token_profile is None:
+        parser.error("--pack_max_image_tokens requires --vision_token_profile.")
+    if args.pack_max_image_tokens is not None and args.pack_max_image_tokens < 1:
+        parser.error("--pack_max_image_tokens must be 1 or greater.")
+    if args.max_image_tokens is not None and args.vision_token_profile is None:
+        parser.error("--max_image_tokens requires --vision_token_profile.")
+    if args.max_image_tokens is not None and args.max_image_tokens < 1:
+        parser.error("--max_image_tokens must be 1 or greater.")
+    if args.image_quality is not None and not 1 <= args.image_quality <= 100:
+        parser.error("--image_quality must be between 1 and 100.")
+    if args.png_compress_level is not None and not 0 <= args.png_compress_level <= 9:
+        parser.error("--png_compress_level must be between 0 and 9.")
+    if args.image_color_mode in ["bilevel", "palette"] and args.image_format != "png":
+        parser.error(f"--image_color_mode {args.image_color_mode} requires --image_format png.")
+    if args.max_image_payload_bytes is not None and args.max_image_payload_bytes < 1:
+        parser.error("--max_image_payload_bytes must be 1 or greater.")
 
     # --- Determine Effective Output Directory (for logs and default OCR outputs) ---
     effective_output_dir = os.getcwd() # Default if no --output_path
@@ -163,9 +468,11 @@ def main():
     # Preliminary check to see if multiple files will be processed
     _is_multi_file_scenario = False
     if os.path.isdir(args.input_path):
-        _temp_files_list = [f for f in os.listdir(args.input_path) if os.path.isfile(os.path.join(args.input_path, f)) and os.path.splitext(f)[1].lower() in SUPPORTED_IMAGE_EXTS_CLI]
-        if len(_temp_files_list) > 1:
+        _temp_files_list = [f for f in os.listdir(args.input_path) if os.path.isfile(os.path.join(args.input_path, f)) and is_supported_input(f)]
+        if len(_temp_files_list) > 1 or any(is_archive(f) for f in _temp_files_list):
             _is_multi_file_scenario = True
+    elif is_archive(args.input_path): # An archive holds multiple files
+        _is_multi_file_scenario = True
             
     if args.output_path:
         if _is_multi_file_scenario: # Input is a dir with multiple files
@@ -205,17 +512,17 @@ def main():
         )
         if args.vlm_engine == "openai":
             if not args.api_key: parser.error("--api_key (or OPENAI_API_KEY) is required for OpenAI.")
-            vlm_engine_instance = OpenAIVLMEngine(model=args.model, api_key=args.api_key, config=config)
+            vlm_engine_instance = OpenAIVLMEngine(model=args.model, api_key=args.api_key, config=config, max_image_payload_bytes=args.max_image_payload_bytes)
         elif args.vlm_engine == "openai_compatible":
             if not args.base_url: parser.error("--base_url is required for openai_compatible.")
-            vlm_engine_instance = OpenAIVLMEngine(model=args.model, api_key=args.api_key, base_url=args.base_url, config=config)
+            vlm_engine_instance = OpenAIVLMEngine(model=args.model, api_key=args.api_key, base_url=args.base_url, config=config, max_image_payload_bytes=args.max_image_payload_bytes)
         elif args.vlm_engine == "azure_openai":
             if not args.azure_api_key: parser.error("--azure_api_key (or AZURE_OPENAI_API_KEY) is required.")
             if not args.azure_endpoint: parser.error("--azure_endpoint (or AZURE_OPENAI_ENDPOINT) is required.")
             if not args.azure_api_version: parser.error("--azure_api_version (or AZURE_OPENAI_API_VERSION) is required.")
-            vlm_engine_instance = AzureOpenAIVLMEngine(model=args.model, api_key=args.azure_api_key, azure_endpoint=args.azure_endpoint, api_version=args.azure_api_version, config=config)
+            vlm_engine_instance = AzureOpenAIVLMEngine(model=args.model, api_key=args.azure_api_key, azure_endpoint=args.azure_endpoint, api_version=args.azure_api_version, config=config, max_image_payload_bytes=args.max_image_payload_bytes)
         elif args.vlm_engine == "ollama":
-            vlm_engine_instance = OllamaVLMEngine(model_name=args.model, host=args.ollama_host, num_ctx=args.ollama_num_ctx, keep_alive=args.ollama_keep_alive, config=config)
+            vlm_engine_instance = OllamaVLMEngine(model_name=args.model, host=args.ollama_host, num_ctx=args.ollama_num_ctx, keep_alive=args.ollama_keep_alive, config=config, max_image_payload_bytes=args.max_image_payload_bytes)
         logger.info("VLM engine initialized successfully.")
     except ImportError as e:
         logger.error(f"Failed to import library for {args.vlm_engine}: {e}. Install dependencies.")
@@ -228,7 +535,24 @@ def main():
     # --- Initialize OCR Engine ---
     try:
         logger.info(f"Initializing OCR engine with output mode: {args.output_mode}")
-        ocr_engine_instance = OCREngine(vlm_engine=vlm_engine_instance, output_mode=args.output_mode, user_prompt=args.user_prompt)
+        spool = SpoolConfig(spool_dir=args.spool_dir) if args.spool_pages else None
+        blank_page = BlankPageConfig(max_ink_fraction=args.blank_page_max_ink_fraction, max_std=args.blank_page_max_std,
+                                     max_component_pixels=args.blank_page_max_component_pixels)
+        tiling = TilingConfig(tile_size_pixels=args.tile_size_pixels, overlap=args.tile_overlap) if args.tile_size_pixels is not None else None
+        packing = None
+        if args.pack_pages is not None:
+            packing = PackingConfig(max_pages=args.pack_pages, max_pixels=args.pack_max_pixels, max_image_tokens=args.pack_max_image_tokens)
+        ocr_engine_instance = OCREngine(vlm_engine=vlm_engine_instance, output_mode=args.output_mode, user_prompt=args.user_prompt,
+                                        pdf_rasterizer=args.pdf_rasterizer, pdf_page_batch_size=args.pdf_page_batch_size, 
+                                        pdf_thread_count=args.pdf_thread_count, extract_embedded_images=args.extract_embedded_images,
+                                        pdf_grayscale=args.pdf_grayscale, spool=spool,
+                                        image_format=args.image_format, image_quality=args.image_quality, 
+                                        png_compress_level=args.png_compress_level, image_color_mode=args.image_color_mode,
+                                        vision_token_profile=args.vision_token_profile, max_image_tokens=args.max_image_tokens,
+                                        blank_page=blank_page, pdf_text_layer=args.pdf_text_layer,
+                                        text_layer_min_chars=args.text_layer_min_chars, 
+                                        text_layer_min_alnum_ratio=args.text_layer_min_alnum_ratio,
+                                        tiling=tiling, packing=packing, preprocess_processes=args.preprocess_processes)
         logger.info("OCR engine initialized successfully.")
     except Exception as e:
         logger.error(f"Error initializing OCR engine: {e}")
@@ -241,15 +565,15 @@ def main():
         logger.info(f"Input is directory: {args.input_path}. Scanning for files...")
         for item in os.listdir(args.input_path):
             item_path = os.path.join(args.input_path, item)
-            if os.path.isfile(item_path) and os.path.splitext(item)[1].lower() in SUPPORTED_IMAGE_EXTS_CLI:
+            if os.path.isfile(item_path) and is_supported_input(item):
                 input_files_to_process.append(item_path)
         if not input_files_to_process:
             logger.error(f"No supported files found in directory: {args.input_path}")
             sys.exit(1)
         logger.info(f"Found {len(input_files_to_process)} files to process.")
     elif os.path.isfile(args.input_path):
-        if os.path.splitext(args.input_path)[1].lower() not in SUPPORTED_IMAGE_EXTS_CLI:
-            logger.error(f"Input file '{args.input_path}' is not supported. Supported: {SUPPORTED_IMAGE_EXTS_CLI}")
+        if not is_supported_input(args.input_path):
+            logger.error(f"Input file '{args.input_path}' is not supported. Supported: {SUPPORTED_IMAGE_EXTS_CLI + SUPPORTED_ARCHIVE_EXTS}")
             sys.exit(1)
         input_files_to_process = [args.input_path]
         logger.info(f"Processing single input file: {args.input_path}")
@@ -264,6 +588,10 @@ def main():
         existing_files = os.listdir(effective_output_dir)
         filtered_input_files_to_process = []
         for input_file in input_files_to_process:
+            if is_archive(input_file): # Members are only known while the archive is read
+                logger.warning(f"--skip_existing does not apply to archive members. All supported files in '{input_file}' will be processed.")
+                filtered_input_files_to_process.append(input_file)
+                continue
             expected_output_name = get_output_path_for_ocr_result(input_file, args.output_path, args.output_mode, len(input_files_to_process), effective_output_dir)
             if os.path.basename(expected_output_name) not in existing_files:
                 filtered_input_files_to_process.append(input_file)
@@ -277,18 +605,44 @@ def main():
         logger.info("All input files will be processed (`--skip_existing=False`).")
     # This re-evaluation is useful if the initial _is_multi_file_scenario was just for log dir
     num_actual_files = len(input_files_to_process)
+    # Archives are streamed, so the number of results is not known in advance
+    has_archive_inputs = any(is_archive(f) for f in input_files_to_process)
+    num_expected_results = None if has_archive_inputs else num_actual_files
 
     # --- Run OCR ---
     try:
         logger.info(f"Processing with concurrent_batch_size: {args.concurrent_batch_size}.")
 
+        run_stats = {"files": 0, "failed_files": 0, "pages": 0, "blank_pages": 0, "text_layer_pages": 0}
+        lag_monitor = None
+        if args.loop_lag_threshold is not None:
+            lag_monitor = EventLoopLagMonitor(threshold_seconds=args.loop_lag_threshold,
+                                              on_lag=lambda lag: logger.warning(f"Event loop blocked for {lag:.3f} s."))
+        vlm_call_limiter = None
+        if args.adaptive_concurrency:
+            # Start at the configured concurrency and adjust from there
+            initial_concurrency = min(max(args.concurrent_batch_size, args.min_concurrency), args.max_concurrency)
+            vlm_call_limiter = AdaptiveConcurrencyLimiter(min_limit=args.min_concurrency,
+                                                          max_limit=args.max_concurrency,
+                                                          initial_limit=initial_concurrency,
+                                                          latency_threshold_seconds=args.max_call_latency)
+            logger.info(f"Adaptive concurrency: {args.min_concurrency} to {args.max_concurrency} concurrent VLM calls, starting at {initial_concurrency}.")
+
         async def process_and_write_concurrently():
             ocr_task_generator = ocr_engine_instance.concurrent_ocr(
                 file_paths=input_files_to_process,
                 rotate_correction=args.rotate_correction,
                 max_dimension_pixels=args.max_dimension_pixels,
+                min_text_height_pixels=args.min_text_height_pixels,
+                crop_margins=args.crop_margins,
+                skip_blank_pages=args.skip_blank_pages,
                 concurrent_batch_size=args.concurrent_batch_size,
-                max_file_load=args.max_file_load if args.max_file_load > 0 else None
+                max_file_load=args.max_file_load if args.max_file_load > 0 else None,
+                load_workers=args.load_workers,
+                preprocess_workers=args.preprocess_workers,
+                prefetch_pages=args.prefetch_pages,
+                lag_monitor=lag_monitor,
+                vlm_call_limiter=vlm_call_limiter
             )
             
             # Progress bar always attempted if tqdm is available and files exist,
@@ -297,7 +651,7 @@ def main():
 
             iterator_wrapper = tqdm.asyncio.tqdm(
                 ocr_task_generator, 
-                total=num_actual_files, 
+                total=num_expected_results, 
                 desc="Processing files", 
                 unit="file",
                 disable=not show_progress_bar # disable if no files, or can remove this disable if tqdm handles total=0
@@ -312,10 +666,17 @@ def main():
                 # For get_output_path_for_ocr_result, effective_output_dir is the base if args.output_path isn't specific enough
                 current_ocr_output_file_path = get_output_path_for_ocr_result(
                     input_file_path_from_result, args.output_path, args.output_mode,
-                    num_actual_files, effective_output_dir 
+                    num_actual_files if not has_archive_inputs else max(num_actual_files, 2), effective_output_dir 
                 )
                 
+                run_stats["files"] += 1
+                run_stats["pages"] += len(result_object)
+                run_stats["blank_pages"] += result_object.num_blank_pages
+                run_stats["text_layer_pages"] += result_object.num_text_layer_pages
+                if vlm_call_limiter is not None:
+                    iterator_wrapper.set_postfix(vlm_calls=vlm_call_limiter.limit, refresh=False)
                 if result_object.status == "error":
+                    run_stats["failed_files"] += 1
                     error_message = result_object.get_page(0) if len(result_object) > 0 else 'Unknown error during OCR'
                     logger.error(f"OCR failed for {result_object.filename}: {error_message}")
                 else:
@@ -330,7 +691,7 @@ def main():
                         logger.error(f"Error writing output for '{input_file_path_from_result}' to '{current_ocr_output_file_path}': {e}")
             
             if hasattr(iterator_wrapper, 'close') and isinstance(iterator_wrapper, tqdm.asyncio.tqdm):
-                if iterator_wrapper.n < iterator_wrapper.total:
+                if iterator_wrapper.total is not None and iterator_wrapper.n < iterator_wrapper.total:
                     iterator_wrapper.n = iterator_wrapper.total 
                     iterator_wrapper.refresh()
                 iterator_wrapper.close()
@@ -349,6 +710,18 @@ def main():
             else: raise e
             
         logger.info("All processing finished.")
+        summary = f"Processed {run_stats['files']} files ({run_stats['failed_files']} failed), {run_stats['pages']} pages."
+        if args.skip_blank_pages:
+            summary += f" Skipped {run_stats['blank_pages']} blank pages."
+        if args.pdf_text_layer:
+            summary += f" Used the text layer for {run_stats['text_layer_pages']} pages."
+        if lag_monitor is not None:
+            lag_stats = lag_monitor.get_stats()
+            summary += f" Event loop blocked {lag_stats['stalls']} times over {args.loop_lag_threshold} s (max lag {lag_stats['max_lag_seconds']} s)."
+        if vlm_call_limiter is not None:
+            limiter_stats = vlm_call_limiter.get_stats()
+            summary += f" Concurrency limit ended at {limiter_stats['limit']} ({limiter_stats['increases']} increases, {limiter_stats['decreases']} decreases, {limiter_stats['overload_signals']} overload signals)."
+        logger.info(summary)
 
     except FileNotFoundError as e:
         logger.error(f"File not found: {e}")
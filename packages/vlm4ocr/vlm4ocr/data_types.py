@@ -44,7 +44,7 @@ class OCRResult:
                 raise ValueError(f"Each page must be a dict. Page at index {i} is not a dict.")
 
 
-    def add_page(self, text:str, image_processing_status: dict):
+    def add_page(self, text:str, image_processing_status: dict, source:str=None):
         """
         This method adds a new page to the OCRResult object.
 
@@ -55,6 +55,9 @@ class OCRResult:
         image_processing_status : dict
             A dictionary containing the image processing status for the page.
             It can include keys like 'rotate_correction', 'max_dimension_pixels', etc.
+        source : str, Optional
+            Where the page text comes from: 'vlm' (OCR by the VLM), 'text_layer' (the PDF text layer), 
+            or 'blank_page' (a blank page that was not sent to the VLM). None for error messages.
         """
         if not isinstance(text, str):
             raise ValueError("text must be a string")
@@ -63,7 +66,8 @@ class OCRResult:
         
         page = {
             "text": text,
-            "image_processing_status": image_processing_status
+            "image_processing_status": image_processing_status,
+            "source": source
         }
         self.pages.append(page)
 
@@ -71,6 +75,16 @@ class OCRResult:
     def __len__(self):
         return len(self.pages)
 
+    @property
+    def num_text_layer_pages(self) -> int:
+        """ The number of pages taken from the PDF text layer (not sent to the VLM). """
+        return sum(1 for page in self.pages if page.get("source") == "text_layer")
+
+    @property
+    def num_blank_pages(self) -> int:
+        """ The number of pages skipped as blank (not sent to the VLM). """
+        return sum(1 for page in self.pages if page.get("image_processing_status", {}).get("blank_page", {}).get("blank"))
+
     def get_page(self, idx):
         if not isinstance(idx, int):
             raise ValueError("Index must be an integer")
@@ -106,4 +120,110 @@ class OCRResult:
         else:
             self.page_delimiter = page_delimiter
 
-        return self.page_delimiter.join([page.get("text", "") for page in self.pages])
\ No newline at end of file
+        return self.page_delimiter.join([page.get("text", "") for page in self.pages])
+
+@dataclass
+class SpoolConfig:
+    """
+    This class configures page spooling in OCREngine. Rendered PDF pages are written to a temporary directory as 
+    compressed image files and decoded only when they are processed. Useful for documents with thousands of pages. 
+    Combine with a large pdf_page_batch_size. Only applies to the pdf2image rasterizer with a pdf_page_batch_size 
+    above 1 and without preprocess_processes, since otherwise pages are rendered one at a time and nothing is held in memory.
+
+    Parameters:
+    ----------
+    spool_dir : str, Optional
+        The parent directory for spooled pages. If None, the system temporary directory is used.
+    """
+    spool_dir: str = None
+
+    def __post_init__(self):
+        if self.spool_dir is not None and not os.path.isdir(self.spool_dir):
+            raise ValueError(f"spool_dir is not a directory: {self.spool_dir}")
+
+
+@dataclass
+class BlankPageConfig:
+    """
+    This class holds the blank page thresholds of OCREngine for skip_blank_pages. They are checked on a 512-px grayscale 
+    thumbnail, ignoring the edges of the page.
+
+    Parameters:
+    ----------
+    max_ink_fraction : float, Optional
+        The maximum fraction of ink pixels of a blank page.
+    max_std : float, Optional
+        The maximum standard deviation of the gray levels of a blank page.
+    max_component_pixels : int, Optional
+        The maximum size (in thumbnail pixels) of a connected group of ink pixels on a blank page. 
+        Pages with a larger group (e.g., a short line such as "Page 2") are not blank.
+    """
+    max_ink_fraction: float = 0.001
+    max_std: float = 8.0
+    max_component_pixels: int = 4
+
+    def __post_init__(self):
+        if not isinstance(self.max_ink_fraction, (int, float)) or not 0 <= self.max_ink_fraction <= 1:
+            raise ValueError("max_ink_fraction must be a number between 0 and 1")
+        if not isinstance(self.max_std, (int, float)) or self.max_std < 0:
+            raise ValueError("max_std must be a non-negative number")
+        if not isinstance(self.max_component_pixels, int) or self.max_component_pixels < 0:
+            raise ValueError("max_component_pixels must be a non-negative integer")
+
+
+@dataclass
+class TilingConfig:
+    """
+    This class configures page tiling in OCREngine. Pages whose width or height exceeds tile_size_pixels (after 
+    max_dimension_pixels is applied) are split into overlapping tiles of at most tile_size_pixels on each side. 
+    Each tile is OCR'd on its own, and the tile outputs are stitched back into one page (each row of tiles from 
+    left to right, then the rows from top to bottom), with the text repeated in the overlaps removed. 
+    Use with a large (or no) max_dimension_pixels for large-format pages (e.g., drawings, long receipts).
+
+    Parameters:
+    ----------
+    tile_size_pixels : int
+        The maximum width and height of a tile. Must be at least 64.
+    overlap : float, Optional
+        The overlap between adjacent tiles, as a fraction of tile_size_pixels.
+    """
+    tile_size_pixels: int
+    overlap: float = 0.1
+
+    def __post_init__(self):
+        if not isinstance(self.tile_size_pixels, int) or self.tile_size_pixels < 64:
+            raise ValueError("tile_size_pixels must be an integer of at least 64")
+        if not isinstance(self.overlap, (int, float)) or not 0 <= self.overlap < 0.5:
+            raise ValueError("overlap must be a number between 0 and 0.5 (exclusive)")
+
+
+@dataclass
+class PackingConfig:
+    """
+    This class configures page packing in OCREngine (sequential_ocr and concurrent_ocr). Consecutive small pages of a file 
+    are packed into one multi-image VLM request. The VLM is asked to start each page with a marker, and the response 
+    is split back per page. If it cannot be split, the pages are OCR'd one by one. 
+    At least one of max_pixels and max_image_tokens is required.
+
+    Parameters:
+    ----------
+    max_pages : int
+        The maximum number of pages in one request. Must be at least 2.
+    max_pixels : int, Optional
+        The maximum total number of pixels of the pages in one request. Larger pages are sent alone.
+    max_image_tokens : int, Optional
+        The maximum total number of image tokens (counted with the OCREngine's vision_token_profile) of the pages in one request.
+    """
+    max_pages: int
+    max_pixels: int = None
+    max_image_tokens: int = None
+
+    def __post_init__(self):
+        if not isinstance(self.max_pages, int) or self.max_pages < 2:
+            raise ValueError("max_pages must be an integer of at least 2")
+        if self.max_pixels is None and self.max_image_tokens is None:
+            raise ValueError("PackingConfig requires max_pixels or max_image_tokens")
+        if self.max_pixels is not None and (not isinstance(self.max_pixels, int) or self.max_pixels < 1):
+            raise ValueError("max_pixels must be a positive integer")
+        if self.max_image_tokens is not None and (not isinstance(self.max_image_tokens, int) or self.max_image_tokens < 1):
+            raise ValueError("max_image_tokens must be a positive integer")
@@ -1,18 +1,118 @@
 import os
-from typing import Tuple, List, Dict, Union, Generator, AsyncGenerator, Iterable
+import io
+import re
+import html
+from typing import Tuple, List, Dict, Union, Generator, AsyncGenerator, Iterable, BinaryIO, Callable
 import importlib
+import importlib.util
+import warnings
 import asyncio
+import concurrent.futures
+import multiprocessing
+import multiprocessing.util
+from dataclasses import dataclass
 from colorama import Fore, Style   
 from PIL import Image
-from vlm4ocr.utils import DataLoader, PDFDataLoader, TIFFDataLoader, ImageDataLoader, ImageProcessor, clean_markdown, get_default_page_delimiter
-from vlm4ocr.data_types import OCRResult
+from vlm4ocr.utils import DataLoader, PDFDataLoader, TIFFDataLoader, ImageDataLoader, ImageProcessor, clean_markdown, get_default_page_delimiter, \
+                          is_archive, iter_archive_members, sniff_file_ext, ImageEncoder, EncodedImage, \
+                          VISION_TOKEN_PROFILES, stitch_tile_texts, get_page_packing_prompt, split_packed_response, EventLoopLagMonitor, \
+                          AdaptiveConcurrencyLimiter
+from vlm4ocr.data_types import OCRResult, SpoolConfig, BlankPageConfig, TilingConfig, PackingConfig
 from vlm4ocr.vlm_engines import VLMEngine
 
 SUPPORTED_IMAGE_EXTS = ['.pdf', '.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp']
 
+# An OCR input: a file path, the file content (bytes or a binary file-like object), or a PIL image.
+OCRInput = Union[str, bytes, BinaryIO, Image.Image]
+
+
+@dataclass
+class _PipelineStages:
+    """
+    The stages of concurrent_ocr. Pages are loaded (rasterized) in load_executor, preprocessed and encoded with 
+    preprocess_page in preprocess_executor (threads or processes), and sent to the VLM under vlm_call_semaphore 
+    (a fixed semaphore, or an AdaptiveConcurrencyLimiter). With worker processes, load_and_preprocess_page loads 
+    pages that can be read from their source in the worker as well, so that decoding and rasterizing leave the main process.
+    page_buffer (of page_buffer_size slots) bounds the number of pages between the start of loading and the end of 
+    their VLM call, so that the next pages are ready when a VLM slot frees up, while memory use stays bounded. 
+    Pages that a data loader renders together (a PDF page batch) take their slots together, under page_buffer_lock, 
+    before the first of them is loaded, so that the pages cached by the data loader are counted.
+    """
+    vlm_call_semaphore: Union[asyncio.Semaphore, AdaptiveConcurrencyLimiter]
+    page_buffer: asyncio.Semaphore
+    page_buffer_size: int
+    page_buffer_lock: asyncio.Lock
+    load_executor: concurrent.futures.Executor
+    preprocess_executor: concurrent.futures.Executor
+    preprocess_page: Callable
+    load_and_preprocess_page: Callable = None
+
+
+@dataclass
+class _PreprocessWorkerConfig:
+    """
+    What a preprocessing worker process (see OCREngine preprocess_processes) needs from the OCR engine: 
+    its loading and preprocessing settings, and the VLM engine's max_image_payload_bytes. 
+    The VLM engine itself holds API clients and is not sent.
+    """
+    settings: Dict
+    max_image_payload_bytes: int = None
+
+
+# The OCR engine of a preprocessing worker process (a _PreprocessWorkerOCREngine).
+_worker_ocr_engine = None
+
+# The files a preprocessing worker process has open, by (file path, max_dimension_pixels), most recently used last.
+_worker_data_loaders = {}
+_WORKER_MAX_OPEN_FILES = 4
+
+def _init_preprocess_worker(config:_PreprocessWorkerConfig):
+    """ Initializes a preprocessing worker process with the preprocessing settings of the OCR engine. """
+    global _worker_ocr_engine
+    _worker_ocr_engine = _PreprocessWorkerOCREngine(config)
+    # Close the open files (and remove spooled pages) when the worker exits
+    multiprocessing.util.Finalize(None, _close_worker_data_loaders, exitpriority=10)
+
+def _close_worker_data_loaders():
+    """ Closes the files a preprocessing worker process has open. """
+    while _worker_data_loaders:
+        _worker_data_loaders.pop(next(iter(_worker_data_loaders))).close()
+
+def _preprocess_page_in_worker(*args) -> Tuple[Union[List[EncodedImage], None], Dict[str, Dict]]:
+    """ Preprocesses and encodes a page in a worker process. Only the encoded bytes and the status are sent back. """
+    return _worker_ocr_engine._preprocess_page(*args)
+
+def _load_and_preprocess_page_in_worker(file_path:str, file_bytes:bytes, page_index:int, passthrough:bool, 
+                                        max_dimension_pixels:int, *args) -> Tuple[Union[List[EncodedImage], None], Dict[str, Dict]]:
+    """ 
+    Loads (decodes or rasterizes) a page from its source, then preprocesses and encodes it in a worker process. 
+    Files on disk stay open in the worker for its next pages. Files given as bytes are single images, and are closed right away.
+    """
+    if file_bytes is not None:
+        with _worker_ocr_engine._get_data_loader(file_path, max_dimension_pixels=max_dimension_pixels, data=file_bytes) as data_loader:
+            image = _worker_ocr_engine._load_page(data_loader, page_index, passthrough, use_text_layer=False)
+        return _worker_ocr_engine._preprocess_page(image, *args)
+
+    key = (file_path, max_dimension_pixels)
+    data_loader = _worker_data_loaders.pop(key, None)
+    if data_loader is None:
+        while len(_worker_data_loaders) >= _WORKER_MAX_OPEN_FILES:
+            _worker_data_loaders.pop(next(iter(_worker_data_loaders))).close()
+        # The pages of a file are spread over the workers, so PDF pages are rendered one at a time rather than in batches
+        data_loader = _worker_ocr_engine._get_data_loader(file_path, max_dimension_pixels=max_dimension_pixels, pdf_page_batch_size=1)
+    _worker_data_loaders[key] = data_loader
+    image = _worker_ocr_engine._load_page(data_loader, page_index, passthrough, use_text_layer=False)
+    return _worker_ocr_engine._preprocess_page(image, *args)
+
 
 class OCREngine:
-    def __init__(self, vlm_engine:VLMEngine, output_mode:str="markdown", system_prompt:str=None, user_prompt:str=None):
+    def __init__(self, vlm_engine:VLMEngine, output_mode:str="markdown", system_prompt:str=None, user_prompt:str=None,
+                 pdf_rasterizer:str="pdf2image", pdf_page_batch_size:int=8, pdf_thread_count:int=1, 
+                 extract_embedded_images:bool=False, pdf_grayscale:bool=False, spool:SpoolConfig=None,
+                 image_format:str="png", image_quality:int=None, png_compress_level:int=None, image_color_mode:str=None,
+                 vision_token_profile:str=None, max_image_tokens:int=None, blank_page:BlankPageConfig=None,
+                 pdf_text_layer:bool=False, text_layer_min_chars:int=100, text_layer_min_alnum_ratio:float=0.5,
+                 tiling:TilingConfig=None, packing:PackingConfig=None, preprocess_processes:int=None):
         """
         This class inputs a image or PDF file path and processes them using a VLM inference engine. Outputs plain text or markdown.
 
@@ -26,15 +126,124 @@ class OCREngine:
             Custom system prompt. We recommend use a default system prompt by leaving this blank. 
         user_prompt : str, Optional
             Custom user prompt. It is good to include some information regarding the document. If not specified, a default will be used.
+        pdf_rasterizer : str, Optional
+            The PDF rasterizer backend. Must be 'pdf2image' (poppler subprocesses, default) or 'pdfium' (in-process, requires pypdfium2).
+        pdf_page_batch_size : int, Optional
+            The number of contiguous PDF pages to rasterize in one poppler call. Larger batches reduce process startup 
+            and repeated PDF parsing for long documents, at the cost of holding more rendered pages in memory.
+        pdf_thread_count : int, Optional
+            The number of threads (poppler processes) used to rasterize a batch of PDF pages.
+        extract_embedded_images : bool, Optional
+            If True, PDF pages that consist of a single full-page image (e.g., scanner output) are not rendered. 
+            The embedded image is extracted at its native resolution instead. Use max_dimension_pixels to limit the size.
+        pdf_grayscale : bool, Optional
+            If True, PDF pages are rendered in grayscale.
+        spool : SpoolConfig, Optional
+            If specified, rendered PDF pages are spooled to a temporary directory and decoded only when they are processed. 
+            Useful for documents with thousands of pages. Only applies to the pdf2image rasterizer with a pdf_page_batch_size 
+            above 1 and without preprocess_processes (otherwise a warning is issued). See SpoolConfig.
+        image_format : str, Optional
+            The format images are encoded in before they are sent to the VLM. Must be 'png' (lossless, default), 'jpeg', or 'webp'.
+            JPEG and WebP are much faster to encode and smaller to upload for large scanned pages.
+        image_quality : int, Optional
+            The JPEG/WebP quality (1-100). If None, Pillow's default is used.
+        png_compress_level : int, Optional
+            The PNG compression level (0-9). Lower levels encode faster but produce larger payloads. If None, Pillow's default (6) is used.
+        image_color_mode : str, Optional
+            If specified, images are converted before encoding. Must be 'grayscale', 'bilevel' (1-bit, PNG only), 
+            or 'palette' (16 colors, PNG only).
+        vision_token_profile : str, Optional
+            If specified, images are resized to line up with the vision model's token grid after max_dimension_pixels is applied. 
+            Must be 'openai_high' (OpenAI high detail, 512-px tiles) or 'qwen_vl' (Qwen-VL models, 28-px patches).
+        max_image_tokens : int, Optional
+            The image token budget per page for vision_token_profile. Images are resized to the largest size that fits. 
+            If None, only the model's own size limits apply.
+        blank_page : BlankPageConfig, Optional
+            The blank page thresholds for skip_blank_pages. If None, the BlankPageConfig defaults are used.
+        pdf_text_layer : bool, Optional
+            If True, the text layer of PDF pages (born-digital or already OCR'd pages) is used in place of OCR when it passes 
+            the quality thresholds. Such pages are not rendered or sent to the VLM. Other pages are OCR'd as usual. 
+            The source of each page ('text_layer' or 'vlm') is recorded in the OCR result.
+        text_layer_min_chars : int, Optional
+            For pdf_text_layer, the minimum number of non-whitespace characters of a usable text layer.
+        text_layer_min_alnum_ratio : float, Optional
+            For pdf_text_layer, the minimum fraction of letters and digits among the non-whitespace characters of a usable text layer.
+        tiling : TilingConfig, Optional
+            If specified, pages larger than the tile size (after max_dimension_pixels is applied) are split into overlapping tiles, 
+            which are OCR'd on their own and stitched back into one page. See TilingConfig.
+        packing : PackingConfig, Optional
+            If specified, consecutive small pages of a file are packed into one multi-image VLM request 
+            (sequential_ocr and concurrent_ocr). See PackingConfig.
+        preprocess_processes : int, Optional
+            If specified, concurrent_ocr preprocesses and encodes pages (rotate correction, cropping, resizing, tiling, encoding) 
+            in a pool of this many worker processes, instead of threads. The workers also load (decode or rasterize) pages of 
+            files on disk and of single images given as bytes, so only the file path (or bytes) is sent to them and only 
+            the encoded bytes come back. In-memory PIL images and multi-page files given as bytes are loaded in the main process. 
+            Use on machines with many cores, where thread-based preprocessing is limited by the GIL.
         """
         # Check inference engine
         if not isinstance(vlm_engine, VLMEngine):
             raise TypeError("vlm_engine must be an instance of VLMEngine")
-        self.vlm_engine = vlm_engine
 
         # Check output mode
         if output_mode not in ["markdown", "HTML", "text"]:
             raise ValueError("output_mode must be 'markdown', 'HTML', or 'text'")
+
+        # Check PDF rasterization
+        if pdf_rasterizer not in ["pdf2image", "pdfium"]:
+            raise ValueError("pdf_rasterizer must be 'pdf2image' or 'pdfium'")
+        if pdf_rasterizer == "pdfium" and importlib.util.find_spec("pypdfium2") is None:
+            raise ImportError("pypdfium2 is not installed. Please install it (```pip install pypdfium2```) to use the pdfium rasterizer.")
+        if not isinstance(pdf_page_batch_size, int) or pdf_page_batch_size < 1:
+            raise ValueError("pdf_page_batch_size must be a positive integer")
+        if not isinstance(pdf_thread_count, int) or pdf_thread_count < 1:
+            raise ValueError("pdf_thread_count must be a positive integer")
+        if not isinstance(text_layer_min_chars, int) or text_layer_min_chars < 0:
+            raise ValueError("text_layer_min_chars must be a non-negative integer")
+        if not isinstance(text_layer_min_alnum_ratio, (int, float)) or not 0 <= text_layer_min_alnum_ratio <= 1:
+            raise ValueError("text_layer_min_alnum_ratio must be a number between 0 and 1")
+
+        # Check token grid resizing
+        if vision_token_profile is not None and vision_token_profile not in VISION_TOKEN_PROFILES:
+            raise ValueError(f"vision_token_profile must be one of {list(VISION_TOKEN_PROFILES.keys())}")
+        if max_image_tokens is not None:
+            if vision_token_profile is None:
+                raise ValueError("max_image_tokens requires a vision_token_profile")
+            if not isinstance(max_image_tokens, int) or max_image_tokens < 1:
+                raise ValueError("max_image_tokens must be a positive integer")
+
+        # Check grouped settings. Each config object validates its own values.
+        if spool is not None and not isinstance(spool, SpoolConfig):
+            raise TypeError("spool must be an instance of SpoolConfig")
+        if blank_page is not None and not isinstance(blank_page, BlankPageConfig):
+            raise TypeError("blank_page must be an instance of BlankPageConfig")
+        if tiling is not None and not isinstance(tiling, TilingConfig):
+            raise TypeError("tiling must be an instance of TilingConfig")
+        if packing is not None:
+            if not isinstance(packing, PackingConfig):
+                raise TypeError("packing must be an instance of PackingConfig")
+            if packing.max_image_tokens is not None and vision_token_profile is None:
+                raise ValueError("packing max_image_tokens requires a vision_token_profile")
+
+        # Check preprocessing worker processes
+        if preprocess_processes is not None and (not isinstance(preprocess_processes, int) or preprocess_processes < 1):
+            raise ValueError("preprocess_processes must be a positive integer")
+
+        # Check wire encoding. ImageEncoder validates its own settings.
+        image_encoder = ImageEncoder(format=image_format, quality=image_quality, 
+                                     compress_level=png_compress_level, color_mode=image_color_mode)
+
+        # Spooling holds the other pages of a rendered batch on disk. Without batch rendering, pages are rendered 
+        # one at a time on demand and nothing is held, so there is nothing to spool.
+        if spool is not None:
+            if pdf_rasterizer != "pdf2image" or pdf_page_batch_size == 1:
+                warnings.warn("spool only applies to the pdf2image rasterizer with a pdf_page_batch_size above 1. "
+                              "Pages are rendered one at a time and are not spooled.", UserWarning)
+            elif preprocess_processes is not None:
+                warnings.warn("spool does not apply with preprocess_processes. The worker processes render "
+                              "PDF pages one at a time and do not spool them.", UserWarning)
+
+        self.vlm_engine = vlm_engine
         self.output_mode = output_mode
 
         # System prompt
@@ -53,23 +262,528 @@ class OCREngine:
             with prompt_template_path.open('r', encoding='utf-8') as f:
                 self.user_prompt =  f.read()
 
-        # Image processor
+        # PDF rasterization
+        self.pdf_rasterizer = pdf_rasterizer
+        self.pdf_page_batch_size = pdf_page_batch_size
+        self.pdf_thread_count = pdf_thread_count
+        self.extract_embedded_images = extract_embedded_images
+        self.pdf_grayscale = pdf_grayscale
+        self.spool = spool
+        self.pdf_text_layer = pdf_text_layer
+        self.text_layer_min_chars = text_layer_min_chars
+        self.text_layer_min_alnum_ratio = text_layer_min_alnum_ratio
+
+        # Image processing
         self.image_processor = ImageProcessor()
+        self.vision_token_profile = vision_token_profile
+        self.max_image_tokens = max_image_tokens
+        self.blank_page = blank_page if blank_page is not None else BlankPageConfig()
+        self.tiling = tiling
+        self.packing = packing
+        self.preprocess_processes = preprocess_processes
+        self.image_encoder = image_encoder
+
+    def _get_max_image_payload_bytes(self) -> Union[int, None]:
+        """
+        This internal method returns the VLM engine's max_image_payload_bytes.
+        """
+        return getattr(self.vlm_engine, "max_image_payload_bytes", None)
+
+    def _get_preprocess_worker_config(self) -> _PreprocessWorkerConfig:
+        """
+        This internal method returns the settings that preprocessing worker processes (preprocess_processes) load and preprocess pages with.
+        """
+        settings = {key: value for key, value in self.__dict__.items() if key not in ["vlm_engine", "system_prompt", "user_prompt"]}
+        return _PreprocessWorkerConfig(settings=settings, max_image_payload_bytes=self._get_max_image_payload_bytes())
+
+    @staticmethod
+    def _is_single_input(file_input) -> bool:
+        """
+        This internal method returns True if the input is a single file (path, bytes, file-like object or image) rather than a collection of them.
+        """
+        return isinstance(file_input, (str, bytes, bytearray, Image.Image)) or hasattr(file_input, "read")
+
+    def _read_in_memory_input(self, file_input:OCRInput, input_index:int=0) -> Tuple[str, Union[bytes, Image.Image]]:
+        """
+        This internal method returns a name and the content of an in-memory input (bytes, file-like object or PIL image).
+        The name is taken from the object if available (e.g., file.name). If it has no supported extension, 
+        the file type is detected from the content and the matching extension is appended.
+        """
+        if isinstance(file_input, Image.Image):
+            name = os.path.basename(getattr(file_input, "filename", "") or "")
+            return (name if name else f"input_{input_index}.png"), file_input
+
+        if isinstance(file_input, (bytes, bytearray)):
+            name = None
+            data = bytes(file_input)
+        elif hasattr(file_input, "read"):
+            # Open files have a name. Uploaded files (e.g., werkzeug FileStorage) have a filename.
+            name = getattr(file_input, "filename", None) or getattr(file_input, "name", None)
+            data = file_input.read()
+        else:
+            raise TypeError("Inputs must be file paths (str), bytes, binary file-like objects, or PIL images.")
+
+        name = os.path.basename(name) if isinstance(name, str) and name else f"input_{input_index}"
+        if os.path.splitext(name)[1].lower() not in SUPPORTED_IMAGE_EXTS:
+            file_ext = sniff_file_ext(data)
+            if file_ext is not None:
+                name += file_ext
+        return name, data
+
+    def _iter_inputs(self, file_inputs:Iterable[OCRInput]) -> Generator[Tuple[str, Union[bytes, Image.Image, Exception, None]], None, None]:
+        """
+        This internal method lazily expands the inputs into (name, content) pairs. File paths are yielded as (path, None). 
+        Zip and tar archives are read member by member without extraction, and each supported member is yielded as 
+        (archive path joined with member name, content). If an archive cannot be opened or read (e.g., missing or corrupt), 
+        (archive path, exception) is yielded, so that it fails on its own like a missing file. 
+        In-memory inputs are yielded as (name, bytes or image).
+        """
+        for input_index, file_input in enumerate(file_inputs):
+            if not isinstance(file_input, str):
+                yield self._read_in_memory_input(file_input, input_index)
+            elif is_archive(file_input):
+                try:
+                    for member_name, member_bytes in iter_archive_members(file_input, exts=SUPPORTED_IMAGE_EXTS):
+                        yield os.path.join(file_input, member_name), member_bytes
+                except Exception as e:
+                    yield file_input, e
+            else:
+                yield file_input, None
+
+    def _get_data_loader(self, file_path:str, max_dimension_pixels:int=None, data:Union[bytes, Image.Image]=None, 
+                         pdf_page_batch_size:int=None) -> DataLoader:
+        """
+        This internal method returns the data loader for a file path based on the file extension.
+        If max_dimension_pixels is specified, PDF pages are rendered directly at a size that fits in and large images are decoded at a reduced scale.
+        If data (file content or PIL image) is given, the input is read from memory and file_path is only used as its name.
+        If pdf_page_batch_size is specified, it overrides the OCR engine's pdf_page_batch_size.
+        """
+        if isinstance(data, Image.Image):
+            return ImageDataLoader(file_path, max_dimension_pixels=max_dimension_pixels, image=data)
+
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.pdf':
+            return PDFDataLoader(file_path, 
+                                 file_bytes=data,
+                                 rasterizer=self.pdf_rasterizer,
+                                 page_batch_size=pdf_page_batch_size if pdf_page_batch_size is not None else self.pdf_page_batch_size, 
+                                 thread_count=self.pdf_thread_count,
+                                 extract_embedded_images=self.extract_embedded_images,
+                                 max_dimension_pixels=max_dimension_pixels,
+                                 grayscale=self.pdf_grayscale,
+                                 spool=self.spool is not None,
+                                 spool_dir=self.spool.spool_dir if self.spool is not None else None,
+                                 use_text_layer=self.pdf_text_layer,
+                                 text_layer_min_chars=self.text_layer_min_chars,
+                                 text_layer_min_alnum_ratio=self.text_layer_min_alnum_ratio)
+        elif file_ext in ['.tif', '.tiff']:
+            return TIFFDataLoader(file_path, max_dimension_pixels=max_dimension_pixels, file_bytes=data)
+        else:
+            return ImageDataLoader(file_path, max_dimension_pixels=max_dimension_pixels, file_bytes=data)
 
+    def _load_page(self, data_loader:DataLoader, page_index:int, passthrough:bool=False, 
+                   use_text_layer:bool=True) -> Union[Image.Image, EncodedImage, str]:
+        """
+        This internal method loads a page. If use_text_layer is True and the page has a usable text layer (pdf_text_layer), 
+        the text is returned as a str and the page is not rendered. If passthrough is True and the page is stored in a format 
+        that the image encoder accepts as it is (e.g., a JPEG file that fits in max_dimension_pixels), the original bytes 
+        are returned without decoding.
+        """
+        if use_text_layer:
+            page_text = data_loader.get_page_text(page_index)
+            if page_text is not None:
+                return page_text
+        if passthrough:
+            encoded_image = data_loader.get_page_bytes(page_index)
+            if encoded_image is not None and self.image_encoder.accepts(encoded_image.mime_type):
+                return encoded_image
+        return data_loader.get_page(page_index)
+
+    def _format_text_layer(self, text:str) -> str:
+        """
+        This internal method formats the text layer of a page for the output mode.
+        """
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        text = "\n".join(line.rstrip() for line in text.split("\n"))
+        text = re.sub(r"\n{3,}", "\n\n", text).strip()
+        if self.output_mode == "HTML":
+            paragraphs = [p for p in text.split("\n\n") if p.strip()]
+            return "\n".join(f"<p>{html.escape(p).replace(chr(10), '<br>')}</p>" for p in paragraphs)
+        return text
+
+    def _use_passthrough(self, rotate_correction:bool=False, min_text_height_pixels:int=None, crop_margins:bool=False) -> bool:
+        """
+        This internal method returns True if pages can be sent as their original bytes, i.e., no preprocessing step changes the pixels 
+        (besides resizing to max_dimension_pixels, which the data loader checks).
+        """
+        return not rotate_correction and not crop_margins and min_text_height_pixels is None and self.vision_token_profile is None
+
+    def _iter_pages(self, data_loader:DataLoader, read_ahead:bool=True, passthrough:bool=False) -> Generator[Union[Image.Image, EncodedImage], None, None]:
+        """
+        This internal method lazily yields the pages of a data loader in order. 
+        If read_ahead is True, the next page is loaded in a background thread while the caller processes the current page. 
+        Close the generator before closing the data loader: closing it shuts down the read-ahead thread, 
+        after the page being loaded (if any) is done.
+        """
+        page_count = data_loader.get_page_count()
+        if not read_ahead:
+            for page_index in range(page_count):
+                yield self._load_page(data_loader, page_index, passthrough)
+            return
 
-    def stream_ocr(self, file_path: str, rotate_correction:bool=False, max_dimension_pixels:int=None) -> Generator[Dict[str, str], None, None]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(self._load_page, data_loader, 0, passthrough) if page_count > 0 else None
+            for page_index in range(page_count):
+                image = next_page.result()
+                if page_index + 1 < page_count:
+                    next_page = executor.submit(self._load_page, data_loader, page_index + 1, passthrough)
+                yield image
+
+    def _preprocess_page(self, image:Union[Image.Image, EncodedImage], rotate_correction:bool=False, 
+                         max_dimension_pixels:int=None, min_text_height_pixels:int=None, 
+                         crop_margins:bool=False, skip_blank_pages:bool=False) -> Tuple[Union[List[EncodedImage], None], Dict[str, Dict]]:
+        """
+        This internal method applies rotate correction, margin cropping and resizing (to max_dimension_pixels, to the text height, then to the token grid) 
+        to a page and encodes it for the VLM. 
+        Errors in a preprocessing step are recorded in the image processing status, and the page continues without that step.
+        Pages loaded as original bytes (passthrough) are returned as they are, unless they exceed the VLM engine's max_image_payload_bytes 
+        or the tile size.
+        With tiling, pages larger than the tile size are split into overlapping tiles, which are encoded separately.
+        If skip_blank_pages is True, blank pages are detected first and returned as None, so that no VLM call is made.
+
+        Returns:
+        -------
+        Tuple[Union[List[EncodedImage], None], Dict[str, Dict]]
+            The encoded page (one image, or the tiles in row-major order; None for a skipped blank page) 
+            and a dictionary with image processing status.
+        """
+        image_processing_status = {}
+        # Detect blank pages on a thumbnail before any other processing
+        if skip_blank_pages:
+            try:
+                if isinstance(image, EncodedImage):
+                    thumbnail = Image.open(io.BytesIO(image.data))
+                    thumbnail.draft("L", (512, 512))
+                else:
+                    thumbnail = image
+                blank, ink_fraction, std = self.image_processor.detect_blank_page(thumbnail, 
+                                                                                  max_ink_fraction=self.blank_page.max_ink_fraction, 
+                                                                                  max_std=self.blank_page.max_std,
+                                                                                  max_component_pixels=self.blank_page.max_component_pixels)
+                image_processing_status["blank_page"] = {
+                    "status": "success",
+                    "blank": blank,
+                    "ink_fraction": round(ink_fraction, 5),
+                    "std": round(std, 2)
+                }
+                if blank:
+                    return None, image_processing_status
+            except Exception as e:
+                image_processing_status["blank_page"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        if isinstance(image, EncodedImage):
+            max_payload_bytes = self._get_max_image_payload_bytes()
+            within_payload_limit = max_payload_bytes is None or image.base64_size <= max_payload_bytes
+            # Only the header is read to get the size
+            within_tile_size = self.tiling is None or max(Image.open(io.BytesIO(image.data)).size) <= self.tiling.tile_size_pixels
+            if within_payload_limit and within_tile_size:
+                image_processing_status["passthrough"] = {
+                    "status": "success",
+                    "mime_type": image.mime_type
+                }
+                return [image], image_processing_status
+            # Too large to send as it is. Decode and process it.
+            image = Image.open(io.BytesIO(image.data))
+
+        # Apply rotate correction if specified and tesseract is available
+        if rotate_correction and self.image_processor.has_tesseract:
+            try:
+                image, rotation_angle = self.image_processor.rotate_correction(image)
+                image_processing_status["rotate_correction"] = {
+                    "status": "success",
+                    "rotation_angle": rotation_angle
+                }
+            except Exception as e:
+                image_processing_status["rotate_correction"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        # Crop blank margins and dark borders before resizing, so the content gets the pixels
+        if crop_margins:
+            try:
+                image, cropped, crop_box = self.image_processor.crop_margins(image)
+                image_processing_status["crop_margins"] = {
+                    "status": "success",
+                    "cropped": cropped,
+                    "box": list(crop_box)
+                }
+            except Exception as e:
+                image_processing_status["crop_margins"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        # Resize the image if max_dimension_pixels is specified
+        if max_dimension_pixels is not None:
+            try:
+                image, resized = self.image_processor.resize(image, max_dimension_pixels=max_dimension_pixels)
+                image_processing_status["resize"] = {
+                    "status": "success",
+                    "resized": resized
+                }
+            except Exception as e:
+                image_processing_status["resize"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        # Downscale the image as far as the text stays legible if min_text_height_pixels is specified
+        if min_text_height_pixels is not None:
+            try:
+                image, resized, text_height = self.image_processor.resize_for_legibility(image, min_text_height_pixels=min_text_height_pixels)
+                image_processing_status["legibility_resize"] = {
+                    "status": "success",
+                    "resized": resized,
+                    "text_height": round(text_height, 1) if text_height is not None else None,
+                    "size": list(image.size)
+                }
+            except Exception as e:
+                image_processing_status["legibility_resize"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        # Split pages larger than the tile size into overlapping tiles. Each tile is encoded (and OCR'd) on its own.
+        if self.tiling is not None and max(image.size) > self.tiling.tile_size_pixels:
+            try:
+                tiles, boxes, grid = self.image_processor.split_into_tiles(image, tile_size_pixels=self.tiling.tile_size_pixels, 
+                                                                           overlap=self.tiling.overlap)
+                encoded_images, tile_statuses = [], []
+                for tile, box in zip(tiles, boxes):
+                    encoded_image, tile_status = self._encode_page(tile)
+                    encoded_images.append(encoded_image)
+                    tile_statuses.append({"box": list(box), **tile_status})
+                image_processing_status["tiling"] = {
+                    "status": "success",
+                    "grid": list(grid),
+                    "tiles": tile_statuses
+                }
+                return encoded_images, image_processing_status
+            except Exception as e:
+                image_processing_status["tiling"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        encoded_image, encoding_status = self._encode_page(image)
+        image_processing_status.update(encoding_status)
+        return [encoded_image], image_processing_status
+
+    def _encode_page(self, image:Image.Image) -> Tuple[EncodedImage, Dict[str, Dict]]:
+        """
+        This internal method resizes a page (or a tile) to the token grid and encodes it within the VLM engine's max_image_payload_bytes.
+        Pages that exceed max_image_payload_bytes are recompressed (lower quality, then smaller dimensions) until they fit.
+
+        Returns:
+        -------
+        Tuple[EncodedImage, Dict[str, Dict]]
+            The encoded image and a dictionary with the status of the steps.
+        """
+        image_processing_status = {}
+        # Resize the image to the vision model's token grid if a profile is specified
+        if self.vision_token_profile is not None:
+            try:
+                image, resized, image_tokens = self.image_processor.resize_to_token_grid(image, self.vision_token_profile, 
+                                                                                         max_image_tokens=self.max_image_tokens)
+                image_processing_status["token_grid_resize"] = {
+                    "status": "success",
+                    "resized": resized,
+                    "size": list(image.size),
+                    "image_tokens": image_tokens
+                }
+            except Exception as e:
+                image_processing_status["token_grid_resize"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+
+        max_payload_bytes = self._get_max_image_payload_bytes()
+        if max_payload_bytes is None:
+            return self.image_encoder.encode(image), image_processing_status
+
+        # Step down the encoding quality or dimensions until the page fits in the payload limit
+        try:
+            encoded, info = self.image_encoder.encode_within_limit(image, max_payload_bytes)
+            if info["steps"]:
+                image_processing_status["payload_size_guard"] = {"status": "success", **info}
+            return encoded, image_processing_status
+        except ValueError as e:
+            image_processing_status["payload_size_guard"] = {
+                "status": "error",
+                "error": str(e)
+            }
+            return self.image_encoder.encode(image), image_processing_status
+
+    def _stitch_tiles(self, texts:List[str], image_processing_status:Dict[str, Dict]) -> str:
+        """
+        This internal method joins the OCR texts of the tiles of a page into the page text, removing the text repeated in the overlaps.
+        """
+        if len(texts) == 1:
+            return texts[0]
+        rows, cols = image_processing_status["tiling"]["grid"]
+        return stitch_tile_texts(texts, rows=rows, cols=cols)
+
+    def _get_pack_cost(self, encoded_image:EncodedImage) -> Tuple[int, int, int]:
+        """
+        This internal method returns the size of an encoded page for packing: the number of pixels, the number of image tokens
+        (0 without a vision_token_profile) and the base64 size. Only the image header is read.
+        """
+        width, height = Image.open(io.BytesIO(encoded_image.data)).size
+        image_tokens = 0
+        if self.vision_token_profile is not None:
+            image_tokens = VISION_TOKEN_PROFILES[self.vision_token_profile].count_tokens(width, height)
+        return width * height, image_tokens, encoded_image.base64_size
+
+    def _fits_in_pack(self, pack:List[Tuple], cost:Tuple[int, int, int]) -> bool:
+        """
+        This internal method returns True if a page of the given size (see _get_pack_cost) can be added to a pack of pages.
+        The pages of a pack must also fit in the VLM engine's max_image_payload_bytes together, so that they are not recompressed.
+        Pack entries are (page_index, encoded_image, image_processing_status, cost).
+        """
+        if len(pack) >= self.packing.max_pages:
+            return False
+        pixels = cost[0] + sum(entry[3][0] for entry in pack)
+        image_tokens = cost[1] + sum(entry[3][1] for entry in pack)
+        payload_size = cost[2] + sum(entry[3][2] for entry in pack)
+        max_payload_bytes = self._get_max_image_payload_bytes()
+        return (self.packing.max_pixels is None or pixels <= self.packing.max_pixels) and \
+               (self.packing.max_image_tokens is None or image_tokens <= self.packing.max_image_tokens) and \
+               (max_payload_bytes is None or payload_size <= max_payload_bytes)
+
+    def _get_pack_messages(self, pack:List[Tuple]) -> List[Dict[str,str]]:
+        """
+        This internal method returns the chat messages for a pack of pages. A pack of one page gets the usual messages.
+        If the pages are over the VLM engine's max_image_payload_bytes together, they are recompressed to fit, 
+        and the steps are recorded as "payload_size_guard" in the image processing status of the pages.
+        """
+        encoded_images, infos = self.vlm_engine.fit_images_to_payload([entry[1] for entry in pack])
+        for entry, info in zip(pack, infos):
+            if info["steps"]:
+                entry[2]["payload_size_guard"] = {"status": "success", **info}
+        if len(pack) == 1:
+            return self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, encoded_images[0])
+        user_prompt = f"{self.user_prompt}\n\n{get_page_packing_prompt(len(pack))}"
+        return self.vlm_engine.get_ocr_messages(self.system_prompt, user_prompt, encoded_images)
+
+    def _split_pack_response(self, response:str, pack:List[Tuple]) -> Union[List[str], None]:
+        """
+        This internal method splits the response to a pack of pages into the page texts and records "page_packing"
+        in the image processing status of the pages. Returns None if the response cannot be split.
+        """
+        if self.output_mode == "markdown":
+            response = clean_markdown(response)
+        if len(pack) == 1:
+            return [response]
+
+        try:
+            texts = split_packed_response(response, len(pack))
+        except ValueError as e:
+            for entry in pack:
+                entry[2]["page_packing"] = {
+                    "status": "error",
+                    "error": str(e)
+                }
+            return None
+
+        for position, entry in enumerate(pack):
+            entry[2]["page_packing"] = {
+                "status": "success",
+                "pages": len(pack),
+                "position": position + 1
+            }
+        return texts
+
+    def _ocr_pack(self, pack:List[Tuple], verbose:bool=False) -> List[str]:
+        """
+        This internal method OCR a pack of pages in one VLM request and returns the page texts.
+        If the response cannot be split per page, the pages are OCR'd one by one.
+        """
+        response = self.vlm_engine.chat(self._get_pack_messages(pack), verbose=verbose, stream=False)
+        texts = self._split_pack_response(response, pack)
+        if texts is not None:
+            return texts
+
+        texts = []
+        for entry in pack:
+            response = self.vlm_engine.chat(self._get_pack_messages([entry]), verbose=verbose, stream=False)
+            texts.extend(self._split_pack_response(response, [entry]))
+        return texts
+
+    def _add_pack_to_result(self, ocr_result:OCRResult, pack:List[Tuple], filename:str, verbose:bool=False):
+        """
+        This internal method OCR a pack of pages and adds the pages to the OCR result in order. The pack is emptied.
+        """
+        if not pack:
+            return
+        try:
+            texts = self._ocr_pack(pack, verbose=verbose)
+            for (page_index, _, image_processing_status, _), text in zip(pack, texts):
+                if verbose and "page_packing" in image_processing_status:
+                    self._print_image_processing_status(filename, page_index, {"page_packing": image_processing_status["page_packing"]})
+                ocr_result.add_page(text=text, image_processing_status=image_processing_status, source="vlm")
+        except Exception as pack_e:
+            ocr_result.status = "error"
+            for _ in pack:
+                ocr_result.add_page(text=f"Error during OCR for a page in {filename}: {str(pack_e)}",
+                                    image_processing_status={})
+            if verbose:
+                print(f"{Fore.RED}Error during OCR for a page in {filename}:{Style.RESET_ALL} {pack_e}")
+        pack.clear()
+
+    def _print_image_processing_status(self, filename:str, page_index:int, image_processing_status:Dict[str, Dict]):
+        """
+        This internal method prints the image processing status of a page in verbose mode.
+        """
+        for step, step_status in image_processing_status.items():
+            step_name = step.replace("_", " ")
+            if step_status.get("status") == "error":
+                print(f"{Fore.RED}Error during {step_name} for {filename} page {page_index}:{Style.RESET_ALL} {step_status['error']}. OCR continues without {step_name}.")
+            else:
+                details = ", ".join(f"{key}={value}" for key, value in step_status.items() if key not in ["status", "tiles"])
+                print(f"{Fore.GREEN}{step_name.capitalize()} for {filename} page {page_index}: {details}{Style.RESET_ALL}")
+
+
+    def stream_ocr(self, file_path: OCRInput, rotate_correction:bool=False, max_dimension_pixels:int=None, 
+                   min_text_height_pixels:int=None, crop_margins:bool=False, skip_blank_pages:bool=False, 
+                   read_ahead:bool=True) -> Generator[Dict[str, str], None, None]:
         """
         This method inputs a file path (image or PDF) and stream OCR results in real-time. This is useful for frontend applications.
         Yields dictionaries with 'type' ('ocr_chunk' or 'page_delimiter') and 'data'.
 
         Parameters:
         -----------
-        file_path : str
+        file_path : Union[str, bytes, BinaryIO, Image.Image]
             The path to the image or PDF file. Must be one of '.pdf', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp'
+            The file content (bytes or a binary file-like object) or a PIL image can be passed instead. The file type of bytes 
+            is detected from the content.
         rotate_correction : bool, Optional
             If True, applies rotate correction to the images using pytesseract.
         max_dimension_pixels : int, Optional
             The maximum dimension of the image in pixels. Original dimensions will be resized to fit in. If None, no resizing is applied.
+        min_text_height_pixels : int, Optional
+            If specified, the text line height of each page is estimated and the page is downscaled to the smallest size 
+            that keeps text lines at least this many pixels tall. Pages are never upscaled.
+        crop_margins : bool, Optional
+            If True, blank margins, scanner bed edges and black borders are cropped (with padding) before resizing.
+        skip_blank_pages : bool, Optional
+            If True, blank pages (low ink density and gray level variance on a thumbnail) are not sent to the VLM. 
+            They are added as empty pages, with "blank_page" in their image processing status.
+        read_ahead : bool, Optional
+            If True, the next page is loaded in the background while the current page is processed.
 
         Returns:
         --------
@@ -79,116 +793,134 @@ class OCREngine:
             {"type": "ocr_chunk", "data": chunk}
             {"type": "page_delimiter", "data": page_delimiter}
         """
-        # Check file path
+        # Check file path. In-memory inputs are read into (name, content).
+        data = None
         if not isinstance(file_path, str):
-            raise TypeError("file_path must be a string")
+            file_path, data = self._read_in_memory_input(file_path)
         
         # Check file extension
         file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext not in SUPPORTED_IMAGE_EXTS:
+        if file_ext not in SUPPORTED_IMAGE_EXTS and not isinstance(data, Image.Image):
             raise ValueError(f"Unsupported file type: {file_ext}. Supported types are: {SUPPORTED_IMAGE_EXTS}")
         
         # Check if image preprocessing can be applied
         if self.image_processor.has_tesseract==False and rotate_correction:
             raise ImportError("pytesseract is not installed. Please install it to use rotate correction.")
 
-        # PDF or TIFF
-        if file_ext in ['.pdf', '.tif', '.tiff']:
-            data_loader = PDFDataLoader(file_path) if file_ext == '.pdf' else TIFFDataLoader(file_path)
-            images = data_loader.get_all_pages()
-            # Check if images were extracted
-            if not images:
+        data_loader = self._get_data_loader(file_path, max_dimension_pixels=max_dimension_pixels, data=data)
+        pages = None
+        try:
+            # Check if images can be extracted
+            page_count = data_loader.get_page_count()
+            if page_count == 0:
                 raise ValueError(f"No images extracted from file: {file_path}")
-            
-            # OCR each image
-            for i, image in enumerate(images):
-                # Apply rotate correction if specified and tesseract is available
-                if rotate_correction and self.image_processor.has_tesseract:
-                    try:
-                        image, _ = self.image_processor.rotate_correction(image)
-                        
-                    except Exception as e:
-                        yield {"type": "info", "data": f"Error during rotate correction: {str(e)}"}
-                        
-                # Resize the image if max_dimension_pixels is specified
-                if max_dimension_pixels is not None:
-                    try:
-                        image, _ = self.image_processor.resize(image, max_dimension_pixels=max_dimension_pixels)
-                    except Exception as e:
-                        yield {"type": "info", "data": f"Error resizing image: {str(e)}"}
-
-                messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, image)
-                response_stream = self.vlm_engine.chat(
-                    messages,
-                    stream=True
-                )
-                for chunk in response_stream:
-                    yield {"type": "ocr_chunk", "data": chunk}
-
-                if i < len(images) - 1:
+
+            # OCR each image. Pages are loaded lazily, so the first page is sent before the whole document is rendered.
+            # Pages that need no rotate correction or resizing are sent as their original bytes.
+            pages = self._iter_pages(data_loader, read_ahead=read_ahead, passthrough=self._use_passthrough(rotate_correction, min_text_height_pixels, crop_margins))
+            for i, image in enumerate(pages):
+                if i > 0:
                     yield {"type": "page_delimiter", "data": get_default_page_delimiter(self.output_mode)}
 
-        # Image
-        else:
-            data_loader = ImageDataLoader(file_path)
-            image = data_loader.get_page(0)
+                # Pages with a usable text layer are not sent to the VLM
+                if isinstance(image, str):
+                    yield {"type": "ocr_chunk", "data": self._format_text_layer(image)}
+                    continue
 
-            # Apply rotate correction if specified and tesseract is available
-            if rotate_correction and self.image_processor.has_tesseract:
-                try:
-                    image, _ = self.image_processor.rotate_correction(image)
-                    
-                except Exception as e:
-                    yield {"type": "info", "data": f"Error during rotate correction: {str(e)}"}
-                    
-            # Resize the image if max_dimension_pixels is specified
-            if max_dimension_pixels is not None:
-                try:
-                    image, _ = self.image_processor.resize(image, max_dimension_pixels=max_dimension_pixels)
-                except Exception as e:
-                    yield {"type": "info", "data": f"Error resizing image: {str(e)}"}
-
-            messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, image)
-            response_stream = self.vlm_engine.chat(
-                    messages,
-                    stream=True
-                )
-            for chunk in response_stream:
-                yield {"type": "ocr_chunk", "data": chunk}
-            
+                encoded_images, image_processing_status = self._preprocess_page(image, rotate_correction=rotate_correction, 
+                                                                                max_dimension_pixels=max_dimension_pixels,
+                                                                                min_text_height_pixels=min_text_height_pixels,
+                                                                                crop_margins=crop_margins,
+                                                                                skip_blank_pages=skip_blank_pages)
+                for step, step_status in image_processing_status.items():
+                    if step_status.get("status") == "error":
+                        yield {"type": "info", "data": f"Error during {step.replace('_', ' ')}: {step_status['error']}"}
+
+                # Blank pages are not sent to the VLM
+                if encoded_images is None:
+                    yield {"type": "info", "data": f"Page {i} is blank. Skipped."}
+                elif len(encoded_images) == 1:
+                    messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, encoded_images[0])
+                    response_stream = self.vlm_engine.chat(
+                        messages,
+                        stream=True
+                    )
+                    for chunk in response_stream:
+                        yield {"type": "ocr_chunk", "data": chunk}
+                else:
+                    # Tiles are OCR'd one by one and the stitched page is sent as one chunk, since the overlaps 
+                    # can only be removed once the tiles are complete.
+                    yield {"type": "info", "data": f"Page {i} is split into {len(encoded_images)} tiles."}
+                    tile_texts = []
+                    for encoded_image in encoded_images:
+                        messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, encoded_image)
+                        tile_text = self.vlm_engine.chat(messages, stream=False)
+                        tile_texts.append(clean_markdown(tile_text) if self.output_mode == "markdown" else tile_text)
+                    yield {"type": "ocr_chunk", "data": self._stitch_tiles(tile_texts, image_processing_status)}
+
+        finally:
+            # The consumer may stop early. Stop the read-ahead (waiting for a page being loaded) before the loader is closed.
+            if pages is not None:
+                pages.close()
+            data_loader.close()
 
-    def sequential_ocr(self, file_paths: Union[str, Iterable[str]], rotate_correction:bool=False, 
-                       max_dimension_pixels:int=None, verbose:bool=False) -> List[OCRResult]:
+
+    def sequential_ocr(self, file_paths: Union[OCRInput, Iterable[OCRInput]], rotate_correction:bool=False, 
+                       max_dimension_pixels:int=None, min_text_height_pixels:int=None, crop_margins:bool=False, 
+                       skip_blank_pages:bool=False, verbose:bool=False, 
+                       read_ahead:bool=True) -> List[OCRResult]:
         """
         This method inputs a file path or a list of file paths (image, PDF, TIFF) and performs OCR using the VLM inference engine.
 
         Parameters:
         -----------
-        file_paths : Union[str, Iterable[str]]
+        file_paths : Union[OCRInput, Iterable[OCRInput]]
             A file path or a list of file paths to process. Must be one of '.pdf', '.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp'
+            Zip and tar archives ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz') are read without extraction. 
+            Each supported member is processed as a file, with input_dir set to the archive path joined with the member name.
+            In-memory inputs (bytes, binary file-like objects and PIL images) are accepted as well. Their input_dir is the 
+            object's name if it has one (e.g., file.name), otherwise 'input_<index>' with the extension detected from the content.
         rotate_correction : bool, Optional
             If True, applies rotate correction to the images using pytesseract.
         max_dimension_pixels : int, Optional
             The maximum dimension of the image in pixels. Original dimensions will be resized to fit in. If None, no resizing is applied.
+        min_text_height_pixels : int, Optional
+            If specified, the text line height of each page is estimated and the page is downscaled to the smallest size 
+            that keeps text lines at least this many pixels tall. Pages are never upscaled.
+        crop_margins : bool, Optional
+            If True, blank margins, scanner bed edges and black borders are cropped (with padding) before resizing.
+        skip_blank_pages : bool, Optional
+            If True, blank pages (low ink density and gray level variance on a thumbnail) are not sent to the VLM. 
+            They are added as empty pages, with "blank_page" in their image processing status.
         verbose : bool, Optional
             If True, the function will print the output in terminal.
+        read_ahead : bool, Optional
+            If True, the next page is loaded in the background while the current page is processed.
         
         Returns:
         --------
         List[OCRResult]
             A list of OCR result objects.
         """
-        if isinstance(file_paths, str):
+        if self._is_single_input(file_paths):
             file_paths = [file_paths]
 
         ocr_results = []
-        for file_path in file_paths:
+        for file_path, data in self._iter_inputs(file_paths):
             # Define OCRResult object
             ocr_result = OCRResult(input_dir=file_path, output_mode=self.output_mode)
+            # Archives that could not be read
+            if isinstance(data, Exception):
+                if verbose:
+                    print(f"{Fore.RED}Error processing file {os.path.basename(file_path)}:{Style.RESET_ALL} {str(data)}")
+                ocr_result.status = "error"
+                ocr_result.add_page(text=f"Error processing file {os.path.basename(file_path)}: {str(data)}", image_processing_status={})
+                ocr_results.append(ocr_result)
+                continue
             # get file extension
             file_ext = os.path.splitext(file_path)[1].lower()
             # Check file extension
-            if file_ext not in SUPPORTED_IMAGE_EXTS:
+            if file_ext not in SUPPORTED_IMAGE_EXTS and not isinstance(data, Image.Image):
                 if verbose:
                     print(f"{Fore.RED}Unsupported file type:{Style.RESET_ALL} {file_ext}. Supported types are: {SUPPORTED_IMAGE_EXTS}")
                 ocr_result.status = "error"
@@ -200,15 +932,9 @@ class OCREngine:
             filename = os.path.basename(file_path)
             
             try:
-                # Load images from file
-                if file_ext == '.pdf':
-                    data_loader = PDFDataLoader(file_path) 
-                elif file_ext in ['.tif', '.tiff']:
-                    data_loader = TIFFDataLoader(file_path)
-                else:
-                    data_loader = ImageDataLoader(file_path)
-                
-                images = data_loader.get_all_pages()
+                # Open the file. Pages are loaded lazily while OCR runs.
+                data_loader = self._get_data_loader(file_path, max_dimension_pixels=max_dimension_pixels, data=data)
+                page_count = data_loader.get_page_count()
             except Exception as e:
                 if verbose:
                     print(f"{Fore.RED}Error processing file {filename}:{Style.RESET_ALL} {str(e)}")
@@ -217,8 +943,9 @@ class OCREngine:
                 ocr_results.append(ocr_result)
                 continue
 
-            # Check if images were extracted
-            if not images:
+            # Check if images can be extracted
+            if page_count == 0:
+                data_loader.close()
                 if verbose:
                     print(f"{Fore.RED}No images extracted from file:{Style.RESET_ALL} {filename}. It might be empty or corrupted.")
                 ocr_result.status = "error"
@@ -227,69 +954,89 @@ class OCREngine:
                 ocr_results.append(ocr_result)
                 continue
             
-            # OCR images
-            for i, image in enumerate(images):
-                image_processing_status = {}
-                # Apply rotate correction if specified and tesseract is available
-                if rotate_correction and self.image_processor.has_tesseract:
-                    try:
-                        image, rotation_angle = self.image_processor.rotate_correction(image)
-                        image_processing_status["rotate_correction"] = {
-                            "status": "success",
-                            "rotation_angle": rotation_angle
-                        }
-                        if verbose:
-                            print(f"{Fore.GREEN}Rotate correction applied for {filename} page {i} with angle {rotation_angle} degrees.{Style.RESET_ALL}")
-                    except Exception as e:
-                        image_processing_status["rotate_correction"] = {
-                            "status": "error",
-                            "error": str(e)
-                        }
-                        if verbose:
-                            print(f"{Fore.RED}Error during rotate correction for {filename}:{Style.RESET_ALL} {rotation_angle['error']}. OCR continues without rotate correction.")
-
-                # Resize the image if max_dimension_pixels is specified
-                if max_dimension_pixels is not None:
-                    try:
-                        image, resized = self.image_processor.resize(image, max_dimension_pixels=max_dimension_pixels)
-                        image_processing_status["resize"] = {
-                            "status": "success",
-                            "resized": resized
-                        }
-                        if verbose and resized:
-                            print(f"{Fore.GREEN}Image resized for {filename} page {i} to fit within {max_dimension_pixels} pixels.{Style.RESET_ALL}")
-                    except Exception as e:
-                        image_processing_status["resize"] = {
-                            "status": "error",
-                            "error": str(e)
-                        }
-                        if verbose:
-                            print(f"{Fore.RED}Error resizing image for {filename}:{Style.RESET_ALL} {resized['error']}. OCR continues without resizing.")
+            # OCR images. With packing, small pages wait in a pack until it is full.
+            load_error = None
+            pack = []
+            pages = self._iter_pages(data_loader, read_ahead=read_ahead, passthrough=self._use_passthrough(rotate_correction, min_text_height_pixels, crop_margins))
+            for i in range(page_count):
+                try:
+                    image = next(pages)
+                except Exception as e:
+                    load_error = e
+                    self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+                    if verbose:
+                        print(f"{Fore.RED}Error processing file {filename}:{Style.RESET_ALL} {str(e)}")
+                    ocr_result.add_page(text=f"Error processing file {filename}: {str(e)}", image_processing_status={})
+                    break
+
+                # Pages with a usable text layer are not sent to the VLM
+                if isinstance(image, str):
+                    self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+                    if verbose:
+                        print(f"{Fore.GREEN}Text layer used for {filename} page {i}{Style.RESET_ALL}")
+                    ocr_result.add_page(text=self._format_text_layer(image), image_processing_status={}, source="text_layer")
+                    continue
 
                 try:
-                    messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, image)
-                    response = self.vlm_engine.chat(
-                        messages,
-                        verbose=verbose,
-                        stream=False
-                    )
-                    # Clean the response if output mode is markdown
-                    if self.output_mode == "markdown":
-                        response = clean_markdown(response)
+                    encoded_images, image_processing_status = self._preprocess_page(image, rotate_correction=rotate_correction, 
+                                                                                    max_dimension_pixels=max_dimension_pixels,
+                                                                                    min_text_height_pixels=min_text_height_pixels,
+                                                                                    crop_margins=crop_margins,
+                                                                                    skip_blank_pages=skip_blank_pages)
+                    if verbose:
+                        self._print_image_processing_status(filename, i, image_processing_status)
+
+                    # Blank pages are not sent to the VLM
+                    if encoded_images is None:
+                        self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+                        ocr_result.add_page(text="", image_processing_status=image_processing_status, source="blank_page")
+                        continue
+
+                    # Add the page to the pack. A full pack is OCR'd first.
+                    if self.packing is not None and len(encoded_images) == 1:
+                        cost = self._get_pack_cost(encoded_images[0])
+                        if not self._fits_in_pack(pack, cost):
+                            self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+                        pack.append((i, encoded_images[0], image_processing_status, cost))
+                        continue
+                    self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+
+                    # OCR the page (or each of its tiles)
+                    responses = []
+                    for encoded_image in encoded_images:
+                        messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, encoded_image)
+                        response = self.vlm_engine.chat(
+                            messages,
+                            verbose=verbose,
+                            stream=False
+                        )
+                        # Clean the response if output mode is markdown
+                        if self.output_mode == "markdown":
+                            response = clean_markdown(response)
+                        responses.append(response)
                     
                     # Add the page to the OCR result
-                    ocr_result.add_page(text=response, 
-                                        image_processing_status=image_processing_status)
+                    ocr_result.add_page(text=self._stitch_tiles(responses, image_processing_status), 
+                                        image_processing_status=image_processing_status,
+                                        source="vlm")
                 
                 except Exception as page_e:
+                    self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
                     ocr_result.status = "error"
                     ocr_result.add_page(text=f"Error during OCR for a page in {filename}: {str(page_e)}",
                                         image_processing_status={})
                     if verbose:
                         print(f"{Fore.RED}Error during OCR for a page in {filename}:{Style.RESET_ALL} {page_e}")
 
-            # Add the OCR result to the list
-            ocr_result.status = "success"
+            self._add_pack_to_result(ocr_result, pack, filename, verbose=verbose)
+            pages.close()
+            data_loader.close()
+
+            # Add the OCR result to the list. A page that failed has already set the status to "error".
+            if load_error:
+                ocr_result.status = "error"
+            elif ocr_result.status != "error":
+                ocr_result.status = "success"
             ocr_results.append(ocr_result)
 
             if verbose:
@@ -301,8 +1048,12 @@ class OCREngine:
         return ocr_results
 
 
-    def concurrent_ocr(self, file_paths: Union[str, Iterable[str]], rotate_correction:bool=False, 
-                       max_dimension_pixels:int=None, concurrent_batch_size: int=32, max_file_load: int=None) -> AsyncGenerator[OCRResult, None]:
+    def concurrent_ocr(self, file_paths: Union[OCRInput, Iterable[OCRInput]], rotate_correction:bool=False, 
+                       max_dimension_pixels:int=None, min_text_height_pixels:int=None, crop_margins:bool=False, 
+                       skip_blank_pages:bool=False, concurrent_batch_size: int=32, max_file_load: int=None, 
+                       load_workers:int=4, preprocess_workers:int=None, prefetch_pages:int=None, 
+                       lag_monitor:EventLoopLagMonitor=None, 
+                       vlm_call_limiter:AdaptiveConcurrencyLimiter=None) -> AsyncGenerator[OCRResult, None]:
         """
         First complete first out. Input and output order not guaranteed.
         This method inputs a file path or a list of file paths (image, PDF, TIFF) and performs OCR using the VLM inference engine. 
@@ -310,23 +1061,52 @@ class OCREngine:
 
         Parameters:
         -----------
-        file_paths : Union[str, Iterable[str]]
+        file_paths : Union[OCRInput, Iterable[OCRInput]]
             A file path or a list of file paths to process. Must be one of '.pdf', '.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp'
+            Zip and tar archives ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz') are read without extraction. 
+            Each supported member is processed as a file, with input_dir set to the archive path joined with the member name.
+            In-memory inputs (bytes, binary file-like objects and PIL images) are accepted as well. Their input_dir is the 
+            object's name if it has one (e.g., file.name), otherwise 'input_<index>' with the extension detected from the content.
         rotate_correction : bool, Optional
             If True, applies rotate correction to the images using pytesseract.
         max_dimension_pixels : int, Optional
             The maximum dimension of the image in pixels. Origianl dimensions will be resized to fit in. If None, no resizing is applied.
+        min_text_height_pixels : int, Optional
+            If specified, the text line height of each page is estimated and the page is downscaled to the smallest size 
+            that keeps text lines at least this many pixels tall. Pages are never upscaled.
+        crop_margins : bool, Optional
+            If True, blank margins, scanner bed edges and black borders are cropped (with padding) before resizing.
+        skip_blank_pages : bool, Optional
+            If True, blank pages (low ink density and gray level variance on a thumbnail) are not sent to the VLM. 
+            They are added as empty pages, with "blank_page" in their image processing status.
         concurrent_batch_size : int, Optional
             The number of concurrent VLM calls to make. 
         max_file_load : int, Optional
             The maximum number of files to load concurrently. If None, defaults to 2 times of concurrent_batch_size.
+            Inputs are pulled from file_paths (which can be a generator) only when a file finishes, 
+            so memory use stays the same for any number of inputs.
+        load_workers : int, Optional
+            The number of threads that open files and load (rasterize) pages.
+        preprocess_workers : int, Optional
+            The number of threads that preprocess (rotate correction, cropping, resizing) and encode pages. 
+            If None, defaults to the number of CPUs. Not used if the OCR engine has preprocess_processes.
+        prefetch_pages : int, Optional
+            The number of pages that are loaded and preprocessed ahead of the VLM calls, so that a page is ready 
+            whenever a VLM call finishes. If None, defaults to concurrent_batch_size.
+        lag_monitor : EventLoopLagMonitor, Optional
+            If specified, the monitor runs (if not already running) while the files are processed and reports 
+            blocking stretches of the event loop. It is stopped when the generator finishes.
+        vlm_call_limiter : AdaptiveConcurrencyLimiter, Optional
+            If specified, the number of concurrent VLM calls is adjusted at runtime by the limiter (backing off on 
+            429/5xx responses, timeouts and slow calls), between its min_limit and max_limit, instead of being 
+            fixed at concurrent_batch_size. The current limit can be read from vlm_call_limiter.limit while running.
         
         Returns:
         --------
         AsyncGenerator[OCRResult, None]
             A generator that yields OCR result objects as they complete.
         """
-        if isinstance(file_paths, str):
+        if self._is_single_input(file_paths):
             file_paths = [file_paths]
         
         if max_file_load is None:
@@ -334,6 +1114,20 @@ class OCREngine:
 
         if not isinstance(max_file_load, int) or max_file_load <= 0:
             raise ValueError("max_file_load must be a positive integer")
+
+        if preprocess_workers is None:
+            preprocess_workers = os.cpu_count() or 1
+        if vlm_call_limiter is not None and not isinstance(vlm_call_limiter, AdaptiveConcurrencyLimiter):
+            raise TypeError("vlm_call_limiter must be an AdaptiveConcurrencyLimiter")
+        if prefetch_pages is None:
+            prefetch_pages = vlm_call_limiter.max_limit if vlm_call_limiter is not None else concurrent_batch_size
+
+        if not isinstance(load_workers, int) or load_workers <= 0:
+            raise ValueError("load_workers must be a positive integer")
+        if not isinstance(preprocess_workers, int) or preprocess_workers <= 0:
+            raise ValueError("preprocess_workers must be a positive integer")
+        if not isinstance(prefetch_pages, int) or prefetch_pages < 0:
+            raise ValueError("prefetch_pages must be a non-negative integer")
         
         if self.image_processor.has_tesseract==False and rotate_correction:
             raise ImportError("pytesseract is not installed. Please install it to use rotate correction.")
@@ -341,135 +1135,428 @@ class OCREngine:
         return self._ocr_async(file_paths=file_paths, 
                                rotate_correction=rotate_correction,
                                max_dimension_pixels=max_dimension_pixels,
+                               min_text_height_pixels=min_text_height_pixels,
+                               crop_margins=crop_margins,
+                               skip_blank_pages=skip_blank_pages,
                                concurrent_batch_size=concurrent_batch_size, 
-                               max_file_load=max_file_load)
+                               max_file_load=max_file_load,
+                               load_workers=load_workers,
+                               preprocess_workers=preprocess_workers,
+                               prefetch_pages=prefetch_pages,
+                               lag_monitor=lag_monitor,
+                               vlm_call_limiter=vlm_call_limiter)
     
 
-    async def _ocr_async(self, file_paths: Iterable[str], rotate_correction:bool=False, max_dimension_pixels:int=None, 
-                         concurrent_batch_size: int=32, max_file_load: int=None) -> AsyncGenerator[OCRResult, None]:
+    async def _ocr_async(self, file_paths: Iterable[OCRInput], rotate_correction:bool=False, max_dimension_pixels:int=None, 
+                         min_text_height_pixels:int=None, crop_margins:bool=False, skip_blank_pages:bool=False, 
+                         concurrent_batch_size: int=32, max_file_load: int=None, load_workers:int=4, 
+                         preprocess_workers:int=1, prefetch_pages:int=0, 
+                         lag_monitor:EventLoopLagMonitor=None, 
+                         vlm_call_limiter:AdaptiveConcurrencyLimiter=None) -> AsyncGenerator[OCRResult, None]:
         """
         Internal method to asynchronously process an iterable of file paths.
         Yields OCRResult objects as they complete. Order not guaranteed.
-        concurrent_batch_size controls how many VLM calls are made concurrently.
+        concurrent_batch_size controls how many VLM calls are made concurrently. Loading and preprocessing run in 
+        their own thread pools (load_workers, preprocess_workers), so they do not take VLM call slots, and up to 
+        prefetch_pages pages are prepared ahead of the VLM calls. With preprocess_processes, preprocessing runs in 
+        worker processes instead. lag_monitor, if given, runs until the generator finishes. vlm_call_limiter, 
+        if given, replaces the fixed VLM call semaphore, and the page buffer is sized for its max_limit.
         """
-        vlm_call_semaphore = asyncio.Semaphore(concurrent_batch_size)
-        file_load_semaphore = asyncio.Semaphore(max_file_load) 
+        if self.preprocess_processes is not None:
+            # Spawned (not forked) workers, since this process runs threads (e.g., the load stage) that may hold locks
+            preprocess_executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.preprocess_processes,
+                                                                         mp_context=multiprocessing.get_context("spawn"),
+                                                                         initializer=_init_preprocess_worker,
+                                                                         initargs=(self._get_preprocess_worker_config(),))
+            preprocess_page = _preprocess_page_in_worker
+            load_and_preprocess_page = _load_and_preprocess_page_in_worker
+        else:
+            preprocess_executor = concurrent.futures.ThreadPoolExecutor(max_workers=preprocess_workers, 
+                                                                        thread_name_prefix="vlm4ocr-preprocess")
+            preprocess_page = self._preprocess_page
+            load_and_preprocess_page = None
+
+        if vlm_call_limiter is not None:
+            vlm_call_semaphore = vlm_call_limiter
+            max_vlm_calls = vlm_call_limiter.max_limit
+        else:
+            vlm_call_semaphore = asyncio.Semaphore(concurrent_batch_size)
+            max_vlm_calls = concurrent_batch_size
 
-        tasks = []
-        for file_path in file_paths:
-            task = self._ocr_file_with_semaphore(file_load_semaphore=file_load_semaphore, 
-                                                 vlm_call_semaphore=vlm_call_semaphore, 
-                                                 file_path=file_path, 
-                                                 rotate_correction=rotate_correction,
-                                                 max_dimension_pixels=max_dimension_pixels)
-            tasks.append(task)
+        stages = _PipelineStages(vlm_call_semaphore=vlm_call_semaphore,
+                                 page_buffer=asyncio.Semaphore(max_vlm_calls + prefetch_pages),
+                                 page_buffer_size=max_vlm_calls + prefetch_pages,
+                                 page_buffer_lock=asyncio.Lock(),
+                                 load_executor=concurrent.futures.ThreadPoolExecutor(max_workers=load_workers, 
+                                                                                     thread_name_prefix="vlm4ocr-load"),
+                                 preprocess_executor=preprocess_executor,
+                                 preprocess_page=preprocess_page,
+                                 load_and_preprocess_page=load_and_preprocess_page)
+        loop = asyncio.get_running_loop()
+        if lag_monitor is not None:
+            lag_monitor.start()
 
+        # Inputs are pulled only when a file slot is free, so at most max_file_load files are in flight 
+        # and memory use does not grow with the number of inputs. Reading the next input (e.g., an archive member) 
+        # runs in a thread to keep the event loop free.
+        inputs = self._iter_inputs(file_paths)
+        inputs_exhausted = False
+        pending = set()
+        try:
+            while True:
+                while not inputs_exhausted and len(pending) < max_file_load:
+                    next_input = await loop.run_in_executor(None, next, inputs, None)
+                    if next_input is None:
+                        inputs_exhausted = True
+                        break
+                    file_path, data = next_input
+                    pending.add(asyncio.ensure_future(self._ocr_file_with_semaphore(stages=stages, 
+                                                                                    file_path=file_path, 
+                                                                                    data=data,
+                                                                                    rotate_correction=rotate_correction,
+                                                                                    max_dimension_pixels=max_dimension_pixels,
+                                                                                    min_text_height_pixels=min_text_height_pixels,
+                                                                                    crop_margins=crop_margins,
+                                                                                    skip_blank_pages=skip_blank_pages)))
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result: OCRResult = task.result()
+                    yield result
+        finally:
+            # The caller stopped early (or an input failed). Do not leave files running in the background.
+            for task in pending:
+                task.cancel()
+            stages.load_executor.shutdown(wait=False, cancel_futures=True)
+            stages.preprocess_executor.shutdown(wait=False, cancel_futures=True)
+            if lag_monitor is not None:
+                await lag_monitor.stop()
         
-        for future in asyncio.as_completed(tasks):
-            result: OCRResult = await future
-            yield result
-        
-    async def _ocr_file_with_semaphore(self, file_load_semaphore:asyncio.Semaphore, vlm_call_semaphore:asyncio.Semaphore, 
-                                       file_path:str, rotate_correction:bool=False, max_dimension_pixels:int=None) -> OCRResult:
+    async def _ocr_file_with_semaphore(self, stages:_PipelineStages, file_path:str, 
+                                       data:Union[bytes, Image.Image, Exception]=None, rotate_correction:bool=False, 
+                                       max_dimension_pixels:int=None, min_text_height_pixels:int=None, 
+                                       crop_margins:bool=False, skip_blank_pages:bool=False) -> OCRResult:
         """
-        This internal method takes a semaphore and OCR a single file using the VLM inference engine.
+        This internal method takes the pipeline stages and OCR a single file using the VLM inference engine.
         """
-        async with file_load_semaphore:
-            filename = os.path.basename(file_path)
-            file_ext = os.path.splitext(file_path)[1].lower()
-            result = OCRResult(input_dir=file_path, output_mode=self.output_mode)
-            # check file extension
-            if file_ext not in SUPPORTED_IMAGE_EXTS:
-                result.status = "error"
-                result.add_page(text=f"Unsupported file type: {file_ext}. Supported types are: {SUPPORTED_IMAGE_EXTS}", 
-                                image_processing_status={})
-                return result
-            
-            try:
-                # Load images from file
-                if file_ext == '.pdf':
-                    data_loader = PDFDataLoader(file_path) 
-                elif file_ext in ['.tif', '.tiff']:
-                    data_loader = TIFFDataLoader(file_path)
-                else:
-                    data_loader = ImageDataLoader(file_path)
+        filename = os.path.basename(file_path)
+        file_ext = os.path.splitext(file_path)[1].lower()
+        result = OCRResult(input_dir=file_path, output_mode=self.output_mode)
+        # Archives that could not be read
+        if isinstance(data, Exception):
+            result.status = "error"
+            result.add_page(text=f"Error processing file {filename}: {str(data)}", image_processing_status={})
+            return result
+        # check file extension
+        if file_ext not in SUPPORTED_IMAGE_EXTS and not isinstance(data, Image.Image):
+            result.status = "error"
+            result.add_page(text=f"Unsupported file type: {file_ext}. Supported types are: {SUPPORTED_IMAGE_EXTS}", 
+                            image_processing_status={})
+            return result
+        
+        loop = asyncio.get_running_loop()
+        try:
+            # Open the file. This can start a subprocess (e.g., pdfinfo), so it runs in the load stage. 
+            # A PDF page batch takes its page buffer slots at once, so it cannot be larger than the buffer.
+            data_loader = await loop.run_in_executor(stages.load_executor, self._get_data_loader, file_path, max_dimension_pixels, data, 
+                                                     min(self.pdf_page_batch_size, stages.page_buffer_size))
 
-            except Exception as e:
-                result.status = "error"
-                result.add_page(text=f"Error processing file {filename}: {str(e)}", image_processing_status={})
-                return result
+        except Exception as e:
+            result.status = "error"
+            result.add_page(text=f"Error processing file {filename}: {str(e)}", image_processing_status={})
+            return result
 
-            try:
+        try:
+            if self.packing is not None:
+                # Small pages are packed into shared VLM requests
+                processed_page_results = await self._ocr_packed_pages(stages=stages,
+                                                                      data_loader=data_loader,
+                                                                      rotate_correction=rotate_correction,
+                                                                      max_dimension_pixels=max_dimension_pixels,
+                                                                      min_text_height_pixels=min_text_height_pixels,
+                                                                      crop_margins=crop_margins,
+                                                                      skip_blank_pages=skip_blank_pages)
+            else:
+                # Pages are started only when they have page buffer slots, so at most page_buffer_size pages 
+                # (including the pages cached by the data loader) are in flight.
+                page_count = await loop.run_in_executor(stages.load_executor, data_loader.get_page_count)
+                group_size = self._get_page_group_size(stages, data_loader)
                 page_processing_tasks = []
-                for page_index in range(data_loader.get_page_count()):
-                    task = self._ocr_page_with_semaphore(
-                        vlm_call_semaphore=vlm_call_semaphore,
-                        data_loader=data_loader,
-                        page_index=page_index,
-                        rotate_correction=rotate_correction,
-                        max_dimension_pixels=max_dimension_pixels
-                    )
-                    page_processing_tasks.append(task)
-                
-                if page_processing_tasks:
+                try:
+                    for first_page_index in range(0, page_count, group_size):
+                        page_indices = range(first_page_index, min(first_page_index + group_size, page_count))
+                        await self._reserve_page_buffer(stages, len(page_indices))
+                        for page_index in page_indices:
+                            task = asyncio.ensure_future(self._ocr_page_with_semaphore(
+                                stages=stages,
+                                data_loader=data_loader,
+                                page_index=page_index,
+                                rotate_correction=rotate_correction,
+                                max_dimension_pixels=max_dimension_pixels,
+                                min_text_height_pixels=min_text_height_pixels,
+                                crop_margins=crop_margins,
+                                skip_blank_pages=skip_blank_pages
+                            ))
+                            task.add_done_callback(lambda _: stages.page_buffer.release())
+                            page_processing_tasks.append(task)
                     processed_page_results = await asyncio.gather(*page_processing_tasks)
-                    for text, image_processing_status in processed_page_results:
-                        result.add_page(text=text, image_processing_status=image_processing_status)
+                finally:
+                    for task in page_processing_tasks:
+                        task.cancel()
 
-            except Exception as e:
-                result.status = "error"
-                result.add_page(text=f"Error during OCR for {filename}: {str(e)}", image_processing_status={})
-                return result
+            for text, image_processing_status, source in processed_page_results:
+                result.add_page(text=text, image_processing_status=image_processing_status, source=source)
+
+        except Exception as e:
+            result.status = "error"
+            result.add_page(text=f"Error during OCR for {filename}: {str(e)}", image_processing_status={})
+            return result
+        
+        finally:
+            data_loader.close()
 
         # Set status to success if no errors occurred
         result.status = "success"
         return result
 
-    async def _ocr_page_with_semaphore(self, vlm_call_semaphore: asyncio.Semaphore, data_loader: DataLoader,
-                                       page_index:int, rotate_correction:bool=False, max_dimension_pixels:int=None) -> Tuple[str, Dict[str, str]]:
+    def _get_page_group_size(self, stages:_PipelineStages, data_loader:DataLoader) -> int:
+        """
+        This internal method returns the number of pages that are loaded together in concurrent_ocr: 
+        the data loader's render batch size, or 1 if the pages are loaded in preprocessing worker processes.
+        """
+        if stages.load_and_preprocess_page is not None and self._can_load_in_worker(data_loader):
+            return 1
+        return min(data_loader.get_render_batch_size(), stages.page_buffer_size)
+
+    @staticmethod
+    async def _reserve_page_buffer(stages:_PipelineStages, num_pages:int):
+        """
+        This internal method takes page buffer slots for num_pages pages that are loaded together. The slots are taken 
+        under page_buffer_lock, so that two files waiting for a batch of slots cannot each hold part of the buffer. 
+        If the wait is cancelled, the slots taken so far are released.
+        """
+        acquired = 0
+        try:
+            async with stages.page_buffer_lock:
+                while acquired < num_pages:
+                    await stages.page_buffer.acquire()
+                    acquired += 1
+        except BaseException:
+            for _ in range(acquired):
+                stages.page_buffer.release()
+            raise
+
+    async def _ocr_page_with_semaphore(self, stages:_PipelineStages, data_loader: DataLoader,
+                                       page_index:int, rotate_correction:bool=False, max_dimension_pixels:int=None, 
+                                       min_text_height_pixels:int=None, crop_margins:bool=False, 
+                                       skip_blank_pages:bool=False) -> Tuple[str, Dict[str, str], str]:
+        """
+        This internal method takes the pipeline stages and OCR a single image/page using the VLM inference engine.
+        The caller holds a page buffer slot for the page from loading to the end of its VLM call (see _reserve_page_buffer). 
+        The page takes a VLM call slot only for the call.
+
+        Returns:
+        -------
+        Tuple[str, Dict[str, str], str]
+            A tuple containing the OCR text, a dictionary with image processing status and the source of the text 
+            ('vlm', 'text_layer' or 'blank_page').
+        """
+        page, image_processing_status = await self._prepare_page(stages=stages, data_loader=data_loader, page_index=page_index,
+                                                                 rotate_correction=rotate_correction, 
+                                                                 max_dimension_pixels=max_dimension_pixels,
+                                                                 min_text_height_pixels=min_text_height_pixels,
+                                                                 crop_margins=crop_margins, skip_blank_pages=skip_blank_pages)
+        # Pages with a usable text layer and blank pages are not sent to the VLM
+        if isinstance(page, str):
+            return self._format_text_layer(page), image_processing_status, "text_layer"
+        if page is None:
+            return "", image_processing_status, "blank_page"
+
+        # The page, or each of its tiles, is sent under the VLM call semaphore
+        texts = await asyncio.gather(*[self._ocr_image_with_semaphore(stages.vlm_call_semaphore, encoded_image) 
+                                       for encoded_image in page])
+        return self._stitch_tiles(texts, image_processing_status), image_processing_status, "vlm"
+
+    @staticmethod
+    def _can_load_in_worker(data_loader:DataLoader) -> bool:
+        """
+        This internal method returns True if a preprocessing worker process can open the page source itself: 
+        a file on disk, or a single image given as bytes (which is sent once, for its only page).
+        """
+        if getattr(data_loader, "image", None) is not None:
+            return False
+        return data_loader.file_bytes is None or isinstance(data_loader, ImageDataLoader)
+
+    async def _prepare_page(self, stages:_PipelineStages, data_loader: DataLoader, page_index:int, 
+                            rotate_correction:bool=False, max_dimension_pixels:int=None, 
+                            min_text_height_pixels:int=None, crop_margins:bool=False, 
+                            skip_blank_pages:bool=False) -> Tuple[Union[str, List[EncodedImage], None], Dict[str, Dict]]:
+        """
+        This internal method loads a single page in the load stage, then preprocesses and encodes it in the preprocess stage, without OCR.
+        With preprocess worker processes, pages of files on disk and single images given as bytes are loaded in the worker, 
+        so that only the source (path or bytes) goes to the worker. In-memory PIL images and multi-page files given as bytes 
+        are loaded in the load stage and sent to the worker decoded.
+
+        Returns:
+        -------
+        Tuple[Union[str, List[EncodedImage], None], Dict[str, Dict]]
+            The text layer of the page (str), the encoded page or its tiles, or None for a blank page, 
+            and a dictionary with image processing status.
+        """
+        loop = asyncio.get_running_loop()
+        page_text = await loop.run_in_executor(stages.load_executor, data_loader.get_page_text, page_index)
+        if page_text is not None:
+            return page_text, {}
+
+        passthrough = self._use_passthrough(rotate_correction, min_text_height_pixels, crop_margins)
+        if stages.load_and_preprocess_page is not None and self._can_load_in_worker(data_loader):
+            return await loop.run_in_executor(stages.preprocess_executor, stages.load_and_preprocess_page, data_loader.file_path, 
+                                              data_loader.file_bytes, page_index, passthrough, max_dimension_pixels, rotate_correction, 
+                                              max_dimension_pixels, min_text_height_pixels, crop_margins, skip_blank_pages)
+
+        image = await loop.run_in_executor(stages.load_executor, self._load_page, data_loader, page_index, passthrough, False)
+        return await loop.run_in_executor(stages.preprocess_executor, stages.preprocess_page, image, rotate_correction, 
+                                          max_dimension_pixels, min_text_height_pixels, crop_margins, skip_blank_pages)
+
+    async def _ocr_packed_pages(self, stages:_PipelineStages, data_loader: DataLoader, 
+                                rotate_correction:bool=False, max_dimension_pixels:int=None, 
+                                min_text_height_pixels:int=None, crop_margins:bool=False, 
+                                skip_blank_pages:bool=False) -> List[Tuple[str, Dict[str, Dict], str]]:
         """
-        This internal method takes a semaphore and OCR a single image/page using the VLM inference engine.
+        This internal method OCR the pages of a file with packing. Pages are prepared in order (max_pages pages ahead), 
+        and consecutive small pages are packed. Each pack is sent as soon as it is full, while the next pages are prepared.
+        Pages take a page buffer slot while they are prepared (pages that are loaded together take their slots together), 
+        and each VLM request (a pack or a tiled page) takes one until it is done, so that preparation waits when the VLM stage 
+        falls behind.
 
         Returns:
         -------
-        Tuple[str, Dict[str, str]]
-            A tuple containing the OCR text and a dictionary with image processing status.
+        List[Tuple[str, Dict[str, Dict], str]]
+            The OCR text, image processing status and source of each page, in page order.
         """
+        loop = asyncio.get_running_loop()
+        page_count = await loop.run_in_executor(stages.load_executor, data_loader.get_page_count)
+
+        group_size = self._get_page_group_size(stages, data_loader)
+        prepare_tasks = []
+        async def _prepare_up_to(last_page_index:int):
+            # Pages that are loaded together are prepared together, each holding a page buffer slot until it is prepared
+            while len(prepare_tasks) <= min(last_page_index, page_count - 1):
+                page_indices = range(len(prepare_tasks), min(len(prepare_tasks) + group_size, page_count))
+                await self._reserve_page_buffer(stages, len(page_indices))
+                for page_index in page_indices:
+                    task = asyncio.ensure_future(self._prepare_page(stages=stages, data_loader=data_loader, page_index=page_index, 
+                                                                    rotate_correction=rotate_correction, 
+                                                                    max_dimension_pixels=max_dimension_pixels, 
+                                                                    min_text_height_pixels=min_text_height_pixels, 
+                                                                    crop_margins=crop_margins, skip_blank_pages=skip_blank_pages))
+                    task.add_done_callback(lambda _: stages.page_buffer.release())
+                    prepare_tasks.append(task)
+
+        # (page entries, task) for each VLM request. Entries are (page_index, encoded_image, image_processing_status, cost).
+        ocr_tasks = []
+        async def _submit(entries:List[Tuple], get_coroutine):
+            await stages.page_buffer.acquire()
+            task = asyncio.ensure_future(get_coroutine())
+            task.add_done_callback(lambda _: stages.page_buffer.release())
+            ocr_tasks.append((entries, task))
+
+        results = [None] * page_count
+        pack = []
+        try:
+            for page_index in range(page_count):
+                # Prepare max_pages pages ahead
+                await _prepare_up_to(page_index + self.packing.max_pages)
+                page, image_processing_status = await prepare_tasks[page_index]
+
+                if isinstance(page, str):
+                    results[page_index] = (self._format_text_layer(page), image_processing_status, "text_layer")
+                elif page is None:
+                    results[page_index] = ("", image_processing_status, "blank_page")
+                elif len(page) > 1:
+                    # Tiled pages are not packed
+                    await _submit([(page_index, None, image_processing_status, None)], 
+                                  lambda: asyncio.gather(*[self._ocr_image_with_semaphore(stages.vlm_call_semaphore, encoded_image) 
+                                                           for encoded_image in page]))
+                else:
+                    cost = self._get_pack_cost(page[0])
+                    if pack and not self._fits_in_pack(pack, cost):
+                        await _submit(pack, lambda: self._ocr_pack_with_semaphore(stages.vlm_call_semaphore, pack))
+                        pack = []
+                    pack.append((page_index, page[0], image_processing_status, cost))
+            if pack:
+                await _submit(pack, lambda: self._ocr_pack_with_semaphore(stages.vlm_call_semaphore, pack))
+
+            for entries, task in ocr_tasks:
+                texts = await task
+                if entries[0][1] is None:
+                    page_index, _, image_processing_status, _ = entries[0]
+                    results[page_index] = (self._stitch_tiles(texts, image_processing_status), image_processing_status, "vlm")
+                    continue
+                for (page_index, _, image_processing_status, _), text in zip(entries, texts):
+                    results[page_index] = (text, image_processing_status, "vlm")
+            return results
+
+        finally:
+            for task in prepare_tasks + [task for _, task in ocr_tasks]:
+                task.cancel()
+
+    async def _ocr_pack_with_semaphore(self, vlm_call_semaphore: Union[asyncio.Semaphore, AdaptiveConcurrencyLimiter], pack:List[Tuple]) -> List[str]:
+        """
+        This internal method takes a semaphore and OCR a pack of pages in one VLM request. Returns the page texts.
+        If the response cannot be split per page, the pages are OCR'd one by one.
+        """
+        loop = asyncio.get_running_loop()
         async with vlm_call_semaphore:
-            image = await data_loader.get_page_async(page_index)
-            image_processing_status = {}
-            # Apply rotate correction if specified and tesseract is available
-            if rotate_correction and self.image_processor.has_tesseract:
-                try:
-                    image, rotation_angle = await self.image_processor.rotate_correction_async(image)
-                    image_processing_status["rotate_correction"] = {
-                        "status": "success",
-                        "rotation_angle": rotation_angle
-                    }
-                except Exception as e:
-                    image_processing_status["rotate_correction"] = {
-                        "status": "error",
-                        "error": str(e)
-                    }
+            # The messages (base64 images) are built in a thread, so that the event loop is not blocked
+            messages = await loop.run_in_executor(None, self._get_pack_messages, pack)
+            response = await self.vlm_engine.chat_async(messages)
+        texts = self._split_pack_response(response, pack)
+        if texts is not None:
+            return texts
+        return await asyncio.gather(*[self._ocr_image_with_semaphore(vlm_call_semaphore, entry[1]) for entry in pack])
 
-            # Resize the image if max_dimension_pixels is specified
-            if max_dimension_pixels is not None:
-                try:
-                    image, resized = await self.image_processor.resize_async(image, max_dimension_pixels=max_dimension_pixels)
-                    image_processing_status["resize"] = {
-                        "status": "success",
-                        "resized": resized
-                    }
-                except Exception as e:
-                    image_processing_status["resize"] = {
-                        "status": "error",
-                        "error": str(e)
-                    }
-
-            messages = self.vlm_engine.get_ocr_messages(self.system_prompt, self.user_prompt, image)
-            ocr_text = await self.vlm_engine.chat_async( 
-                messages,
-            )
-            if self.output_mode == "markdown":
-                ocr_text = clean_markdown(ocr_text)
-            return ocr_text, image_processing_status
\ No newline at end of file
+    async def _ocr_image_with_semaphore(self, vlm_call_semaphore: Union[asyncio.Semaphore, AdaptiveConcurrencyLimiter], encoded_image:EncodedImage) -> str:
+        """
+        This internal method takes a semaphore and OCR a single encoded image (a tile, or a page of a pack) using the VLM inference engine.
+        """
+        async with vlm_call_semaphore:
+            return await self._ocr_image_async(encoded_image)
+
+    async def _ocr_image_async(self, encoded_image:EncodedImage) -> str:
+        """
+        This internal method OCR an encoded image (a page or a tile) using the VLM inference engine.
+        The messages (base64 image) are built in a thread, so that the event loop is not blocked.
+        """
+        loop = asyncio.get_running_loop()
+        messages = await loop.run_in_executor(None, self.vlm_engine.get_ocr_messages, self.system_prompt, self.user_prompt, encoded_image)
+        ocr_text = await self.vlm_engine.chat_async( 
+            messages,
+        )
+        if self.output_mode == "markdown":
+            ocr_text = clean_markdown(ocr_text)
+        return ocr_text
+
+
+class _PreprocessWorkerOCREngine(OCREngine):
+    def __init__(self, config:_PreprocessWorkerConfig):
+        """
+        The OCR engine of a preprocessing worker process. It loads and preprocesses pages with the settings of 
+        the OCR engine that started the worker, and has no VLM engine.
+
+        Parameters:
+        ----------
+        config : _PreprocessWorkerConfig
+            The settings of the OCR engine and the VLM engine's max_image_payload_bytes.
+        """
+        self.__dict__.update(config.settings)
+        self.vlm_engine = None
+        self.max_image_payload_bytes = config.max_image_payload_bytes
+
+    def _get_max_image_payload_bytes(self) -> Union[int, None]:
+        """
+        This internal method returns the max_image_payload_bytes of the VLM engine of the OCR engine that started the worker.
+        """
+        return self.max_image_payload_bytes
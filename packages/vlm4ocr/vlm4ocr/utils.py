@@ -2,19 +2,46 @@ import abc
 import os
 import io
 import base64
-from typing import Union, List, Tuple
+import re
+import math
+import subprocess
+import tempfile
+import uuid
+import zipfile
+import tarfile
+import difflib
+from typing import Union, List, Dict, Tuple, Type, Generator, Callable
+from dataclasses import dataclass
 import importlib.util
 from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
+import numpy as np
 import asyncio
+import threading
+import time
 
 
 class DataLoader(abc.ABC):
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, file_bytes:bytes=None):
+        """
+        This is an abstract class for data loaders.
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the file. If file_bytes is given, it is only used as the name of the input (e.g., an archive member).
+        file_bytes : bytes, Optional
+            The file content. If given, the file is read from memory instead of disk.
+        """
         self.file_path = file_path
-        if not os.path.exists(file_path):
+        self.file_bytes = file_bytes
+        if file_bytes is None and not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
+    def _open_file(self) -> Union[str, io.BytesIO]:
+        """ Returns the file path, or an in-memory buffer if the content was given as bytes. """
+        return self.file_path if self.file_bytes is None else io.BytesIO(self.file_bytes)
+
     @abc.abstractmethod
     def get_all_pages(self) -> List[Image.Image]:
         """ 
@@ -51,38 +78,861 @@ class DataLoader(abc.ABC):
         """ Returns the number of pages in the PDF file. """
         pass
 
+    def get_page_bytes(self, page_index:int) -> Union["EncodedImage", None]:
+        """
+        Returns the page as it is stored in the file (e.g., the original JPEG bytes), if it can be sent to a VLM without decoding.
+        Returns None if the page must be decoded (e.g., PDF pages, TIFF frames, images larger than max_dimension_pixels).
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page to retrieve.
+        """
+        return None
+
+    def get_render_batch_size(self) -> int:
+        """
+        Returns the number of pages that are loaded together when one of them is requested. 
+        The other pages are held in memory until they are requested.
+        """
+        return 1
+
+    def get_page_text(self, page_index:int) -> Union[str, None]:
+        """
+        Returns the text layer of the page (e.g., of a born-digital PDF page) if it is usable in place of OCR. 
+        Returns None if the page has to be OCR'd.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        return None
+
+    def close(self):
+        """ Releases resources (e.g., open file handles) held by the data loader. """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PDFRasterizer(abc.ABC):
+    # True if rendering a range of pages in one call is cheaper than rendering them one by one.
+    batch_rendering = False
+
+    def __init__(self, file_path: str, dpi:int=200, max_dimension_pixels:int=None, grayscale:bool=False, file_bytes:bytes=None):
+        """
+        This is an abstract class to provide interfaces for PDF rasterizer backends. 
+        A rasterizer instance is bound to one PDF file.
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the PDF file.
+        dpi : int, Optional
+            The rendering resolution.
+        max_dimension_pixels : int, Optional
+            If specified, pages whose longest side would exceed this number of pixels at the rendering resolution 
+            are rendered directly at a lower resolution that fits. 
+        grayscale : bool, Optional
+            If True, pages are rendered in grayscale.
+        file_bytes : bytes, Optional
+            The PDF content. If given, the document is read from memory and file_path is only used as its name.
+        """
+        self.file_path = file_path
+        self.file_bytes = file_bytes
+        self.dpi = dpi
+        self.max_dimension_pixels = max_dimension_pixels
+        self.grayscale = grayscale
+
+    def get_render_dpi(self, page_width:float, page_height:float) -> float:
+        """
+        Returns the resolution to render a page of the given size (pts), so that it fits in max_dimension_pixels.
+
+        Parameters:
+        ----------
+        page_width : float
+            The page width in pts (1/72 inch).
+        page_height : float
+            The page height in pts (1/72 inch).
+        """
+        longest_side = max(page_width, page_height)
+        if self.max_dimension_pixels is None or longest_side <= 0:
+            return self.dpi
+        # Subtract half a pixel so that rounding in the backend does not exceed the limit.
+        return min(self.dpi, (self.max_dimension_pixels - 0.5) * 72 / longest_side)
+
+    @abc.abstractmethod
+    def get_page_count(self) -> int:
+        """ Returns the number of pages in the PDF file. """
+        return NotImplemented
+
+    @abc.abstractmethod
+    def render_pages(self, first_page_index:int, last_page_index:int) -> List[Image.Image]:
+        """
+        Renders a contiguous range of pages (both ends included).
+
+        Parameters:
+        ----------
+        first_page_index : int
+            Index of the first page to render.
+        last_page_index : int
+            Index of the last page to render.
+        """
+        return NotImplemented
+
+    def render_pages_to_files(self, first_page_index:int, last_page_index:int, output_folder:str, fmt:str="png") -> List[str]:
+        """
+        Renders a contiguous range of pages (both ends included) to image files and returns the file paths.
+
+        Parameters:
+        ----------
+        first_page_index : int
+            Index of the first page to render.
+        last_page_index : int
+            Index of the last page to render.
+        output_folder : str
+            The directory to write the image files to.
+        fmt : str, Optional
+            The image file format, e.g., 'png' or 'ppm'.
+        """
+        paths = []
+        for page_index, image in enumerate(self.render_pages(first_page_index, last_page_index), start=first_page_index):
+            path = os.path.join(output_folder, f"page_{page_index}_{uuid.uuid4().hex}.{fmt}")
+            image.save(path)
+            paths.append(path)
+        return paths
+
+    def has_page_image(self, page_index:int) -> bool:
+        """
+        Returns True if the page is a single embedded image (e.g., a scanned page) covering the full page.
+        Backends that do not support embedded image extraction return False.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        return False
+
+    def get_page_image(self, page_index:int) -> Union[Image.Image, None]:
+        """
+        Extracts the embedded image of a single-image page at its native resolution, without rendering the page.
+        Returns None if the page is not a single full-page image.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        return None
+
+    def get_page_text(self, page_index:int) -> Union[str, None]:
+        """
+        Extracts the text layer of a page. Returns None if the backend does not support text extraction.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        return None
+
+    def close(self):
+        """ Releases resources held by the rasterizer. """
+        pass
+
+
+class Pdf2ImageRasterizer(PDFRasterizer):
+    batch_rendering = True
+
+    def __init__(self, file_path: str, thread_count:int=1, dpi:int=200, max_dimension_pixels:int=None, grayscale:bool=False, 
+                 file_bytes:bytes=None):
+        """
+        The default rasterizer. Renders pages with poppler (pdftoppm) subprocesses through pdf2image.
+        Poppler only reads from files. If the PDF is given as bytes, it is written to one temporary file that is removed on close().
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the PDF file.
+        thread_count : int, Optional
+            The number of threads (poppler processes) pdf2image uses to render a range of pages.
+        dpi : int, Optional
+            The rendering resolution.
+        max_dimension_pixels : int, Optional
+            If specified, pages are rendered at a resolution that fits the longest side in this number of pixels.
+        grayscale : bool, Optional
+            If True, pages are rendered in grayscale.
+        file_bytes : bytes, Optional
+            The PDF content. If given, the document is read from memory and file_path is only used as its name.
+        """
+        super().__init__(file_path, dpi=dpi, max_dimension_pixels=max_dimension_pixels, grayscale=grayscale, file_bytes=file_bytes)
+        self.thread_count = thread_count
+        # The path poppler reads from. A temporary copy if the PDF was given as bytes.
+        self._temp_path = None
+        self.pdf_path = file_path
+        if file_bytes is not None:
+            fd, self._temp_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(file_bytes)
+            self.pdf_path = self._temp_path
+        try:
+            self.info = pdfinfo_from_path(self.pdf_path, userpw=None, poppler_path=None)
+        except Exception:
+            self.close()
+            raise
+        # Per-page sizes/rotations from pdfinfo and single full-page image pages found by pdfimages. Listed on first use.
+        self._page_geometry = None
+        self._page_images = None
+        self._page_geometry_lock = threading.Lock()
+        self._page_images_lock = threading.Lock()
+        # Page texts from pdftotext. Extracted on first use.
+        self._page_texts = None
+        self._page_texts_lock = threading.Lock()
+
+    def get_page_count(self) -> int:
+        """ Returns the number of pages in the PDF file. """
+        return self.info['Pages'] if 'Pages' in self.info else 0
+
+    def _get_render_runs(self, first_page_index:int, last_page_index:int) -> List[Tuple[int, int, float]]:
+        """
+        Splits a range of pages into runs of pages that share the same rendering resolution. Usually all pages have the same size.
+        Returns a list of (first_page_index, last_page_index, dpi).
+        """
+        if self.max_dimension_pixels is None:
+            return [(first_page_index, last_page_index, self.dpi)]
+
+        page_sizes, _ = self._get_page_geometry()
+        runs = []
+        for page_index in range(first_page_index, last_page_index + 1):
+            dpi = self.get_render_dpi(*page_sizes[page_index]) if page_index in page_sizes else self.dpi
+            if runs and runs[-1][2] == dpi:
+                runs[-1] = (runs[-1][0], page_index, dpi)
+            else:
+                runs.append((page_index, page_index, dpi))
+        return runs
+
+    def render_pages(self, first_page_index:int, last_page_index:int) -> List[Image.Image]:
+        """
+        Renders a contiguous range of pages (both ends included) with one poppler call per run of pages that share a resolution.
+
+        Parameters:
+        ----------
+        first_page_index : int
+            Index of the first page to render.
+        last_page_index : int
+            Index of the last page to render.
+        """
+        images = []
+        for first, last, dpi in self._get_render_runs(first_page_index, last_page_index):
+            images.extend(convert_from_path(self.pdf_path, 
+                                            dpi=dpi,
+                                            first_page=first + 1, 
+                                            last_page=last + 1, 
+                                            thread_count=self.thread_count,
+                                            grayscale=self.grayscale))
+        return images
+
+    def render_pages_to_files(self, first_page_index:int, last_page_index:int, output_folder:str, fmt:str="png") -> List[str]:
+        """
+        Renders a contiguous range of pages (both ends included) to image files with poppler and returns the file paths. 
+        The rendered pages are not decoded in memory.
+
+        Parameters:
+        ----------
+        first_page_index : int
+            Index of the first page to render.
+        last_page_index : int
+            Index of the last page to render.
+        output_folder : str
+            The directory to write the image files to.
+        fmt : str, Optional
+            The image file format, e.g., 'png' or 'ppm'.
+        """
+        paths = []
+        for first, last, dpi in self._get_render_runs(first_page_index, last_page_index):
+            paths.extend(convert_from_path(self.pdf_path, 
+                                           dpi=dpi,
+                                           output_folder=output_folder,
+                                           fmt=fmt,
+                                           paths_only=True,
+                                           first_page=first + 1, 
+                                           last_page=last + 1, 
+                                           thread_count=self.thread_count,
+                                           grayscale=self.grayscale))
+        return paths
+
+    def _get_page_geometry(self) -> Tuple[Dict[int, Tuple[float, float]], Dict[int, int]]:
+        """
+        Runs `pdfinfo` over all pages once and returns the page sizes (pts) and rotations (degrees), keyed by page index.
+        """
+        with self._page_geometry_lock:
+            if self._page_geometry is not None:
+                return self._page_geometry
+
+            page_sizes, page_rotations = {}, {}
+            page_count = self.get_page_count()
+            page_info = pdfinfo_from_path(self.pdf_path, first_page=1, last_page=page_count) if page_count > 0 else {}
+            # e.g., "Page    1 size: 612 x 792 pts (letter)", "Page    1 rot:  0"
+            for key, value in page_info.items():
+                match = re.match(r"Page\s+(\d+)\s+(size|rot)$", key)
+                if not match:
+                    continue
+                page_index = int(match.group(1)) - 1
+                if match.group(2) == "size":
+                    numbers = re.findall(r"[\d.]+", value)
+                    if len(numbers) >= 2:
+                        page_sizes[page_index] = (float(numbers[0]), float(numbers[1]))
+                else:
+                    page_rotations[page_index] = int(float(value)) if value else 0
+
+            self._page_geometry = (page_sizes, page_rotations)
+            return self._page_geometry
+
+    def _list_page_images(self) -> Dict[int, Dict[str, str]]:
+        """
+        Runs `pdfimages -list` once for the whole document and returns the pages that consist of a single image 
+        placed over (almost) the full page. Keys are page indices, values are the pdfimages columns of the image.
+        """
+        with self._page_images_lock:
+            if self._page_images is not None:
+                return self._page_images
+
+            self._page_images = {}
+            try:
+                page_sizes, page_rotations = self._get_page_geometry()
+                listing = subprocess.run(["pdfimages", "-list", self.pdf_path], capture_output=True, text=True, check=True).stdout
+            except Exception as e:
+                print(f"Error listing embedded images in PDF: {e}")
+                return self._page_images
+
+            # pdfimages columns: page num type width height color comp bpc enc interp object ID x-ppi y-ppi size ratio
+            columns = ["page", "num", "type", "width", "height", "color", "comp", "bpc", "enc", "interp", "object", "id", "x-ppi", "y-ppi"]
+            images_by_page = {}
+            for line in listing.splitlines()[2:]:
+                fields = line.split()
+                if len(fields) < len(columns) or not fields[0].isdigit():
+                    continue
+                row = dict(zip(columns, fields))
+                images_by_page.setdefault(int(row["page"]), []).append(row)
+
+            for page_number, rows in images_by_page.items():
+                page_index = page_number - 1
+                # Exactly one image and no masks on the page.
+                if len(rows) != 1 or rows[0]["type"] != "image" or rows[0]["color"] == "cmyk":
+                    continue
+                row = rows[0]
+                if page_index not in page_sizes:
+                    continue
+                try:
+                    placed_width = int(row["width"]) / float(row["x-ppi"]) * 72
+                    placed_height = int(row["height"]) / float(row["y-ppi"]) * 72
+                except (ValueError, ZeroDivisionError):
+                    continue
+                page_width, page_height = page_sizes[page_index]
+                if _is_full_page(placed_width, placed_height, page_width, page_height):
+                    row["rotation"] = page_rotations.get(page_index, 0)
+                    self._page_images[page_index] = row
+
+            return self._page_images
+
+    def has_page_image(self, page_index:int) -> bool:
+        """
+        Returns True if the page is a single embedded image covering the full page.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        return page_index in self._list_page_images()
+
+    def get_page_image(self, page_index:int) -> Union[Image.Image, None]:
+        """
+        Extracts the embedded image of a single-image page with `pdfimages`. 
+        JPEG images are kept as JPEG, other encodings (e.g., CCITT, Flate) are written as PNG.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        row = self._list_page_images().get(page_index)
+        if row is None:
+            return None
+
+        page_number = str(page_index + 1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            subprocess.run(["pdfimages", "-j", "-png", "-f", page_number, "-l", page_number, self.pdf_path, os.path.join(tmp_dir, "page")], 
+                           capture_output=True, check=True)
+            image_files = os.listdir(tmp_dir)
+            if len(image_files) != 1:
+                return None
+            image = Image.open(os.path.join(tmp_dir, image_files[0]))
+            image.load()
+
+        if row["rotation"] % 360 != 0:
+            image = image.rotate(-row["rotation"], expand=True)
+        return image
+
+    def get_page_text(self, page_index:int) -> Union[str, None]:
+        """
+        Extracts the text layer of a page. The first call runs `pdftotext` once over the whole document 
+        (pages are separated by form feeds) and the page texts are kept.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        with self._page_texts_lock:
+            if self._page_texts is None:
+                output = subprocess.run(["pdftotext", "-enc", "UTF-8", self.pdf_path, "-"], capture_output=True, check=True).stdout
+                self._page_texts = output.decode("utf-8", errors="replace").split("\f")
+        return self._page_texts[page_index] if page_index < len(self._page_texts) else None
+
+    def close(self):
+        """ Removes the temporary copy of an in-memory PDF. """
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except FileNotFoundError:
+                pass
+            self._temp_path = None
+
+
+# pdfium is not thread-safe. All calls into it are serialized with this lock.
+_PDFIUM_LOCK = threading.Lock()
+
+class PdfiumRasterizer(PDFRasterizer):
+    def __init__(self, file_path: str, dpi:int=200, max_dimension_pixels:int=None, grayscale:bool=False, file_bytes:bytes=None):
+        """
+        In-process rasterizer based on pdfium (pypdfium2). The document is opened once and kept open until close() is called. 
+        Pages are rendered on demand directly into memory, without poppler subprocesses or temporary files.
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the PDF file.
+        dpi : int, Optional
+            The rendering resolution. Default matches pdf2image.
+        max_dimension_pixels : int, Optional
+            If specified, pages are rendered at a resolution that fits the longest side in this number of pixels.
+        grayscale : bool, Optional
+            If True, pages are rendered in grayscale.
+        file_bytes : bytes, Optional
+            The PDF content. If given, the document is read from memory and file_path is only used as its name.
+        """
+        if importlib.util.find_spec("pypdfium2") is None:
+            raise ImportError("pypdfium2 is not installed. Please install it (```pip install pypdfium2```) to use the pdfium rasterizer.")
+
+        import pypdfium2
+        super().__init__(file_path, dpi=dpi, max_dimension_pixels=max_dimension_pixels, grayscale=grayscale, file_bytes=file_bytes)
+        with _PDFIUM_LOCK:
+            self.pdf = pypdfium2.PdfDocument(file_path if file_bytes is None else file_bytes)
+            self.page_count = len(self.pdf)
+
+    def get_page_count(self) -> int:
+        """ Returns the number of pages in the PDF file. """
+        return self.page_count
+
+    def render_pages(self, first_page_index:int, last_page_index:int) -> List[Image.Image]:
+        """
+        Renders a contiguous range of pages (both ends included), one page at a time.
+
+        Parameters:
+        ----------
+        first_page_index : int
+            Index of the first page to render.
+        last_page_index : int
+            Index of the last page to render.
+        """
+        images = []
+        with _PDFIUM_LOCK:
+            for page_index in range(first_page_index, last_page_index + 1):
+                page = self.pdf[page_index]
+                try:
+                    scale = self.get_render_dpi(*page.get_size()) / 72
+                    images.append(page.render(scale=scale, grayscale=self.grayscale).to_pil())
+                finally:
+                    page.close()
+        return images
+
+    def _find_page_image(self, page):
+        """
+        Returns the image object if the page holds a single image covering the full page, otherwise None.
+        Only invisible text (e.g., an OCR text layer) is allowed next to the image. Must be called with _PDFIUM_LOCK held.
+        """
+        import pypdfium2.raw as pdfium_c
+
+        if pdfium_c.FPDFPage_GetAnnotCount(page) > 0:
+            return None
+
+        image_obj = None
+        for obj in page.get_objects(max_depth=1):
+            if obj.type == pdfium_c.FPDF_PAGEOBJ_IMAGE and image_obj is None:
+                image_obj = obj
+            elif obj.type == pdfium_c.FPDF_PAGEOBJ_TEXT and pdfium_c.FPDFTextObj_GetTextRenderMode(obj) == pdfium_c.FPDF_TEXTRENDERMODE_INVISIBLE:
+                continue
+            else:
+                return None
+
+        if image_obj is None:
+            return None
+
+        # The image must be placed upright, without rotation, skew or flips.
+        matrix = image_obj.get_matrix()
+        if matrix.b != 0 or matrix.c != 0 or matrix.a <= 0 or matrix.d <= 0:
+            return None
+
+        left, bottom, right, top = image_obj.get_bounds()
+        page_left, page_bottom, page_right, page_top = page.get_bbox()
+        visible_width = min(right, page_right) - max(left, page_left)
+        visible_height = min(top, page_top) - max(bottom, page_bottom)
+        if not _is_full_page(visible_width, visible_height, page_right - page_left, page_top - page_bottom):
+            return None
+        return image_obj
+
+    def has_page_image(self, page_index:int) -> bool:
+        """
+        Returns True if the page is a single embedded image covering the full page.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        with _PDFIUM_LOCK:
+            page = self.pdf[page_index]
+            try:
+                return self._find_page_image(page) is not None
+            finally:
+                page.close()
+
+    def get_page_image(self, page_index:int) -> Union[Image.Image, None]:
+        """
+        Extracts the embedded image of a single-image page. JPEG streams are decoded from the original bytes, 
+        other encodings are decoded by pdfium.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        with _PDFIUM_LOCK:
+            page = self.pdf[page_index]
+            try:
+                image_obj = self._find_page_image(page)
+                if image_obj is None:
+                    return None
+
+                image = None
+                if image_obj.get_filters() == ["DCTDecode"]:
+                    image = Image.open(io.BytesIO(bytes(image_obj.get_data(decode_simple=False))))
+                    # CMYK JPEGs in PDFs are often stored inverted. Let pdfium decode those.
+                    if image.mode not in ["L", "RGB"]:
+                        image = None
+                if image is None:
+                    image = image_obj.get_bitmap(render=False).to_pil()
+                image.load()
+                rotation = page.get_rotation()
+            finally:
+                page.close()
+
+        if rotation % 360 != 0:
+            image = image.rotate(-rotation, expand=True)
+        return image
+
+    def get_page_text(self, page_index:int) -> Union[str, None]:
+        """
+        Extracts the text layer of a page with pdfium.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        with _PDFIUM_LOCK:
+            page = self.pdf[page_index]
+            try:
+                text_page = page.get_textpage()
+                try:
+                    return text_page.get_text_range()
+                finally:
+                    text_page.close()
+            finally:
+                page.close()
+
+    def close(self):
+        """ Closes the document handle. """
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+
+def _is_full_page(image_width:float, image_height:float, page_width:float, page_height:float, min_coverage:float=0.9) -> bool:
+    """ Returns True if an image placed with the given size (pts) covers at least min_coverage of the page area. """
+    if page_width <= 0 or page_height <= 0 or image_width <= 0 or image_height <= 0:
+        return False
+    coverage = (min(image_width, page_width) * min(image_height, page_height)) / (page_width * page_height)
+    return coverage >= min_coverage
+
 
 class PDFDataLoader(DataLoader):
-    def __init__(self, file_path: str):
-        super().__init__(file_path)
-        self.info = pdfinfo_from_path(self.file_path, userpw=None, poppler_path=None)
+    def __init__(self, file_path: str, rasterizer:Union[str, Type[PDFRasterizer]]="pdf2image", page_batch_size:int=8, thread_count:int=1,
+                 extract_embedded_images:bool=False, max_dimension_pixels:int=None, grayscale:bool=False,
+                 spool:bool=False, spool_dir:str=None, spool_format:str="png", file_bytes:bytes=None,
+                 use_text_layer:bool=False, text_layer_min_chars:int=100, text_layer_min_alnum_ratio:float=0.5):
+        """
+        Data loader for PDF files. Pages are rendered by a rasterizer backend. 
+        With the default poppler (pdf2image) backend, pages are rasterized in contiguous batches, 
+        so that one poppler call renders several pages instead of parsing the whole PDF again for every page.
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the PDF file.
+        rasterizer : Union[str, Type[PDFRasterizer]], Optional
+            The rasterizer backend. Must be 'pdf2image' (poppler subprocesses), 'pdfium' (in-process, requires pypdfium2), 
+            or a subclass of PDFRasterizer.
+        page_batch_size : int, Optional
+            The number of contiguous pages to rasterize in one call. Only applies to backends that render in batches (pdf2image).
+            Rendered pages are cached until they are requested by get_page.
+        thread_count : int, Optional
+            The number of threads (poppler processes) pdf2image uses to render a batch of pages.
+        extract_embedded_images : bool, Optional
+            If True, pages that consist of a single full-page image (e.g., scanner output) are not rendered. 
+            The embedded image is extracted directly at its native resolution instead.
+        max_dimension_pixels : int, Optional
+            If specified, pages are rendered directly at a resolution that fits the longest side in this number of pixels, 
+            instead of rendering at full resolution and downsampling afterwards. Pages are never rendered above the default resolution.
+        grayscale : bool, Optional
+            If True, pages are rendered in grayscale.
+        spool : bool, Optional
+            If True, rendered batches are written to a temporary directory as image files and only the file paths are cached. 
+            Each page is decoded when it is requested and its file is deleted. This keeps memory flat for very large documents. 
+            Only applies to backends that render in batches with a page_batch_size above 1. Otherwise pages are rendered 
+            on demand and are not spooled.
+        spool_dir : str, Optional
+            The parent directory for the spool. If None, the system temporary directory is used.
+        spool_format : str, Optional
+            The spool file format. 'png' is compressed. 'ppm' is uncompressed, but it is memory-mapped when decoded.
+        file_bytes : bytes, Optional
+            The PDF content. If given, the document is read from memory and file_path is only used as its name.
+        use_text_layer : bool, Optional
+            If True, the text layer of each page (born-digital or already OCR'd pages) is extracted and checked. 
+            Pages with a usable text layer are returned by get_page_text and are not rendered in batches.
+        text_layer_min_chars : int, Optional
+            The minimum number of non-whitespace characters of a usable text layer.
+        text_layer_min_alnum_ratio : float, Optional
+            The minimum fraction of letters and digits among the non-whitespace characters of a usable text layer. 
+            Garbled text layers (e.g., fonts without a Unicode mapping) have many symbols and replacement characters.
+        """
+        super().__init__(file_path, file_bytes=file_bytes)
+        if not isinstance(page_batch_size, int) or page_batch_size < 1:
+            raise ValueError("page_batch_size must be a positive integer")
+        if not isinstance(thread_count, int) or thread_count < 1:
+            raise ValueError("thread_count must be a positive integer")
+
+        self.page_batch_size = page_batch_size
+        self.thread_count = thread_count
+        self.extract_embedded_images = extract_embedded_images
+        if spool_format not in ["png", "ppm"]:
+            raise ValueError("spool_format must be 'png' or 'ppm'")
+        self.spool = spool
+        self.spool_dir = spool_dir
+        self.spool_format = spool_format
+        self._spool = None
+        self.use_text_layer = use_text_layer
+        self.text_layer_min_chars = text_layer_min_chars
+        self.text_layer_min_alnum_ratio = text_layer_min_alnum_ratio
+        # Usable page texts (None if the page has to be OCR'd), keyed by page index.
+        self._page_texts = {}
+        if rasterizer == "pdf2image":
+            self.rasterizer = Pdf2ImageRasterizer(self.file_path, thread_count=thread_count, max_dimension_pixels=max_dimension_pixels, 
+                                                  grayscale=grayscale, file_bytes=self.file_bytes)
+        elif rasterizer == "pdfium":
+            self.rasterizer = PdfiumRasterizer(self.file_path, max_dimension_pixels=max_dimension_pixels, grayscale=grayscale, 
+                                               file_bytes=self.file_bytes)
+        elif isinstance(rasterizer, type) and issubclass(rasterizer, PDFRasterizer):
+            self.rasterizer = rasterizer(self.file_path, max_dimension_pixels=max_dimension_pixels, grayscale=grayscale, 
+                                         file_bytes=self.file_bytes)
+        else:
+            raise ValueError("rasterizer must be 'pdf2image', 'pdfium', or a subclass of PDFRasterizer")
+
+        # Rendered pages (images, or file paths in spool mode) waiting to be handed out. Guarded by _cache_lock.
+        self._cache_lock = threading.Lock()
+        self._batch_locks = {}
+        self._rendered_batches = set()
+        self._rendered_pages = {}
 
     def get_all_pages(self) -> List[Image.Image]:
         """ 
         Extracts pages from a PDF file. 
         """
+        page_count = self.get_page_count()
+        if page_count == 0:
+            return []
+        if not self.extract_embedded_images and not self.spool:
+            return self._convert_pages(0, page_count - 1)
+        return [self.get_page(page_index) for page_index in range(page_count)]
+
+    def _spool_pages(self, first_page_index:int, last_page_index:int) -> List[str]:
+        """
+        Renders a contiguous range of pages (both ends included) into the spool directory and returns the file paths.
+        """
+        with self._cache_lock:
+            if self._spool is None:
+                self._spool = tempfile.TemporaryDirectory(prefix="vlm4ocr_spool_", dir=self.spool_dir)
+            spool_path = self._spool.name
+        try:
+            return self.rasterizer.render_pages_to_files(first_page_index, last_page_index, output_folder=spool_path, fmt=self.spool_format)
+        except Exception as e:
+            print(f"Error converting PDF to images: {e}")
+            raise ValueError(f"Failed to process PDF file '{os.path.basename(self.file_path)}'. Ensure the PDF backend is installed and the file is valid.") from e
+
+    def _open_spooled_page(self, path:str) -> Image.Image:
+        """
+        Decodes a spooled page and deletes its file. Uncompressed files are memory-mapped by Pillow.
+        """
         try:
-            return convert_from_path(self.file_path)
+            image = Image.open(path)
+            image.load()
+            return image
+        finally:
+            os.remove(path)
 
+    def _extract_page_image(self, page_index:int) -> Union[Image.Image, None]:
+        """
+        Returns the embedded full-page image of a page, or None if the page has to be rendered.
+        """
+        if not self.extract_embedded_images:
+            return None
+        try:
+            if self.rasterizer.has_page_image(page_index):
+                return self.rasterizer.get_page_image(page_index)
+        except Exception as e:
+            # Fall back to rendering the page.
+            print(f"Error extracting embedded image from PDF page {page_index}: {e}")
+        return None
+
+    def get_page_text(self, page_index:int) -> Union[str, None]:
+        """
+        Returns the text layer of the page if use_text_layer is True and the text passes the quality thresholds 
+        (text_layer_min_chars, text_layer_min_alnum_ratio). Returns None otherwise.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page.
+        """
+        if not self.use_text_layer:
+            return None
+        with self._cache_lock:
+            if page_index in self._page_texts:
+                return self._page_texts[page_index]
+
+        try:
+            text = self.rasterizer.get_page_text(page_index)
+        except Exception as e:
+            # OCR the page instead.
+            print(f"Error extracting text layer from PDF page {page_index}: {e}")
+            text = None
+
+        if text is not None:
+            characters = "".join(text.split())
+            alnum_ratio = sum(c.isalnum() for c in characters) / len(characters) if characters else 0.0
+            if len(characters) < self.text_layer_min_chars or alnum_ratio < self.text_layer_min_alnum_ratio:
+                text = None
+
+        with self._cache_lock:
+            self._page_texts[page_index] = text
+        return text
+
+    def _convert_pages(self, first_page_index:int, last_page_index:int) -> List[Image.Image]:
+        """
+        Rasterizes a contiguous range of pages (both ends included) with the rasterizer backend.
+        """
+        try:
+            return self.rasterizer.render_pages(first_page_index, last_page_index)
         except Exception as e:
             print(f"Error converting PDF to images: {e}")
-            raise ValueError(f"Failed to process PDF file '{os.path.basename(self.file_path)}'. Ensure poppler is installed and the file is valid.") from e
+            raise ValueError(f"Failed to process PDF file '{os.path.basename(self.file_path)}'. Ensure the PDF backend is installed and the file is valid.") from e
+
+    def _get_render_ranges(self, first_page_index:int, last_page_index:int) -> List[Tuple[int, int]]:
+        """
+        Splits a batch into contiguous ranges of pages that have to be rendered. 
+        Pages that are extracted as embedded images or that have a usable text layer are skipped.
+        """
+        ranges = []
+        for i in range(first_page_index, last_page_index + 1):
+            if self.extract_embedded_images and self.rasterizer.has_page_image(i):
+                continue
+            if self.get_page_text(i) is not None:
+                continue
+            if ranges and ranges[-1][1] == i - 1:
+                ranges[-1] = (ranges[-1][0], i)
+            else:
+                ranges.append((i, i))
+        return ranges
 
     def get_page(self, page_index:int) -> Image.Image:
         """
         Extracts a page from a PDF file.
+        If extract_embedded_images is True and the page is a single full-page image, the embedded image is returned.
+        For batch rendering backends, the first request for a page renders the whole batch (page_batch_size pages) it belongs to. 
+        The other pages of the batch are cached and handed out when they are requested.
 
         Parameters:
         ----------
         page_index : int
             Index of the page to retrieve.
         """
-        try:
-            return convert_from_path(self.file_path, first_page=page_index + 1, last_page=page_index + 1)[0]
-        except Exception as e:
-            print(f"Error converting PDF to images: {e}")
-            raise ValueError(f"Failed to process PDF file '{os.path.basename(self.file_path)}'. Ensure poppler is installed and the file is valid.") from e
+        page_count = self.get_page_count()
+        if page_index < 0 or page_index >= page_count:
+            raise ValueError(f"Page index {page_index} out of range for PDF file '{os.path.basename(self.file_path)}'.")
+
+        image = self._extract_page_image(page_index)
+        if image is not None:
+            return image
+
+        if not self.rasterizer.batch_rendering or self.page_batch_size == 1:
+            return self._convert_pages(page_index, page_index)[0]
+
+        batch_index = page_index // self.page_batch_size
+        with self._cache_lock:
+            batch_lock = self._batch_locks.setdefault(batch_index, threading.Lock())
 
+        # Concurrent requests for pages in the same batch wait here while the batch is rendered.
+        with batch_lock:
+            with self._cache_lock:
+                page = self._rendered_pages.pop(page_index, None)
+                batch_rendered = batch_index in self._rendered_batches
+            if page is not None:
+                return self._open_spooled_page(page) if self.spool else page
+
+            if not batch_rendered:
+                first_page_index = batch_index * self.page_batch_size
+                last_page_index = min(first_page_index + self.page_batch_size, page_count) - 1
+                # Rendered pages are images, or file paths in spool mode.
+                rendered_pages = {}
+                for first, last in self._get_render_ranges(first_page_index, last_page_index):
+                    rendered = self._spool_pages(first, last) if self.spool else self._convert_pages(first, last)
+                    for i, page in enumerate(rendered, start=first):
+                        rendered_pages[i] = page
+                page = rendered_pages.pop(page_index, None)
+                with self._cache_lock:
+                    self._rendered_batches.add(batch_index)
+                    self._rendered_pages.update(rendered_pages)
+                if page is not None:
+                    return self._open_spooled_page(page) if self.spool else page
+
+        # The page was already handed out (or its embedded image could not be extracted). Render it on its own.
+        return self._convert_pages(page_index, page_index)[0]
 
     async def get_page_async(self, page_index:int) -> Image.Image:
         """ 
@@ -99,28 +949,63 @@ class PDFDataLoader(DataLoader):
 
     def get_page_count(self) -> int:
         """ Returns the number of pages in the PDF file. """
-        return self.info['Pages'] if 'Pages' in self.info else 0
-    
+        return self.rasterizer.get_page_count()
+
+    def get_render_batch_size(self) -> int:
+        """ 
+        Returns the number of pages rendered together (page_batch_size for batch rendering backends). 
+        In spool mode, the other pages of a batch wait on disk, not in memory, so 1 is returned.
+        """
+        if not self.rasterizer.batch_rendering or self.spool:
+            return 1
+        return self.page_batch_size
+
+    def close(self):
+        """ Releases the rasterizer, drops cached pages and removes the spool directory. """
+        with self._cache_lock:
+            self._rendered_pages.clear()
+            self._page_texts.clear()
+            if self._spool is not None:
+                self._spool.cleanup()
+                self._spool = None
+        self.rasterizer.close()
+
 
 class TIFFDataLoader(DataLoader):
-    def __init__(self, file_path: str):
-        super().__init__(file_path)
+    def __init__(self, file_path: str, max_dimension_pixels:int=None, file_bytes:bytes=None):
+        """
+        Data loader for (multi-page) TIFF files. The file is opened once and the handle is kept until close() is called. 
+        Seeks on the shared handle are serialized, so concurrent get_page_async calls are safe. 
+        Only the requested frame is decoded.
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the TIFF file.
+        max_dimension_pixels : int, Optional
+            If specified, frames larger than this are reduced by an integer factor right after decoding. 
+            The longest side is kept at or above this number of pixels.
+        file_bytes : bytes, Optional
+            The file content. If given, the file is read from memory and file_path is only used as its name.
+        """
+        super().__init__(file_path, file_bytes=file_bytes)
+        self.max_dimension_pixels = max_dimension_pixels
+        self._lock = threading.Lock()
+        self._image = None
+
+    def _open(self) -> Image.Image:
+        """
+        Returns the shared image handle. Opens the file on first use. Must be called with _lock held.
+        """
+        if self._image is None:
+            self._image = Image.open(self._open_file())
+        return self._image
 
     def get_all_pages(self) -> List[Image.Image]:
         """ 
         Extracts images from a TIFF file. 
         """
-        try:
-            img = Image.open(self.file_path)
-            images = []
-            for i in range(img.n_frames):
-                img.seek(i)
-                images.append(img.copy())
-            return images
-        except Exception as e:
-            print(f"Error extracting images from TIFF: {e}")
-            raise ValueError(f"Failed to process TIFF file '{os.path.basename(self.file_path)}'. Ensure the file is valid.") from e
-        
+        return [self.get_page(page_index) for page_index in range(self.get_page_count())]
 
     def get_page(self, page_index:int) -> Image.Image:
         """
@@ -132,10 +1017,16 @@ class TIFFDataLoader(DataLoader):
             Index of the page to retrieve. 
         """
         try:
-            img = Image.open(self.file_path)
-            img.seek(page_index)
-            return img.copy()
-        except IndexError:
+            with self._lock:
+                img = self._open()
+                img.seek(page_index)
+                img.load()
+                factor = max(img.size) // self.max_dimension_pixels if self.max_dimension_pixels else 1
+                if factor >= 2 and img.mode in ["L", "LA", "RGB", "RGBA"]:
+                    return img.reduce(factor)
+                # The handle reuses its frame buffer on the next seek. Hand out a copy.
+                return img.copy()
+        except (EOFError, IndexError):
             raise ValueError(f"Page index {page_index} out of range for TIFF file '{os.path.basename(self.file_path)}'.") from None
         except Exception as e:
             print(f"Error extracting page {page_index} from TIFF: {e}")
@@ -156,64 +1047,451 @@ class TIFFDataLoader(DataLoader):
     def get_page_count(self) -> int:
         """ Returns the number of images (pages) in the TIFF file. """
         try:
-            img = Image.open(self.file_path)
-            return img.n_frames 
+            with self._lock:
+                return self._open().n_frames
         except Exception as e:
             print(f"Error getting page count from TIFF: {e}")
             raise ValueError(f"Failed to process TIFF file '{os.path.basename(self.file_path)}'. Ensure the file is valid.") from e
 
+    def close(self):
+        """ Closes the file handle. """
+        with self._lock:
+            if self._image is not None:
+                self._image.close()
+                self._image = None
+
+
+class ImageDataLoader(DataLoader):
+    def __init__(self, file_path: str, max_dimension_pixels:int=None, file_bytes:bytes=None, image:Image.Image=None):
+        """
+        Data loader for single image files (e.g., JPEG, PNG).
+
+        Parameters:
+        ----------
+        file_path : str
+            The path to the image file.
+        max_dimension_pixels : int, Optional
+            If specified, large images are decoded at a reduced scale where the format allows it (JPEG draft mode), 
+            or reduced by an integer factor right after decoding. The longest side is kept at or above this number of pixels, 
+            so that ImageProcessor.resize produces the same final size (the shorter side may differ by a pixel of rounding).
+        file_bytes : bytes, Optional
+            The file content. If given, the file is read from memory and file_path is only used as its name.
+        image : Image.Image, Optional
+            An image that is already opened (e.g., a PIL image held by the caller). If given, file_path is only used as its name.
+        """
+        if image is not None:
+            # Nothing to read from disk.
+            self.file_path = file_path
+            self.file_bytes = None
+        else:
+            super().__init__(file_path, file_bytes=file_bytes)
+        self.image = image
+        self.max_dimension_pixels = max_dimension_pixels
+
+    def _load_image(self) -> Image.Image:
+        """
+        Opens and decodes the image file.
+        """
+        try:
+            if self.image is not None:
+                # The caller's image is left as it is
+                return decode_reduced(self.image, self.max_dimension_pixels, copy=True)
+            return decode_reduced(Image.open(self._open_file()), self.max_dimension_pixels)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {self.file_path}")
+        except Exception as e:
+            raise ValueError(f"Failed to load image file '{os.path.basename(self.file_path)}': {e}") from e
+
+    def get_all_pages(self) -> List[Image.Image]:
+        """ 
+        Loads a single image file. 
+        """
+        return [self._load_image()]
+        
+    def get_page(self, page_index:int) -> Image.Image:
+        """ 
+        Loads a single image file. 
+        
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page to retrieve. Not applicable for single image files.
+        """
+        return self._load_image()
+        
+    async def get_page_async(self, page_index:int) -> Image.Image:
+        """ 
+        Asynchronously loads a single image file. 
+        
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page to retrieve. Not applicable for single image files.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_page, page_index)
+
+    def get_page_bytes(self, page_index:int) -> Union["EncodedImage", None]:
+        """
+        Returns the original file content if it is a PNG or JPEG that fits in max_dimension_pixels. 
+        Only the image header is parsed, the pixels are not decoded.
+
+        Parameters:
+        ----------
+        page_index : int
+            Index of the page to retrieve. Not applicable for single image files.
+        """
+        if self.image is not None:
+            return None
+        try:
+            if self.file_bytes is not None:
+                data = self.file_bytes
+            else:
+                with open(self.file_path, "rb") as f:
+                    data = f.read()
+            mime_type = PASSTHROUGH_MIME_TYPES.get(sniff_file_ext(data))
+            if mime_type is None:
+                return None
+            with Image.open(io.BytesIO(data)) as image:
+                if image.mode not in ["1", "L", "LA", "P", "RGB", "RGBA"]:
+                    return None
+                if self.max_dimension_pixels is not None and max(image.size) > self.max_dimension_pixels:
+                    return None
+            return EncodedImage(data=data, mime_type=mime_type)
+        except Exception:
+            # Fall back to decoding. get_page reports the error if the file is broken.
+            return None
+
+    def get_page_count(self) -> int:
+        """ Returns 1 as there is only one image in a single image file. """
+        return 1
+
+
+def decode_reduced(image:Image.Image, max_dimension_pixels:int=None, copy:bool=False) -> Image.Image:
+    """
+    Decodes an opened (not yet loaded) image. If max_dimension_pixels is specified and the image is larger, 
+    JPEG images are decoded at a reduced scale (draft mode, 1/2 to 1/8) and other images are reduced by an integer factor. 
+    The longest side of the returned image is kept at or above max_dimension_pixels.
+
+    Parameters:
+    ----------
+    image : Image.Image
+        An image returned by Image.open.
+    max_dimension_pixels : int, Optional
+        The target maximum dimension (width or height) in pixels.
+    copy : bool, Optional
+        If True (e.g., for an image held by the caller), the image is not changed: draft mode, which changes the image in place, 
+        is not used, and a new image is returned.
+    """
+    width, height = image.size
+    longest_side = max(width, height)
+    if max_dimension_pixels is None or longest_side <= max_dimension_pixels:
+        if copy:
+            return image.copy()
+        image.load()
+        return image
+
+    if image.format == "JPEG" and not copy:
+        # draft keeps both sides at or above the requested size.
+        scale = max_dimension_pixels / longest_side
+        image.draft(image.mode, (math.ceil(width * scale), math.ceil(height * scale)))
+    image.load()
+
+    factor = max(image.size) // max_dimension_pixels
+    if factor >= 2 and image.mode in ["L", "LA", "RGB", "RGBA"]:
+        return image.reduce(factor)
+    return image.copy() if copy else image
+
+
+def sniff_file_ext(file_bytes:bytes) -> Union[str, None]:
+    """
+    Returns the file extension (e.g., '.pdf') that matches the signature (magic bytes) of a file content, 
+    or None if the content is not a supported PDF, TIFF or image file.
+
+    Parameters:
+    ----------
+    file_bytes : bytes
+        The file content.
+    """
+    head = file_bytes[:1024]
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head[:4] in [b"II*\x00", b"MM\x00*", b"II+\x00", b"MM\x00+"]:
+        return ".tiff"
+    if head[:6] in [b"GIF87a", b"GIF89a"]:
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[:2] == b"BM":
+        return ".bmp"
+    # PDF readers accept the header anywhere in the first 1024 bytes.
+    if b"%PDF-" in head:
+        return ".pdf"
+    return None
+
+
+# Image files that VLM APIs accept as they are.
+PASSTHROUGH_MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg"}
+
+
+SUPPORTED_ARCHIVE_EXTS = ['.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz']
+
+def is_archive(file_path:str) -> bool:
+    """ Returns True if the file path has a supported archive extension (zip or tar). """
+    return file_path.lower().endswith(tuple(SUPPORTED_ARCHIVE_EXTS))
+
+
+def iter_archive_members(archive_path:str, exts:List[str]=None) -> Generator[Tuple[str, bytes], None, None]:
+    """
+    Reads the files in a zip or tar archive one at a time, without extracting the archive to disk.
+    Tar archives (including compressed ones) are read as a stream, so only the current member is held in memory.
+
+    Parameters:
+    ----------
+    archive_path : str
+        The path to the archive.
+    exts : List[str], Optional
+        If specified, only members with these (lower case) file extensions are returned.
+
+    Yields:
+    -------
+    Tuple[str, bytes]
+        The member name inside the archive and its content.
+    """
+    def _keep(name:str) -> bool:
+        base_name = os.path.basename(name)
+        # Skip resource forks and metadata added by macOS archivers.
+        if name.startswith("__MACOSX/") or base_name.startswith("._"):
+            return False
+        return exts is None or os.path.splitext(base_name)[1].lower() in exts
+
+    if not os.path.exists(archive_path):
+        raise FileNotFoundError(f"File not found: {archive_path}")
+
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and _keep(info.filename):
+                    yield info.filename, zf.read(info)
+    else:
+        with tarfile.open(archive_path, mode="r|*") as tf:
+            for member in tf:
+                if member.isfile() and _keep(member.name):
+                    yield member.name, tf.extractfile(member).read()
+
+
+@dataclass
+class EncodedImage:
+    """
+    An image encoded for the wire (e.g., PNG or JPEG bytes) with its MIME type.
+
+    Parameters:
+    ----------
+    data : bytes
+        The encoded image.
+    mime_type : str
+        The MIME type of the encoded image, e.g., 'image/png'.
+    """
+    data: bytes
+    mime_type: str
+
+    @property
+    def base64_size(self) -> int:
+        """ The size of the base64 string in bytes, i.e., the size of the image in the request payload. """
+        return 4 * math.ceil(len(self.data) / 3)
+
+    def to_base64(self) -> str:
+        """ Returns the encoded image as a base64 string. """
+        return base64.b64encode(self.data).decode('utf-8')
+
+    def to_data_url(self) -> str:
+        """ Returns the encoded image as a data URL with the correct MIME type. """
+        return f"data:{self.mime_type};base64,{self.to_base64()}"
+
+
+class ImageEncoder:
+    MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+    COLOR_MODES = ["grayscale", "bilevel", "palette"]
+
+    def __init__(self, format:str="png", quality:int=None, compress_level:int=None, color_mode:str=None, palette_colors:int=16):
+        """
+        This class encodes page images before they are sent to the VLM. 
+        The defaults (PNG with Pillow's default compression) match image_to_base64.
+
+        Parameters:
+        ----------
+        format : str, Optional
+            The wire format. Must be 'png', 'jpeg', or 'webp'.
+        quality : int, Optional
+            The JPEG/WebP quality (1-100). If None, Pillow's default is used (75 for JPEG, 80 for WebP).
+        compress_level : int, Optional
+            The PNG compression level (0-9). Lower is faster and larger. If None, Pillow's default (6) is used.
+        color_mode : str, Optional
+            If specified, the image is converted before encoding. Must be 'grayscale' (8-bit gray), 
+            'bilevel' (1-bit black and white, PNG only), or 'palette' (palette_colors colors, PNG only). 
+            Text pages rarely need full color, and fewer channels make smaller payloads.
+        palette_colors : int, Optional
+            The number of colors for color_mode='palette'.
+        """
+        format = format.lower()
+        if format == "jpg":
+            format = "jpeg"
+        if format not in self.MIME_TYPES:
+            raise ValueError("format must be 'png', 'jpeg', or 'webp'")
+        if quality is not None and (not isinstance(quality, int) or not 1 <= quality <= 100):
+            raise ValueError("quality must be an integer between 1 and 100")
+        if compress_level is not None and (not isinstance(compress_level, int) or not 0 <= compress_level <= 9):
+            raise ValueError("compress_level must be an integer between 0 and 9")
+        if color_mode is not None and color_mode not in self.COLOR_MODES:
+            raise ValueError("color_mode must be 'grayscale', 'bilevel', or 'palette'")
+        if color_mode in ["bilevel", "palette"] and format != "png":
+            raise ValueError(f"color_mode '{color_mode}' is only supported with the 'png' format")
+        if not isinstance(palette_colors, int) or not 2 <= palette_colors <= 256:
+            raise ValueError("palette_colors must be an integer between 2 and 256")
+
+        self.format = format
+        self.quality = quality
+        self.compress_level = compress_level
+        self.color_mode = color_mode
+        self.palette_colors = palette_colors
+
+    @property
+    def mime_type(self) -> str:
+        """ The MIME type of the encoded images. """
+        return self.MIME_TYPES[self.format]
+
+    @classmethod
+    def get_format(cls, mime_type:str) -> str:
+        """
+        Returns the format that matches a MIME type, to re-encode an image in its own format. Other types are re-encoded as PNG.
+
+        Parameters:
+        ----------
+        mime_type : str
+            The MIME type of the encoded image.
+        """
+        for format, format_mime_type in cls.MIME_TYPES.items():
+            if format_mime_type == mime_type:
+                return format
+        return "png"
+
+    def accepts(self, mime_type:str) -> bool:
+        """
+        Returns True if an image that is already encoded with the MIME type can be sent as it is.
+        That is the case if this encoder would not convert its colors, and it would either produce the same format 
+        without a specific quality, or re-encode a JPEG as PNG (which only makes it larger).
+
+        Parameters:
+        ----------
+        mime_type : str
+            The MIME type of the encoded image.
+        """
+        if self.color_mode is not None:
+            return False
+        if mime_type == self.mime_type:
+            return self.format == "png" or self.quality is None
+        return mime_type == "image/jpeg" and self.format == "png"
+
+    def _convert(self, image:Image.Image) -> Image.Image:
+        """
+        Converts the image to the color mode and to a mode the wire format can store.
+        """
+        if self.color_mode == "grayscale":
+            image = image.convert("L")
+        elif self.color_mode == "bilevel":
+            # Plain threshold. Dithering turns glyph edges into noise.
+            image = image.convert("L").convert("1", dither=Image.Dither.NONE)
+        elif self.color_mode == "palette":
+            image = image.convert("RGB").quantize(colors=self.palette_colors)
 
-class ImageDataLoader(DataLoader):
-    def get_all_pages(self) -> List[Image.Image]:
-        """ 
-        Loads a single image file. 
+        if self.format == "jpeg" and image.mode not in ["L", "RGB", "CMYK"]:
+            image = image.convert("L" if image.mode in ["1", "LA", "I", "I;16", "F"] else "RGB")
+        elif self.format == "webp" and image.mode not in ["RGB", "RGBA"]:
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+        return image
+
+    def encode(self, image:Image.Image) -> EncodedImage:
         """
-        try:
-            image = Image.open(self.file_path)
-            image.load()
-            return [image]
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Image file not found: {self.file_path}")
-        except Exception as e:
-            raise ValueError(f"Failed to load image file '{os.path.basename(self.file_path)}': {e}") from e
-        
-    def get_page(self, page_index:int) -> Image.Image:
-        """ 
-        Loads a single image file. 
-        
+        Encodes an image.
+
         Parameters:
         ----------
-        page_index : int
-            Index of the page to retrieve. Not applicable for single image files.
+        image : Image.Image
+            The image to encode.
         """
+        params = {}
+        if self.format in ["jpeg", "webp"] and self.quality is not None:
+            params["quality"] = self.quality
+        if self.format == "png" and self.compress_level is not None:
+            params["compress_level"] = self.compress_level
         try:
-            image = Image.open(self.file_path)
-            image.load()
-            return image
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Image file not found: {self.file_path}")
+            buffered = io.BytesIO()
+            self._convert(image).save(buffered, format=self.format, **params)
+            return EncodedImage(data=buffered.getvalue(), mime_type=self.mime_type)
         except Exception as e:
-            raise ValueError(f"Failed to load image file '{os.path.basename(self.file_path)}': {e}") from e
-        
-    async def get_page_async(self, page_index:int) -> Image.Image:
-        """ 
-        Asynchronously loads a single image file. 
-        
+            print(f"Error encoding image: {e}")
+            raise ValueError(f"Failed to encode image as {self.format}: {e}") from e
+
+    def encode_within_limit(self, image:Image.Image, max_base64_bytes:int, min_dimension_pixels:int=256) -> Tuple[EncodedImage, Dict]:
+        """
+        Encodes an image so that its base64 string is at most max_base64_bytes. 
+        If the image is too large, the encoding is stepped down first (JPEG/WebP quality, or the strongest PNG compression), 
+        then the image is downscaled by 0.75 at a time until it fits.
+
         Parameters:
         ----------
-        page_index : int
-            Index of the page to retrieve. Not applicable for single image files.
+        image : Image.Image
+            The image to encode.
+        max_base64_bytes : int
+            The maximum size of the base64-encoded image in bytes.
+        min_dimension_pixels : int, Optional
+            The image is not downscaled below this size (longest side). If it still does not fit, a ValueError is raised.
+
+        Returns:
+        -------
+        Tuple[EncodedImage, Dict]
+            The encoded image, and a dict with the original and final base64 sizes and the steps taken (empty if the image fit as it was).
         """
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.get_page, page_index)
+        encoded = self.encode(image)
+        info = {"original_size": encoded.base64_size, "final_size": encoded.base64_size, "steps": []}
+        if encoded.base64_size <= max_base64_bytes:
+            return encoded, info
 
-    def get_page_count(self) -> int:
-        """ Returns 1 as there is only one image in a single image file. """
-        return 1
+        # Step down the encoding
+        encoder = self
+        if self.format == "png":
+            if self.compress_level != 9:
+                encoder = ImageEncoder(format="png", compress_level=9, color_mode=self.color_mode, palette_colors=self.palette_colors)
+                encoded = encoder.encode(image)
+                info["steps"].append("compress_level=9")
+        else:
+            start_quality = self.quality if self.quality is not None else (75 if self.format == "jpeg" else 80)
+            for quality in [q for q in [60, 45, 30] if q < start_quality]:
+                encoder = ImageEncoder(format=self.format, quality=quality, color_mode=self.color_mode)
+                encoded = encoder.encode(image)
+                info["steps"].append(f"quality={quality}")
+                if encoded.base64_size <= max_base64_bytes:
+                    break
+
+        # Step down the dimensions. Always resample from the original to avoid compounding blur.
+        width, height = image.size
+        while encoded.base64_size > max_base64_bytes:
+            width, height = max(1, round(width * 0.75)), max(1, round(height * 0.75))
+            if max(width, height) < min_dimension_pixels:
+                raise ValueError(f"The image does not fit in {max_base64_bytes} bytes (base64) without downscaling it below {min_dimension_pixels} pixels.")
+            encoded = encoder.encode(image.resize((width, height), Image.Resampling.LANCZOS))
+            info["steps"].append(f"size={width}x{height}")
+
+        info["final_size"] = encoded.base64_size
+        return encoded, info
 
 
-def image_to_base64(image:Image.Image, format:str="png") -> str:
-    """ Converts an image to a base64 string. """
+def image_to_base64(image:Union[Image.Image, EncodedImage], format:str="png") -> str:
+    """ Converts an image to a base64 string. Encoded images are passed through as they are. """
+    if isinstance(image, EncodedImage):
+        return image.to_base64()
     try:
         buffered = io.BytesIO()
         image.save(buffered, format=format)
@@ -254,6 +1532,358 @@ def get_default_page_delimiter(output_mode:str) -> str:
         return "\n\n---\n\n"
 
 
+# The line the VLM writes before each page of a packed (multi-image) request.
+_PACKED_PAGE_MARKER = re.compile(r"^[ \t>#*`]*<<<\s*PAGE\s+(\d+)\s*>>>[ \t*`]*$", re.MULTILINE | re.IGNORECASE)
+
+def get_page_packing_prompt(num_pages:int) -> str:
+    """
+    Returns the instruction added to the user prompt when several pages are sent in one request.
+    The VLM is asked to write a marker line before each page, so that the response can be split per page (see split_packed_response).
+
+    Parameters:
+    ----------
+    num_pages : int
+        The number of pages (images) in the request.
+    """
+    return (f"The {num_pages} images are separate pages. Convert each page on its own, in the order the images are given. "
+            f"Before the content of each page, write a line with only the page marker <<<PAGE k>>>, where k is the page number (1 to {num_pages}). "
+            "Do not write anything else between the pages.")
+
+def split_packed_response(text:str, num_pages:int) -> List[str]:
+    """
+    Splits the response to a packed (multi-image) request into the texts of the pages, using the page markers.
+    Raises ValueError if the markers are missing, out of order or do not match the number of pages.
+
+    Parameters:
+    ----------
+    text : str
+        The VLM response.
+    num_pages : int
+        The number of pages (images) in the request.
+    """
+    markers = list(_PACKED_PAGE_MARKER.finditer(text))
+    page_numbers = [int(marker.group(1)) for marker in markers]
+    if page_numbers != list(range(1, num_pages + 1)):
+        raise ValueError(f"Expected page markers 1 to {num_pages} in order, found {page_numbers}.")
+    # A code fence before the first marker is allowed, any other text means the pages are not separated.
+    if re.sub(r"```\w*", "", text[:markers[0].start()]).strip():
+        raise ValueError("The response has text before the first page marker.")
+
+    texts = []
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        texts.append(text[marker.end():end].strip("\n"))
+    return texts
+
+
+def _trim_tile_overlap(upper_lines:List[str], lower_lines:List[str], max_overlap_lines:int=30) -> Tuple[int, int]:
+    """
+    Finds the lines that vertically adjacent tiles have in common (the text in their overlap). 
+    The repeated lines must reach the end of the upper tile and start at the top of the lower tile. 
+    One line that is cut at the tile edge (and read differently) is tolerated on each side.
+
+    Returns:
+    -------
+    Tuple[int, int]
+        The number of lines of the upper tile to keep, and the index of the first line of the lower tile to keep.
+    """
+    def _normalize(line:str) -> str:
+        return " ".join(line.split()).lower()
+
+    upper = [(i, _normalize(line)) for i, line in enumerate(upper_lines) if line.strip()][-max_overlap_lines:]
+    lower = [(i, _normalize(line)) for i, line in enumerate(lower_lines) if line.strip()][:max_overlap_lines]
+    if not upper or not lower:
+        return len(upper_lines), 0
+
+    matcher = difflib.SequenceMatcher(None, [line for _, line in upper], [line for _, line in lower], autojunk=False)
+    match = matcher.find_longest_match(0, len(upper), 0, len(lower))
+    if match.size == 0 or len(upper) - (match.a + match.size) > 1 or match.b > 1:
+        return len(upper_lines), 0
+    # A single short line (e.g., "Total") is too weak to be the overlap.
+    if sum(len(line) for _, line in upper[match.a:match.a + match.size]) < 8:
+        return len(upper_lines), 0
+
+    # The lower tile has the cut line of the upper tile in full and vice versa, so the text continues 
+    # from the upper tile up to the repeated lines, and from the lower tile after them.
+    return upper[match.a + match.size - 1][0] + 1, lower[match.b + match.size - 1][0] + 1
+
+
+def _merge_tile_lines(left_line:str, right_line:str) -> str:
+    """
+    Joins a text line that continues from a tile into the tile to its right. The words repeated in the 
+    horizontal overlap of the tiles are removed. One word that is cut at the tile edge (and read differently) 
+    is tolerated on each side.
+    """
+    left_words, right_words = left_line.split(), right_line.split()
+    if not left_words or not right_words:
+        return " ".join(left_words + right_words)
+
+    matcher = difflib.SequenceMatcher(None, [word.lower() for word in left_words], [word.lower() for word in right_words], autojunk=False)
+    match = matcher.find_longest_match(0, len(left_words), 0, len(right_words))
+    # The repeated words must reach the end of the left line and start at the beginning of the right line.
+    # A single short word (e.g., "a" or "1") is too weak to be the overlap.
+    if match.size == 0 or len(left_words) - (match.a + match.size) > 1 or match.b > 1 or \
+       sum(len(word) for word in left_words[match.a:match.a + match.size]) < 4:
+        return " ".join(left_words + right_words)
+    return " ".join(left_words[:match.a + match.size] + right_words[match.b + match.size:])
+
+
+def _join_tile_row(row_lines:List[List[str]]) -> str:
+    """
+    Joins the lines of the tiles of a row (after the vertical overlaps are removed) from left to right. 
+    Tiles with the same number of lines are read as the same text lines and merged line by line (see _merge_tile_lines). 
+    Otherwise, the lines of adjacent tiles cannot be matched up, and the tiles are joined as separate blocks.
+    """
+    blocks = []
+    merged = None
+    for tile_lines in row_lines:
+        tile_lines = [line for line in tile_lines if line.strip()]
+        if not tile_lines:
+            continue
+        if merged is not None and len(merged) == len(tile_lines):
+            merged = [_merge_tile_lines(left, right) for left, right in zip(merged, tile_lines)]
+            continue
+        if merged is not None:
+            blocks.append("\n".join(merged))
+        merged = tile_lines
+    if merged is not None:
+        blocks.append("\n".join(merged))
+    return "\n\n".join(blocks)
+
+
+def stitch_tile_texts(texts:List[str], rows:int, cols:int) -> str:
+    """
+    Joins the OCR texts of the tiles of a page (row-major order) into one text. 
+    The lines repeated in the overlap of vertically adjacent tiles are removed first. Then each row of tiles is joined 
+    from left to right, with the text lines that continue across tiles merged and the words repeated in the horizontal 
+    overlap removed. The rows are joined from top to bottom.
+
+    Parameters:
+    ----------
+    texts : List[str]
+        The OCR texts of the tiles in row-major order.
+    rows : int
+        The number of tile rows.
+    cols : int
+        The number of tile columns.
+    """
+    if len(texts) != rows * cols:
+        raise ValueError(f"Expected {rows * cols} tile texts, got {len(texts)}.")
+
+    lines = [[text.strip("\n").split("\n") for text in texts[r * cols:(r + 1) * cols]] for r in range(rows)]
+    for r in range(rows - 1):
+        for c in range(cols):
+            upper_end, lower_start = _trim_tile_overlap(lines[r][c], lines[r + 1][c])
+            lines[r][c] = lines[r][c][:upper_end]
+            lines[r + 1][c] = lines[r + 1][c][lower_start:]
+
+    if cols == 1:
+        row_texts = ["\n".join(row[0]).strip("\n") for row in lines]
+    else:
+        row_texts = [_join_tile_row(row) for row in lines]
+    return "\n".join(text for text in row_texts if text.strip())
+
+
+def _to_gray_array(image:Image.Image, max_dimension_pixels:int) -> Tuple[np.ndarray, int]:
+    """
+    Returns a grayscale copy of the image as a uint8 array, reduced by an integer factor so that 
+    the longest side is at most max_dimension_pixels, and the reduction factor.
+    """
+    factor = max(1, math.ceil(max(image.size) / max_dimension_pixels))
+    if image.mode not in ["L", "RGB"]:
+        image = image.convert("RGB")
+    if factor > 1:
+        image = image.reduce(factor)
+    return np.asarray(image.convert("L"), dtype=np.uint8), factor
+
+
+def _max_component_size(mask:np.ndarray) -> int:
+    """
+    Returns the number of pixels of the largest 8-connected group of True pixels in a boolean mask. Meant for sparse masks.
+    """
+    remaining = set(zip(*np.nonzero(mask)))
+    largest = 0
+    while remaining:
+        stack = [remaining.pop()]
+        size = 0
+        while stack:
+            y, x = stack.pop()
+            size += 1
+            for neighbor in [(y + dy, x + dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]:
+                if neighbor in remaining:
+                    remaining.remove(neighbor)
+                    stack.append(neighbor)
+        largest = max(largest, size)
+    return largest
+
+
+def _otsu_threshold(gray:np.ndarray) -> int:
+    """ Returns the gray level that best separates ink from background (Otsu's method). """
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight_background = np.cumsum(hist)
+    weight_foreground = weight_background[-1] - weight_background
+    cumulative_mean = np.cumsum(hist * np.arange(256))
+    mean_background = cumulative_mean / np.maximum(weight_background, 1)
+    mean_foreground = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_foreground, 1)
+    between_class_variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    return int(np.argmax(between_class_variance))
+
+
+class VisionTokenProfile:
+    def __init__(self, name:str, grid_size:int, tokens_per_cell:int, base_tokens:int=0, snap_to_grid:bool=False,
+                 max_long_side:int=None, max_short_side:int=None, max_pixels:int=None, min_pixels:int=None):
+        """
+        This class describes how a vision model turns an image into tokens. The image is covered by a grid of cells 
+        (tiles or merged patches), and every cell costs the same number of tokens.
+
+        Parameters:
+        ----------
+        name : str
+            The profile name.
+        grid_size : int
+            The side length of a grid cell in pixels (e.g., 512 for OpenAI tiles, 28 for Qwen-VL merged patches).
+        tokens_per_cell : int
+            The number of tokens per grid cell.
+        base_tokens : int, Optional
+            The number of tokens every image costs on top of its cells.
+        snap_to_grid : bool, Optional
+            If True, the server resizes every image to multiples of grid_size like Qwen-VL's smart_resize: each side is 
+            rounded to the nearest multiple, then both are scaled (and floored or ceiled to the grid) to stay within 
+            max_pixels and min_pixels. Images are fitted to sizes the server keeps as they are, to avoid a second resample. 
+            If False, the server pads the image to whole cells and partially covered cells are billed as full ones.
+        max_long_side : int, Optional
+            The server downscales images whose longest side exceeds this number of pixels.
+        max_short_side : int, Optional
+            The server downscales images whose shortest side exceeds this number of pixels (after max_long_side).
+        max_pixels : int, Optional
+            The server downscales images with more pixels than this.
+        min_pixels : int, Optional
+            The server upscales images with fewer pixels than this (snap_to_grid profiles only).
+        """
+        self.name = name
+        self.grid_size = grid_size
+        self.tokens_per_cell = tokens_per_cell
+        self.base_tokens = base_tokens
+        self.snap_to_grid = snap_to_grid
+        self.max_long_side = max_long_side
+        self.max_short_side = max_short_side
+        self.max_pixels = max_pixels
+        self.min_pixels = min_pixels
+
+    def _count_cells(self, width:int, height:int) -> int:
+        """ Returns the number of grid cells that cover an image of the given size (after the server-side resizing). """
+        return math.ceil(width / self.grid_size) * math.ceil(height / self.grid_size)
+
+    def count_tokens(self, width:int, height:int) -> int:
+        """
+        Returns the number of image tokens for an image of the given size, after the server-side downscaling.
+
+        Parameters:
+        ----------
+        width : int
+            The image width in pixels.
+        height : int
+            The image height in pixels.
+        """
+        width, height = self._apply_server_limits(width, height)
+        return self.base_tokens + self.tokens_per_cell * self._count_cells(width, height)
+
+    def _apply_server_limits(self, width:int, height:int) -> Tuple[int, int]:
+        """ Returns the size the server would resize an image to. """
+        scale = 1.0
+        if self.max_long_side is not None and max(width, height) > self.max_long_side:
+            scale = self.max_long_side / max(width, height)
+        if self.max_short_side is not None and min(width, height) * scale > self.max_short_side:
+            scale = self.max_short_side / min(width, height)
+        if self.snap_to_grid:
+            return self._smart_resize(width * scale, height * scale)
+        if self.max_pixels is not None and width * height * scale * scale > self.max_pixels:
+            scale = math.sqrt(self.max_pixels / (width * height))
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def _smart_resize(self, width:float, height:float) -> Tuple[int, int]:
+        """ 
+        Returns the size Qwen-VL's smart_resize produces: sides rounded to the nearest multiple of grid_size, 
+        then scaled down (floored to the grid) to max_pixels or up (ceiled to the grid) to min_pixels.
+        """
+        grid = self.grid_size
+        new_width = max(grid, round(width / grid) * grid)
+        new_height = max(grid, round(height / grid) * grid)
+        if self.max_pixels is not None and new_width * new_height > self.max_pixels:
+            beta = math.sqrt(width * height / self.max_pixels)
+            new_width = max(grid, math.floor(width / beta / grid) * grid)
+            new_height = max(grid, math.floor(height / beta / grid) * grid)
+        elif self.min_pixels is not None and new_width * new_height < self.min_pixels:
+            beta = math.sqrt(self.min_pixels / (width * height))
+            new_width = math.ceil(width * beta / grid) * grid
+            new_height = math.ceil(height * beta / grid) * grid
+        return new_width, new_height
+
+    def _get_min_cells(self) -> int:
+        """ Returns the number of grid cells of the smallest image the server accepts without upscaling it. """
+        if self.snap_to_grid and self.min_pixels is not None:
+            return max(1, math.ceil(self.min_pixels / self.grid_size ** 2))
+        return 1
+
+    def fit(self, width:int, height:int, max_image_tokens:int=None) -> Tuple[int, int]:
+        """
+        Returns the largest size that keeps the aspect ratio, costs at most max_image_tokens, and lines up with the grid. 
+        Images are not upscaled, except by snap_to_grid profiles, which return the size the server would resize 
+        the image to (up to half a cell larger per side), or a smaller size on the grid that the server keeps as it is.
+
+        Parameters:
+        ----------
+        width : int
+            The image width in pixels.
+        height : int
+            The image height in pixels.
+        max_image_tokens : int, Optional
+            The image token budget. If None, only the server-side limits apply.
+        """
+        width, height = self._apply_server_limits(width, height)
+        if max_image_tokens is None or self.base_tokens + self.tokens_per_cell * self._count_cells(width, height) <= max_image_tokens:
+            return width, height
+
+        max_cells = (max_image_tokens - self.base_tokens) // self.tokens_per_cell
+        if max_cells < self._get_min_cells():
+            raise ValueError(f"max_image_tokens must be at least {self.base_tokens + self.tokens_per_cell * self._get_min_cells()} for the '{self.name}' profile")
+
+        if self.snap_to_grid:
+            # Every multiple of grid_size within min_pixels and max_pixels is kept by the server. 
+            # Try the number of cells along the longest side from the largest down, with the shortest side 
+            # rounded to the nearest cell, or rounded down if that does not fit.
+            long_side, short_side = max(width, height), min(width, height)
+            for long_cells in range(long_side // self.grid_size, 0, -1):
+                exact_short_cells = short_side * long_cells / long_side
+                for short_cells in [max(1, round(exact_short_cells)), max(1, math.floor(exact_short_cells))]:
+                    if self._get_min_cells() <= long_cells * short_cells <= max_cells:
+                        long_side, short_side = long_cells * self.grid_size, short_cells * self.grid_size
+                        return (long_side, short_side) if width >= height else (short_side, long_side)
+            return self._smart_resize(self.grid_size, self.grid_size)
+
+        # The cell count only changes where a side crosses a grid line. Try these scales from the largest down.
+        candidate_scales = set()
+        for side in [width, height]:
+            for k in range(1, math.ceil(side / self.grid_size) + 1):
+                candidate_scales.add(min(1.0, k * self.grid_size / side))
+        for scale in sorted(candidate_scales, reverse=True):
+            scaled_width, scaled_height = max(1, int(width * scale)), max(1, int(height * scale))
+            if self._count_cells(scaled_width, scaled_height) <= max_cells:
+                return scaled_width, scaled_height
+        return self.grid_size, self.grid_size
+
+
+VISION_TOKEN_PROFILES = {
+    # OpenAI high detail: fit in 2048 x 2048, shortest side at most 768, 170 tokens per 512-px tile plus 85.
+    "openai_high": VisionTokenProfile("openai_high", grid_size=512, tokens_per_cell=170, base_tokens=85, 
+                                      max_long_side=2048, max_short_side=768),
+    # Qwen2-VL/Qwen2.5-VL (e.g., served by vLLM): 14-px patches merged 2 x 2, one token per 28-px cell. 
+    # min_pixels and max_pixels are the defaults of the models' preprocessor config.
+    "qwen_vl": VisionTokenProfile("qwen_vl", grid_size=28, tokens_per_cell=1, snap_to_grid=True, 
+                                  max_pixels=12845056, min_pixels=3136),
+}
+
+
 class ImageProcessor:
     def __init__(self):
         self.has_tesseract = importlib.util.find_spec("pytesseract") is not None
@@ -354,4 +1984,488 @@ class ImageProcessor:
             True if the image was resized, False otherwise.
         """
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.resize, image, max_dimension_pixels)
\ No newline at end of file
+        return await loop.run_in_executor(None, self.resize, image, max_dimension_pixels)
+
+    def detect_blank_page(self, image: Image.Image, max_ink_fraction:float=0.001, max_std:float=8.0, 
+                          thumbnail_max_dimension:int=512, edge_margin:float=0.05, min_contrast:int=24, 
+                          max_component_pixels:int=4, min_background_level:int=180) -> Tuple[bool, float, float]:
+        """ 
+        Detects blank pages (e.g., separator sheets, blank backs of duplex scans) from a grayscale thumbnail. 
+        A page is blank if its background (the median gray level) is near white, both its ink density (the fraction of 
+        pixels clearly darker than the background) and its gray level standard deviation are low, and no connected group 
+        of ink pixels is larger than dust. A uniformly dark page (e.g., an underexposed scan or a photo) has no ink 
+        relative to its own background, so the background level is checked as well. 
+        A page whose only content is a short line (e.g., "Page 2") has a low ink density, but its characters 
+        form connected groups of several pixels, so it is not blank. The edges of the page are ignored, 
+        so that scanner bed edges, borders and punch holes do not count as content.
+        
+        Parameters:
+        ----------
+        max_ink_fraction : float, Optional
+            The maximum fraction of ink pixels of a blank page.
+        max_std : float, Optional
+            The maximum standard deviation of the gray levels of a blank page.
+        thumbnail_max_dimension : int, Optional
+            The longest side of the thumbnail that is analyzed.
+        edge_margin : float, Optional
+            The fraction of the width and height ignored at each edge.
+        min_contrast : int, Optional
+            The number of gray levels a pixel must be darker than the background (the median gray level) to count as ink.
+        max_component_pixels : int, Optional
+            The maximum size (in thumbnail pixels) of a connected group of ink pixels (8-connected) on a blank page. 
+            Larger groups are content, not specks of dust or noise.
+        min_background_level : int, Optional
+            The minimum median gray level (0-255) of a blank page. Darker pages are not blank.
+
+        Returns:
+        -------
+        bool
+            True if the page is blank, False otherwise.
+        float
+            The ink density.
+        float
+            The gray level standard deviation.
+        """
+        gray, _ = _to_gray_array(image, thumbnail_max_dimension)
+        margin_y, margin_x = int(gray.shape[0] * edge_margin), int(gray.shape[1] * edge_margin)
+        center = gray[margin_y:gray.shape[0] - margin_y, margin_x:gray.shape[1] - margin_x]
+        if center.size == 0:
+            center = gray
+
+        background = int(np.median(center))
+        ink = center < background - min_contrast
+        ink_fraction = float(ink.mean())
+        std = float(center.std())
+        if background < min_background_level or ink_fraction > max_ink_fraction or std > max_std:
+            return False, ink_fraction, std
+        # Only a few ink pixels are left on a page that passes the thresholds above, so they are grouped in Python
+        return _max_component_size(ink) <= max_component_pixels, ink_fraction, std
+
+    def crop_margins(self, image: Image.Image, padding_pixels:int=16, analysis_max_dimension:int=1000, 
+                     min_ink_fraction:float=0.002, min_contrast:int=32) -> Tuple[Image.Image, bool, Tuple[int, int, int, int]]:
+        """ 
+        Crops blank margins, scanner bed edges and black borders. The content bounding box is found on a reduced 
+        grayscale copy: pixels clearly darker than the background (the median gray level) are ink. Rows and columns 
+        at the edges that are mostly ink (borders) are dropped first, then the box is fitted to the rows and columns 
+        that contain ink. The box is padded and never grows the image.
+        
+        Parameters:
+        ----------
+        padding_pixels : int, Optional
+            The padding added around the content bounding box, in pixels of the input image.
+        analysis_max_dimension : int, Optional
+            The longest side of the copy that is analyzed.
+        min_ink_fraction : float, Optional
+            The fraction of ink pixels a row or column needs to count as content. Specks and scanner noise stay below it.
+        min_contrast : int, Optional
+            The number of gray levels a pixel must be darker than the background to count as ink. 
+            It is kept low enough that thin strokes, lightened by the reduction, still count.
+
+        Returns:
+        -------
+        Image.Image
+            The cropped image.
+        bool
+            True if the image was cropped, False otherwise.
+        Tuple[int, int, int, int]
+            The crop box (left, upper, right, lower) in pixels of the input image.
+        """
+        full_box = (0, 0, image.width, image.height)
+        gray, factor = _to_gray_array(image, analysis_max_dimension)
+        ink = gray < int(np.median(gray)) - min_contrast
+
+        # Drop dark borders (scanner bed, black frame) from each edge. Dark bands wider than 10% of the side 
+        # are more likely content (e.g., a photo or a header bar) and are kept.
+        def _border_width(dark_fraction:np.ndarray) -> int:
+            not_border = np.flatnonzero(dark_fraction <= 0.5)
+            width = int(not_border[0]) if not_border.size else dark_fraction.size
+            return width if width <= 0.1 * dark_fraction.size else 0
+
+        top = _border_width(ink.mean(axis=1))
+        bottom = ink.shape[0] - _border_width(ink.mean(axis=1)[::-1])
+        left = _border_width(ink.mean(axis=0))
+        right = ink.shape[1] - _border_width(ink.mean(axis=0)[::-1])
+        inner = ink[top:bottom, left:right]
+
+        # Fit the box to the rows and columns with ink.
+        rows = np.flatnonzero(inner.mean(axis=1) >= min_ink_fraction)
+        cols = np.flatnonzero(inner.mean(axis=0) >= min_ink_fraction)
+        if rows.size == 0 or cols.size == 0:
+            return image, False, full_box
+
+        box = (max(0, (left + int(cols[0])) * factor - padding_pixels),
+               max(0, (top + int(rows[0])) * factor - padding_pixels),
+               min(image.width, (left + int(cols[-1]) + 1) * factor + padding_pixels),
+               min(image.height, (top + int(rows[-1]) + 1) * factor + padding_pixels))
+        if box == full_box:
+            return image, False, full_box
+        return image.crop(box), True, box
+
+    def estimate_text_height(self, image: Image.Image, analysis_max_dimension:int=1600, num_strips:int=4) -> Union[float, None]:
+        """ 
+        Estimates the typical height of text lines in pixels (ascender to descender) from horizontal projection profiles.
+        The analysis runs on a reduced grayscale copy. The page is split into vertical strips, so that lines in 
+        different columns do not have to be aligned.
+        
+        Parameters:
+        ----------
+        analysis_max_dimension : int, Optional
+            The longest side of the copy that is analyzed.
+        num_strips : int, Optional
+            The number of vertical strips.
+
+        Returns:
+        -------
+        Union[float, None]
+            The median text line height in pixels of the input image, or None if too few text lines were found.
+        """
+        gray, factor = _to_gray_array(image, analysis_max_dimension)
+        ink = gray <= _otsu_threshold(gray)
+        # Dark text on a light background has less ink than background.
+        if ink.mean() > 0.5:
+            ink = ~ink
+
+        runs = []
+        for strip in np.array_split(ink, num_strips, axis=1):
+            rows = strip.sum(axis=1) > max(1, 0.01 * strip.shape[1])
+            edges = np.diff(np.concatenate([[0], rows.astype(np.int8), [0]]))
+            runs.append(np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1))
+        runs = np.concatenate(runs)
+        # Drop specks and blocks that are too tall to be a text line (e.g., figures, rules).
+        runs = runs[(runs >= 2) & (runs <= 0.1 * gray.shape[0])]
+        if runs.size < 3:
+            return None
+        return float(np.median(runs)) * factor
+
+    def resize_for_legibility(self, image: Image.Image, min_text_height_pixels:int=20) -> Tuple[Image.Image, bool, Union[float, None]]:
+        """ 
+        Downscales the image to the smallest size that keeps text lines at least min_text_height_pixels tall. 
+        Pages with large type are reduced more than pages with fine print. Images are never upscaled, 
+        and pages without detectable text are not changed.
+        
+        Parameters:
+        ----------
+        min_text_height_pixels : int, Optional
+            The minimum text line height (ascender to descender) in pixels.
+
+        Returns:
+        -------
+        Image.Image
+            The resized image.
+        bool
+            True if the image was resized, False otherwise.
+        Union[float, None]
+            The estimated text line height of the input image, or None if no text was detected.
+        """
+        text_height = self.estimate_text_height(image)
+        if text_height is None or text_height <= min_text_height_pixels:
+            return image, False, text_height
+
+        scale = min_text_height_pixels / text_height
+        new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        return image.resize(new_size, resample=Image.Resampling.LANCZOS), True, text_height
+
+    def resize_to_token_grid(self, image: Image.Image, profile:Union[str, VisionTokenProfile], 
+                             max_image_tokens:int=None) -> Tuple[Image.Image, bool, int]:
+        """ 
+        Resizes the image to the largest size that fits in an image token budget and lines up with the vision model's grid 
+        (tiles or patches), so that no tokens are spent on partially covered cells or on a second resample by the server.
+        
+        Parameters:
+        ----------
+        profile : Union[str, VisionTokenProfile]
+            The vision token profile, or a name in VISION_TOKEN_PROFILES ('openai_high', 'qwen_vl').
+        max_image_tokens : int, Optional
+            The image token budget. If None, only the server-side size limits of the profile apply.
+
+        Returns:
+        -------
+        Image.Image
+            The resized image.
+        bool
+            True if the image was resized, False otherwise.
+        int
+            The number of image tokens of the returned image.
+        """
+        if isinstance(profile, str):
+            if profile not in VISION_TOKEN_PROFILES:
+                raise ValueError(f"Unknown vision token profile: {profile}. Supported profiles are: {list(VISION_TOKEN_PROFILES.keys())}")
+            profile = VISION_TOKEN_PROFILES[profile]
+
+        new_width, new_height = profile.fit(image.width, image.height, max_image_tokens=max_image_tokens)
+        image_tokens = profile.count_tokens(new_width, new_height)
+        if (new_width, new_height) == image.size:
+            return image, False, image_tokens
+        return image.resize((new_width, new_height), resample=Image.Resampling.LANCZOS), True, image_tokens
+
+    def split_into_tiles(self, image: Image.Image, tile_size_pixels:int, 
+                         overlap:float=0.1) -> Tuple[List[Image.Image], List[Tuple[int, int, int, int]], Tuple[int, int]]:
+        """ 
+        Splits the image into overlapping tiles of at most tile_size_pixels on each side. 
+        Tiles are spread evenly, so that adjacent tiles overlap by at least overlap * tile_size_pixels.
+        
+        Parameters:
+        ----------
+        tile_size_pixels : int
+            The maximum width and height of a tile.
+        overlap : float, Optional
+            The minimum overlap between adjacent tiles, as a fraction of tile_size_pixels.
+
+        Returns:
+        -------
+        List[Image.Image]
+            The tiles in row-major order.
+        List[Tuple[int, int, int, int]]
+            The tile boxes (left, upper, right, lower).
+        Tuple[int, int]
+            The number of tile rows and columns.
+        """
+        overlap_pixels = round(tile_size_pixels * overlap)
+
+        def _tile_positions(length:int) -> List[int]:
+            if length <= tile_size_pixels:
+                return [0]
+            num_tiles = math.ceil((length - overlap_pixels) / (tile_size_pixels - overlap_pixels))
+            step = (length - tile_size_pixels) / (num_tiles - 1)
+            return [round(i * step) for i in range(num_tiles)]
+
+        xs, ys = _tile_positions(image.width), _tile_positions(image.height)
+        tile_width, tile_height = min(image.width, tile_size_pixels), min(image.height, tile_size_pixels)
+        boxes = [(x, y, x + tile_width, y + tile_height) for y in ys for x in xs]
+        return [image.crop(box) for box in boxes], boxes, (len(ys), len(xs))
+
+
+class EventLoopLagMonitor:
+    def __init__(self, threshold_seconds:float=0.1, interval_seconds:float=0.05, on_lag:Callable[[float], None]=None):
+        """
+        This class measures the event loop lag, i.e., how late a periodic timer fires because synchronous code 
+        (e.g., image encoding on the event loop thread) blocked the loop. Blocking stretches over threshold_seconds 
+        are counted and reported to on_lag. Use it as an async context manager, with start() and stop(), 
+        or pass it to OCREngine.concurrent_ocr.
+
+        Parameters:
+        ----------
+        threshold_seconds : float, Optional
+            The lag (in seconds) over which a blocking stretch is reported.
+        interval_seconds : float, Optional
+            The timer interval in seconds.
+        on_lag : Callable[[float], None], Optional
+            Called with the lag in seconds for each blocking stretch over threshold_seconds (e.g., to log it or record a metric).
+        """
+        if not isinstance(threshold_seconds, (int, float)) or threshold_seconds <= 0:
+            raise ValueError("threshold_seconds must be a positive number")
+        if not isinstance(interval_seconds, (int, float)) or interval_seconds <= 0:
+            raise ValueError("interval_seconds must be a positive number")
+        self.threshold_seconds = threshold_seconds
+        self.interval_seconds = interval_seconds
+        self.on_lag = on_lag
+        self.num_samples = 0
+        self.num_stalls = 0
+        self.max_lag_seconds = 0.0
+        self.total_stall_seconds = 0.0
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        """ True if the monitor is running. """
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """ Starts the monitor on the running event loop. Does nothing if it is already running. """
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """ Stops the monitor. The statistics are kept. """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+
+    async def _run(self):
+        """ Sleeps for interval_seconds at a time and records how late the loop woke up. """
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            lag = max(0.0, loop.time() - start - self.interval_seconds)
+            self.num_samples += 1
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            if lag > self.threshold_seconds:
+                self.num_stalls += 1
+                self.total_stall_seconds += lag
+                if self.on_lag is not None:
+                    self.on_lag(lag)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns the statistics: the number of samples, the number of blocking stretches over threshold_seconds ("stalls"), 
+        the maximum lag and the total lag of the stalls in seconds.
+        """
+        return {
+            "samples": self.num_samples,
+            "stalls": self.num_stalls,
+            "max_lag_seconds": round(self.max_lag_seconds, 4),
+            "total_stall_seconds": round(self.total_stall_seconds, 4)
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, min_limit:int=1, max_limit:int=32, initial_limit:int=None, backoff_ratio:float=0.5, 
+                 latency_threshold_seconds:float=None):
+        """
+        This class limits the number of concurrent VLM calls like a semaphore, but adjusts the limit at runtime with 
+        AIMD (additive increase, multiplicative decrease). The limit grows by 1 after a full limit's worth of successful calls 
+        that started while the limit was saturated (all slots in use), so that idle or lightly loaded periods do not 
+        inflate it. It is multiplied by backoff_ratio when a call signals overload: a 429 or 5xx response, a timeout, 
+        or a latency over latency_threshold_seconds. Overload signals from calls that started before the last decrease 
+        are ignored, so a burst of failures from one window only backs off once. Use it with OCREngine.concurrent_ocr 
+        (vlm_call_limiter) in place of a fixed concurrent_batch_size.
+
+        Parameters:
+        ----------
+        min_limit : int, Optional
+            The lowest limit.
+        max_limit : int, Optional
+            The highest limit.
+        initial_limit : int, Optional
+            The starting limit. If None, starts at min_limit and grows.
+        backoff_ratio : float, Optional
+            The factor (between 0 and 1) the limit is multiplied by on overload.
+        latency_threshold_seconds : float, Optional
+            If specified, a call that takes longer than this counts as overload. VLM latency grows with the output length, 
+            so set this well above the time of a typical page.
+        """
+        if not isinstance(min_limit, int) or min_limit < 1:
+            raise ValueError("min_limit must be a positive integer")
+        if not isinstance(max_limit, int) or max_limit < min_limit:
+            raise ValueError("max_limit must be an integer not less than min_limit")
+        if initial_limit is None:
+            initial_limit = min_limit
+        if not isinstance(initial_limit, int) or not min_limit <= initial_limit <= max_limit:
+            raise ValueError("initial_limit must be an integer between min_limit and max_limit")
+        if not isinstance(backoff_ratio, (int, float)) or not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be a number between 0 and 1 (exclusive)")
+        if latency_threshold_seconds is not None and (not isinstance(latency_threshold_seconds, (int, float)) or latency_threshold_seconds <= 0):
+            raise ValueError("latency_threshold_seconds must be a positive number")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_threshold_seconds = latency_threshold_seconds
+        self._limit = initial_limit
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease_time = float("-inf")
+        self.num_increases = 0
+        self.num_decreases = 0
+        self.num_overload_signals = 0
+        # Start time of each call in flight, and whether the limit was saturated when it started, per task
+        self._start_times = {}
+        self._condition = None
+        self._loop = None
+
+    @property
+    def limit(self) -> int:
+        """ The current limit on concurrent calls. """
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """ The number of calls in flight. """
+        return self._in_flight
+
+    @staticmethod
+    def is_overload_error(error:BaseException) -> bool:
+        """
+        Returns True if an error signals that the server is overloaded: an HTTP 429 or 5xx status 
+        (the status_code of the error or of its response, as in the OpenAI and Ollama clients) or a timeout.
+        """
+        status_code = getattr(error, "status_code", None)
+        if status_code is None:
+            status_code = getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status_code, int) and (status_code == 429 or status_code >= 500):
+            return True
+        return isinstance(error, (asyncio.TimeoutError, TimeoutError)) or "timeout" in type(error).__name__.lower()
+
+    def _get_condition(self) -> asyncio.Condition:
+        """ Returns the condition for the running event loop (a limiter can be reused across asyncio.run calls). """
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+        return self._condition
+
+    async def acquire(self):
+        """ Waits until a call can start under the current limit. """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+            saturated = self._in_flight >= self._limit
+        self._start_times[asyncio.current_task()] = (time.monotonic(), saturated)
+
+    async def release(self, error:BaseException=None):
+        """
+        Ends a call and adjusts the limit based on its outcome.
+
+        Parameters:
+        ----------
+        error : BaseException, Optional
+            The error the call raised, if any.
+        """
+        start_time, saturated = self._start_times.pop(asyncio.current_task(), (None, False))
+        now = time.monotonic()
+        latency = now - start_time if start_time is not None else 0.0
+        overloaded = (error is not None and self.is_overload_error(error)) or \
+                     (self.latency_threshold_seconds is not None and latency > self.latency_threshold_seconds)
+
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            if overloaded:
+                self.num_overload_signals += 1
+                # Calls that started before the last decrease saw the old limit
+                if start_time is None or start_time >= self._last_decrease_time:
+                    new_limit = max(self.min_limit, int(self._limit * self.backoff_ratio))
+                    if new_limit < self._limit:
+                        self.num_decreases += 1
+                    self._limit = new_limit
+                    self._successes = 0
+                    self._last_decrease_time = now
+            elif error is None and saturated:
+                # Only calls that used the full limit show that the limit can grow
+                self._successes += 1
+                if self._successes >= self._limit and self._limit < self.max_limit:
+                    self._limit += 1
+                    self._successes = 0
+                    self.num_increases += 1
+            condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.release(exc_value)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns the current limit, the number of calls in flight, and the number of increases, decreases and overload signals.
+        """
+        return {
+            "limit": self._limit,
+            "in_flight": self._in_flight,
+            "increases": self.num_increases,
+            "decreases": self.num_decreases,
+            "overload_signals": self.num_overload_signals
+        }
@@ -1,9 +1,10 @@
 import abc
+import io
 import importlib.util
-from typing import Any, List, Dict, Union, Generator
+from typing import Any, List, Dict, Tuple, Union, Generator
 import warnings
 from PIL import Image
-from vlm4ocr.utils import image_to_base64
+from vlm4ocr.utils import ImageEncoder, EncodedImage
 
 
 class VLMConfig(abc.ABC):
@@ -184,6 +185,9 @@ class OpenAIReasoningVLMConfig(VLMConfig):
 
 
 class VLMEngine:
+    # The maximum total size of the images in a request payload (base64 bytes). None for no limit.
+    max_image_payload_bytes = None
+
     @abc.abstractmethod
     def __init__(self, config:VLMConfig, **kwrs):
         """
@@ -221,7 +225,8 @@ class VLMEngine:
         return NotImplemented
 
     @abc.abstractmethod
-    def get_ocr_messages(self, system_prompt:str, user_prompt:str, image:Image.Image) -> List[Dict[str,str]]:
+    def get_ocr_messages(self, system_prompt:str, user_prompt:str, 
+                         image:Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]]) -> List[Dict[str,str]]:
         """
         This method inputs an image and returns the correesponding chat messages for the inference engine.
 
@@ -231,10 +236,71 @@ class VLMEngine:
             the system prompt.
         user_prompt : str
             the user prompt.
-        image : Image.Image
-            the image for OCR.
+        image : Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]]
+            the image for OCR. An EncodedImage (see ImageEncoder) is sent as it is. 
+            A list of images is sent in one user message, in order (e.g., several pages packed into one request).
         """
         return NotImplemented
+
+    def _check_payload_limit(self, max_image_payload_bytes:int) -> int:
+        """
+        This method validates the max_image_payload_bytes parameter of the constructors.
+        """
+        if max_image_payload_bytes is not None and (not isinstance(max_image_payload_bytes, int) or max_image_payload_bytes <= 0):
+            raise ValueError("max_image_payload_bytes must be a positive integer or None.")
+        return max_image_payload_bytes
+
+    def fit_images_to_payload(self, images:List[Union[Image.Image, EncodedImage]], 
+                              encoder:ImageEncoder=None) -> Tuple[List[EncodedImage], List[Dict]]:
+        """
+        This method encodes the images of one request and enforces max_image_payload_bytes on their total base64 size. 
+        If the images are over the limit together, each one is recompressed (see ImageEncoder.encode_within_limit) 
+        to its share of the limit, in proportion to its size. An EncodedImage is decoded and recompressed in its own format.
+
+        Parameters:
+        ----------
+        images : List[Union[Image.Image, EncodedImage]]
+            the images of the request.
+        encoder : ImageEncoder, Optional
+            the encoder for an Image.Image. Default is PNG.
+
+        Returns:
+        -------
+        Tuple[List[EncodedImage], List[Dict]]
+            The encoded images, and for each image a dict with the original and final base64 sizes and 
+            the recompression steps taken (empty if the image is sent as it was).
+        """
+        encoder = encoder if encoder else ImageEncoder()
+        encoded_images = [img if isinstance(img, EncodedImage) else encoder.encode(img) for img in images]
+        infos = [{"original_size": encoded.base64_size, "final_size": encoded.base64_size, "steps": []} for encoded in encoded_images]
+        total_size = sum(encoded.base64_size for encoded in encoded_images)
+        if self.max_image_payload_bytes is None or total_size <= self.max_image_payload_bytes:
+            return encoded_images, infos
+
+        for i, (img, encoded) in enumerate(zip(images, encoded_images)):
+            image_encoder = encoder
+            if isinstance(img, EncodedImage):
+                image_encoder = ImageEncoder(format=ImageEncoder.get_format(img.mime_type))
+                img = Image.open(io.BytesIO(img.data))
+            max_size = self.max_image_payload_bytes * encoded.base64_size // total_size
+            encoded_images[i], info = image_encoder.encode_within_limit(img, max_size)
+            infos[i] = {**info, "original_size": encoded.base64_size}
+        return encoded_images, infos
+
+    def encode_image(self, image:Union[Image.Image, EncodedImage], encoder:ImageEncoder=None) -> EncodedImage:
+        """
+        This method encodes an image for the request payload and enforces max_image_payload_bytes. 
+        An image over the limit is recompressed (see fit_images_to_payload).
+
+        Parameters:
+        ----------
+        image : Union[Image.Image, EncodedImage]
+            the image for OCR.
+        encoder : ImageEncoder, Optional
+            the encoder for an Image.Image. Default is PNG.
+        """
+        encoded_images, _ = self.fit_images_to_payload([image], encoder=encoder)
+        return encoded_images[0]
     
     def _format_config(self) -> Dict[str, Any]:
         """
@@ -247,7 +313,7 @@ class VLMEngine:
 
 
 class OllamaVLMEngine(VLMEngine):
-    def __init__(self, model_name:str, num_ctx:int=8192, keep_alive:int=300, config:VLMConfig=None, **kwrs):
+    def __init__(self, model_name:str, num_ctx:int=8192, keep_alive:int=300, config:VLMConfig=None, max_image_payload_bytes:int=None, **kwrs):
         """
         The Ollama inference engine.
 
@@ -261,6 +327,8 @@ class OllamaVLMEngine(VLMEngine):
             seconds to hold the LLM after the last API call.
         config : LLMConfig
             the LLM configuration. 
+        max_image_payload_bytes : int, Optional
+            the maximum total size of the images in a request (base64 bytes). Larger images are recompressed to fit.
         """
         if importlib.util.find_spec("ollama") is None:
             raise ImportError("ollama-python not found. Please install ollama-python (```pip install ollama```).")
@@ -271,6 +339,7 @@ class OllamaVLMEngine(VLMEngine):
         self.model_name = model_name
         self.num_ctx = num_ctx
         self.keep_alive = keep_alive
+        self.max_image_payload_bytes = self._check_payload_limit(max_image_payload_bytes)
         self.config = config if config else BasicVLMConfig()
         self.formatted_params = self._format_config()
     
@@ -363,7 +432,8 @@ class OllamaVLMEngine(VLMEngine):
         res = response['message']['content']
         return self.config.postprocess_response(res)
     
-    def get_ocr_messages(self, system_prompt:str, user_prompt:str, image:Image.Image) -> List[Dict[str,str]]:
+    def get_ocr_messages(self, system_prompt:str, user_prompt:str, 
+                         image:Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]]) -> List[Dict[str,str]]:
         """
         This method inputs an image and returns the correesponding chat messages for the inference engine.
 
@@ -373,22 +443,24 @@ class OllamaVLMEngine(VLMEngine):
             the system prompt.
         user_prompt : str
             the user prompt.
-        image : Image.Image
-            the image for OCR.
+        image : Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]]
+            the image for OCR. An EncodedImage (see ImageEncoder) is sent as it is. Images are encoded as PNG.
+            A list of images is sent in one message, in order. If the images are over max_image_payload_bytes together, 
+            they are recompressed to fit (see fit_images_to_payload).
         """
-        base64_str = image_to_base64(image)
+        images = image if isinstance(image, list) else [image]
         return [
             {"role": "system", "content": system_prompt},
             {
                 "role": "user",
                 "content": user_prompt,
-                "images": [base64_str]
+                "images": [encoded.to_base64() for encoded in self.fit_images_to_payload(images)[0]]
             }
         ]
 
 
 class OpenAIVLMEngine(VLMEngine):
-    def __init__(self, model:str, config:VLMConfig=None, **kwrs):
+    def __init__(self, model:str, config:VLMConfig=None, max_image_payload_bytes:int=None, **kwrs):
         """
         The OpenAI API inference engine. Supports OpenAI models and OpenAI compatible servers:
         - vLLM OpenAI compatible server (https://docs.vllm.ai/en/latest/serving/openai_compatible_server.html)
@@ -401,6 +473,8 @@ class OpenAIVLMEngine(VLMEngine):
             model name as described in https://platform.openai.com/docs/models
         config : VLMConfig, Optional
             the VLM configuration. Must be a child class of VLMConfig.
+        max_image_payload_bytes : int, Optional
+            the maximum total size of the images in a request (base64 bytes). Larger images are recompressed to fit.
         """
         if importlib.util.find_spec("openai") is None:
             raise ImportError("OpenAI Python API library not found. Please install OpanAI (```pip install openai```).")
@@ -409,6 +483,7 @@ class OpenAIVLMEngine(VLMEngine):
         self.client = OpenAI(**kwrs)
         self.async_client = AsyncOpenAI(**kwrs)
         self.model = model
+        self.max_image_payload_bytes = self._check_payload_limit(max_image_payload_bytes)
         self.config = config if config else BasicVLMConfig()
         self.formatted_params = self._format_config()
 
@@ -503,7 +578,9 @@ class OpenAIVLMEngine(VLMEngine):
         res = response.choices[0].message.content
         return self.config.postprocess_response(res)
     
-    def get_ocr_messages(self, system_prompt:str, user_prompt:str, image:Image.Image, format:str='png', detail:str="high") -> List[Dict[str,str]]:
+    def get_ocr_messages(self, system_prompt:str, user_prompt:str, 
+                         image:Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]], 
+                         format:str='png', detail:str="high") -> List[Dict[str,str]]:
         """
         This method inputs an image and returns the correesponding chat messages for the inference engine.
 
@@ -513,26 +590,34 @@ class OpenAIVLMEngine(VLMEngine):
             the system prompt.
         user_prompt : str
             the user prompt.
-        image : Image.Image
-            the image for OCR.
+        image : Union[Image.Image, EncodedImage, List[Union[Image.Image, EncodedImage]]]
+            the image for OCR. An EncodedImage (see ImageEncoder) is sent as it is, labeled with its own MIME type.
+            A list of images is sent in one message, in order. If the images are over max_image_payload_bytes together, 
+            they are recompressed to fit (see fit_images_to_payload).
         format : str, Optional
-            the image format. 
+            the format to encode an Image.Image in. Must be 'png', 'jpeg', or 'webp'. Ignored for an EncodedImage.
         detail : str, Optional
             the detail level of the image. Default is "high". 
         """
-        base64_str = image_to_base64(image)
+        encoder = ImageEncoder(format=format)
+        images = image if isinstance(image, list) else [image]
+        encoded_images, _ = self.fit_images_to_payload(images, encoder=encoder)
+        image_parts = [
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": encoded.to_data_url(),
+                    "detail": detail
+                },
+            }
+            for encoded in encoded_images
+        ]
         return [
             {"role": "system", "content": system_prompt},
             {
                 "role": "user",
                 "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/{format};base64,{base64_str}",
-                            "detail": detail
-                        },
-                    },
+                    *image_parts,
                     {"type": "text", "text": user_prompt},
                 ],
             },
@@ -540,7 +625,7 @@ class OpenAIVLMEngine(VLMEngine):
 
 
 class AzureOpenAIVLMEngine(OpenAIVLMEngine):
-    def __init__(self, model:str, api_version:str, config:VLMConfig=None, **kwrs):
+    def __init__(self, model:str, api_version:str, config:VLMConfig=None, max_image_payload_bytes:int=None, **kwrs):
         """
         The Azure OpenAI API inference engine.
         For parameters and documentation, refer to 
@@ -555,6 +640,8 @@ class AzureOpenAIVLMEngine(OpenAIVLMEngine):
             the Azure OpenAI API version
         config : LLMConfig
             the LLM configuration.
+        max_image_payload_bytes : int, Optional
+            the maximum total size of the images in a request (base64 bytes). Larger images are recompressed to fit.
         """
         if importlib.util.find_spec("openai") is None:
             raise ImportError("OpenAI Python API library not found. Please install OpanAI (```pip install openai```).")
@@ -562,6 +649,7 @@ class AzureOpenAIVLMEngine(OpenAIVLMEngine):
         from openai import AzureOpenAI, AsyncAzureOpenAI
         self.model = model
         self.api_version = api_version
+        self.max_image_payload_bytes = self._check_payload_limit(max_image_payload_bytes)
         self.client = AzureOpenAI(api_version=self.api_version, 
                                   **kwrs)
         self.async_client = AsyncAzureOpenAI(api_version=self.api_version, 
@@ -20,14 +20,12 @@ def process_ocr_request(request):
     """
     Handles the core logic for an OCR request.
     - Validates input file.
-    - Saves the file temporarily.
+    - Reads the uploaded file into memory (no temporary file on disk).
     - Initializes VLM and OCR engines based on form data (validating required API keys).
     - Uses default system prompt from OCREngine.
     - Returns a streaming Flask Response.
-    - Ensures cleanup of the temporary file.
     """
     print("Entering app_services.process_ocr_request")
-    temp_file_path = None
     vlm_engine = None
     ocr_engine = None
 
@@ -39,12 +37,12 @@ def process_ocr_request(request):
         if not file or file.filename == '':
             raise ValueError("No selected file")
 
-        # 2. Save File Securely
+        # 2. Read File into Memory
         filename = secure_filename(file.filename)
-        temp_file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        print(f"Saving temporary file to: {temp_file_path}")
-        file.save(temp_file_path)
-        print("Temporary file saved.")
+        input_buffer = io.BytesIO(file.read())
+        # OCREngine uses the name to pick the loader. The file type is detected from the content if the extension is missing.
+        input_buffer.name = filename
+        print(f"Read uploaded file {filename} into memory ({input_buffer.getbuffer().nbytes} bytes).")
 
         # 3. Get Form Data
         vlm_api = request.form.get('vlm_api', '')
@@ -132,13 +130,13 @@ def process_ocr_request(request):
         print("OCREngine initialized.")
 
         # 6. Define the Streaming Generator
-        def generate_ocr_stream(ocr_eng, file_to_process_path):
-            print(f"generate_ocr_stream called for: {file_to_process_path}")
+        def generate_ocr_stream(ocr_eng, file_buffer):
+            print(f"generate_ocr_stream called for: {file_buffer.name}")
             try:
-                print(f"Starting OCREngine.stream_ocr for: {file_to_process_path}")
-                for item_dict in ocr_eng.stream_ocr(file_path=file_to_process_path):
+                print(f"Starting OCREngine.stream_ocr for: {file_buffer.name}")
+                for item_dict in ocr_eng.stream_ocr(file_path=file_buffer):
                     yield json.dumps(item_dict) + '\n'
-                print(f"Finished OCREngine.stream_ocr for: {file_to_process_path}")
+                print(f"Finished OCREngine.stream_ocr for: {file_buffer.name}")
             except ValueError as val_err:
                 print(f"--- Value Error during OCR stream: {val_err} ---")
                 traceback.print_exc()
@@ -150,26 +148,19 @@ def process_ocr_request(request):
                 error_obj = {"type": "error", "data": f"Streaming Failed: An unexpected error occurred during processing: {str(stream_err)}"}
                 yield json.dumps(error_obj) + '\n'
             finally:
-                print(f"Calling cleanup_file from generate_ocr_stream finally block for {file_to_process_path}")
-                cleanup_file(file_to_process_path, "post-stream cleanup")
+                file_buffer.close()
 
         # 7. Return Streaming Response
         print("Setup complete. Returning streaming response object.")
-        return Response(stream_with_context(generate_ocr_stream(ocr_engine, temp_file_path)), mimetype='application/x-ndjson')
+        return Response(stream_with_context(generate_ocr_stream(ocr_engine, input_buffer)), mimetype='application/x-ndjson')
 
     except (ValueError, FileNotFoundError) as setup_val_err:
         print(f"--- Setup Validation Error in app_services: {setup_val_err} ---")
         traceback.print_exc()
-        if temp_file_path:
-             print(f"Calling cleanup_file due to setup error for {temp_file_path}")
-             cleanup_file(temp_file_path, "setup validation error cleanup")
         raise setup_val_err 
     except Exception as setup_err:
         print(f"--- Unexpected Setup Error in app_services: {setup_err} ---")
         traceback.print_exc()
-        if temp_file_path:
-             print(f"Calling cleanup_file due to unexpected setup error for {temp_file_path}")
-             cleanup_file(temp_file_path, "setup general error cleanup")
         raise Exception(f"Failed during OCR setup: {setup_err}")
 
 